@@ -0,0 +1,101 @@
+"""
+Microbenchmark for AzureSearchProvider result extraction.
+
+Builds 10k synthetic hits shaped like the configured document types and
+times _process_search_results over them against the former per-hit, per-field
+extraction (benchmarks/legacy_extraction.py). No network access is needed.
+
+Usage:
+    python benchmarks/bench_extraction.py [--hits 10000] [--repeat 5]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Placeholder endpoints: clients are created but never used
+for name, value in {
+    "AZURE_SEARCH_ENDPOINT": "https://benchmark.search.windows.net",
+    "AZURE_SEARCH_API_KEY": "benchmark",
+    "AZURE_OPENAI_ENDPOINT": "https://benchmark.openai.azure.com",
+    "AZURE_OPENAI_API_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(name, value)
+
+logging.disable(logging.WARNING)
+
+from lib.config import get_config  # noqa: E402
+from lib.search.base import SearchMode  # noqa: E402
+from lib.search.providers.azure_search import AzureSearchProvider  # noqa: E402
+
+from legacy_extraction import LegacyExtractor  # noqa: E402
+
+
+def make_hits(provider: AzureSearchProvider, count: int) -> list:
+    """Generate synthetic raw hits covering every configured document type."""
+    rng = random.Random(42)
+    doc_type_configs = provider.project_config.document_types
+    hits = []
+    for i in range(count):
+        doc_type_config = doc_type_configs[i % len(doc_type_configs)]
+        hit = {
+            "@search.score": rng.random() * 10,
+            "@search.reranker_score": rng.random() * 4,
+        }
+        for field in doc_type_config.key_fields + doc_type_config.content_fields:
+            hit[field] = f"{field} value {i} " * 8
+        if i % 3 == 0:
+            hit["text_document_id"] = f"text-{i}"
+        if i % 5 == 0:
+            hit["image_document_id"] = f"image-{i}"
+        hit["locationMetadata"] = {"pageNumber": i % 40, "boundingPolygons": "[]"}
+        hits.append((doc_type_config.name, hit))
+    return hits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hits", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    provider = AzureSearchProvider(get_config())
+    doc_types = {doc_type.value: doc_type for doc_type in provider.search_clients}
+
+    # Group hits per document type, as the provider receives them per index
+    grouped = {}
+    for name, hit in make_hits(provider, args.hits):
+        grouped.setdefault(name, []).append(hit)
+
+    legacy = LegacyExtractor(provider.project_config)
+    paths = (
+        ("legacy", lambda hits, doc_type: legacy.process(hits, doc_type, SearchMode.HYBRID)),
+        ("compiled plans", lambda hits, doc_type: provider._process_search_results(
+            hits, doc_type, SearchMode.HYBRID)),
+    )
+
+    print(f"hits: {args.hits}")
+    print(f"{'path':<16}{'best ms':>10}{'mean ms':>10}{'us/hit':>9}{'speedup':>10}")
+    baseline = None
+    for label, process in paths:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            processed = 0
+            for name, hits in grouped.items():
+                processed += len(process(hits, doc_types[name]))
+            timings.append(time.perf_counter() - start)
+        assert processed == args.hits, f"{label} extracted {processed} of {args.hits} hits"
+
+        best = min(timings)
+        baseline = baseline or best
+        print(f"{label:<16}{best * 1000:>10.1f}{sum(timings) / len(timings) * 1000:>10.1f}"
+              f"{best / args.hits * 1e6:>9.2f}{baseline / best:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
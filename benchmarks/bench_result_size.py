@@ -0,0 +1,128 @@
+"""
+Memory and token size of extracted search results.
+
+Decodes synthetic raw hits the way the SDK does (a fresh JSON decode per
+query, so overlapping queries return equal but distinct strings), extracts
+them with ResultExtractor and with the former extraction
+(benchmarks/legacy_extraction.py: no slots, every content field
+also under extracted_fields), and reports the bytes retained per result and
+the estimated tokens per result in the tool output. No network access is
+needed.
+
+Usage:
+    python benchmarks/bench_result_size.py [--queries 50] [--top-k 50] [--corpus 500]
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+logging.disable(logging.WARNING)
+
+from lib.config.project_config import get_project_config  # noqa: E402
+from lib.search.base import DocumentType, SearchMode  # noqa: E402
+from lib.search.dedup import estimate_tokens  # noqa: E402
+from lib.search.extraction import ResultExtractor  # noqa: E402
+from lib.search.serialization import dumps, encode_results, result_to_dict  # noqa: E402
+
+from legacy_extraction import LegacyExtractor  # noqa: E402
+
+WORDS = (
+    "regulatory capital liquidity coverage ratio counterparty exposure stress "
+    "scenario disclosure leverage buffer supervisory review quarterly filing "
+    "deployment endpoint quota region model evaluation").split()
+
+
+def make_corpus(doc_type_config, size: int, chunk_words: int, seed: int = 42) -> list:
+    """Generate raw index documents for one document type as JSON text."""
+    rng = random.Random(seed)
+    titles = [f"Guide {i}: " + " ".join(rng.choice(WORDS) for _ in range(5)) for i in range(size // 10 + 1)]
+    documents = []
+    for i in range(size):
+        document = {}
+        for field in doc_type_config.key_fields + doc_type_config.content_fields:
+            document[field] = f"{field}-{i}"
+        document["chunk"] = " ".join(rng.choice(WORDS) for _ in range(chunk_words))
+        document["title"] = titles[i // 10]
+        document["text_document_id"] = f"text-{i // 10}"
+        if i % 4 == 0:
+            document["image_document_id"] = f"image-{i}"
+        document["locationMetadata"] = {
+            "pageNumber": i % 40,
+            "boundingPolygons": "[[{\"x\":1.0,\"y\":2.0},{\"x\":3.0,\"y\":4.0}]]"
+        }
+        documents.append(json.dumps(document))
+    return documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--corpus", type=int, default=500)
+    parser.add_argument("--chunk-words", type=int, default=120)
+    args = parser.parse_args()
+
+    project_config = get_project_config()
+    doc_type_config = project_config.document_types[0]
+    document_type = DocumentType.from_name(doc_type_config.name)
+    # Search over the multimodal and location fields too
+    doc_type_config.content_fields = list(dict.fromkeys(
+        doc_type_config.content_fields + ["locationMetadata"]))
+    doc_type_config.key_fields = list(dict.fromkeys(
+        doc_type_config.key_fields + ["text_document_id", "image_document_id"]))
+
+    corpus = make_corpus(doc_type_config, args.corpus, args.chunk_words)
+    rng = random.Random(7)
+    samples = [rng.sample(range(len(corpus)), args.top_k) for _ in range(args.queries)]
+
+    extractor = ResultExtractor(project_config)
+    extractor.process([], document_type, SearchMode.HYBRID)  # Compile the plan
+    legacy = LegacyExtractor(project_config)
+    paths = (
+        ("legacy", legacy.process,
+         lambda batch: dumps([result_to_dict(result) for result in batch])),
+        ("current", extractor.process, encode_results),
+    )
+
+    print(f"results: {args.queries * args.top_k} "
+          f"({args.queries} queries x top {args.top_k} of {args.corpus})")
+    print(f"{'shape':<10}{'B/result':>10}{'chars/result':>14}{'tokens/result':>15}")
+    for label, process, encode in paths:
+        retained, results = measure(corpus, samples, document_type, process)
+        count = sum(len(batch) for batch in results)
+        outputs = [encode(batch) for batch in results]
+        tokens = sum(estimate_tokens(output) for output in outputs)
+        characters = sum(len(output) for output in outputs)
+        print(f"{label:<10}{retained / count:>10.0f}{characters / count:>14.0f}{tokens / count:>15.0f}")
+        del results, outputs
+
+
+def measure(corpus: list, samples: list, document_type, process) -> tuple:
+    """Extract every query's hits and return the bytes still held by the results."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    results = []
+    for sample in samples:
+        # Overlapping queries: each returns top_k of the corpus, decoded afresh
+        hits = [json.loads(corpus[index]) for index in sample]
+        for rank, hit in enumerate(hits):
+            hit["@search.score"] = 1.0 / (rank + 1)
+        results.append(process(hits, document_type, SearchMode.HYBRID))
+    # The raw hits are dropped once extracted; only the results stay alive
+    del hits
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return retained, results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Microbenchmark for search tool result serialization.
+
+Builds synthetic SearchResult hits shaped like Azure Search output (chunk
+text, captions and extracted-field metadata) and times the previous path,
+a dict per hit plus json.dumps(indent=2), against encode_results on each
+available JSON backend. Packing (on by default) is timed from per-hit dicts,
+as before, and from the SearchResult objects directly. No network access is
+needed.
+
+Usage:
+    python benchmarks/bench_serialization.py [--hits 200] [--calls 200]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lib.search import serialization  # noqa: E402
+from lib.search.packing import ResultPacker  # noqa: E402
+from lib.search.base import SearchResult  # noqa: E402
+
+WORDS = (
+    "regulatory capital liquidity coverage ratio counterparty exposure stress "
+    "scenario résumé données Überblick 資本 risk-weighted assets disclosure "
+    "leverage buffer supervisory review quarterly filing").split()
+
+
+def make_results(count: int, chunk_words: int, seed: int = 42) -> list:
+    """Generate synthetic search hits with realistic field sizes."""
+    rng = random.Random(seed)
+
+    def text(words: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(words))
+
+    results = []
+    for i in range(count):
+        chunk = text(chunk_words)
+        results.append(SearchResult(
+            content_text=chunk,
+            search_type="reports",
+            search_mode="hybrid",
+            document_title=text(8),
+            content_path=f"reports/annual-{i % 40}.pdf",
+            page_number=i % 120,
+            score=rng.random() * 0.05,
+            reranker_score=rng.random() * 4,
+            captions=[{"text": text(30), "highlights": ""}],
+            metadata={
+                "document_id": f"doc-{i}",
+                "chunk_id": f"doc-{i}_pages_{i % 120}",
+                "fused_score": rng.random() * 0.05,
+                "extracted_fields": {"chunk": chunk, "title": text(8)}
+            }
+        ))
+    return results
+
+
+def previous_path(results: list) -> str:
+    """Serialization as done before: dict per hit, stdlib, indent=2."""
+    return json.dumps(
+        [serialization.result_to_dict(result) for result in results],
+        ensure_ascii=False, indent=2)
+
+
+def best_ms(function, calls: int) -> float:
+    number = max(1, calls // 5)
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hits", type=int, default=200)
+    parser.add_argument("--chunk-words", type=int, default=120)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    results = make_results(args.hits, args.chunk_words)
+    reference = json.loads(previous_path(results))
+
+    baseline = best_ms(lambda: previous_path(results), args.calls)
+    print(f"hits per call: {args.hits}")
+    print(f"{'path':<22}{'ms/call':>10}{'KB/call':>10}{'speedup':>10}")
+    print(f"{'dict + json indent=2':<22}{baseline:>10.2f}"
+          f"{len(previous_path(results).encode()) / 1024:>10.0f}{1.0:>9.1f}x")
+
+    for backend in ("json", "msgspec", "orjson"):
+        if serialization.set_backend(backend) != backend:
+            print(f"{'encode_results/' + backend:<22}{'not installed':>30}")
+            continue
+        encoded = serialization.encode_results(results)
+        assert json.loads(encoded) == reference, f"{backend} output differs"
+        elapsed = best_ms(lambda: serialization.encode_results(results), args.calls)
+        print(f"{'encode_results/' + backend:<22}{elapsed:>10.2f}"
+              f"{len(encoded.encode()) / 1024:>10.0f}{baseline / elapsed:>9.1f}x")
+    serialization.set_backend("auto")
+
+    # Unbounded budget so every hit is shrunk and encoded
+    packer = ResultPacker(max_tokens=10 ** 9)
+    packed_dicts = packer.pack([serialization.result_to_dict(result) for result in results])[0]
+    packed_results = packer.pack(results)[0]
+    assert packed_dicts == packed_results, "packed output differs"
+    for label, function in (
+            ("pack dicts", lambda: packer.pack(
+                [serialization.result_to_dict(result) for result in results])),
+            ("pack results", lambda: packer.pack(results))):
+        elapsed = best_ms(function, args.calls)
+        print(f"{label + '/' + serialization.get_backend():<22}{elapsed:>10.2f}"
+              f"{len(packed_results.encode()) / 1024:>10.0f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Result extraction as it was before per-type extraction plans.
+
+A verbatim copy of the former AzureSearchProvider extraction methods and of
+the former SearchResult (no slots, every content field also kept under
+metadata["extracted_fields"]), used by the benchmarks as the baseline. Config
+lookups, field scans and debug f-strings run for every hit, as they did.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from lib.search.base import DocumentType, SearchMode
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LegacySearchResult:
+    """Search result data structure."""
+    content_text: str
+    search_type: str
+    search_mode: str
+    document_title: Optional[str] = None
+    content_path: Optional[str] = None
+    page_number: Optional[int] = None
+    score: Optional[float] = None
+    reranker_score: Optional[float] = None
+    highlights: Optional[Dict[str, Any]] = None
+    captions: Optional[List[Dict[str, Any]]] = None
+    answers: Optional[List[Dict[str, Any]]] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class LegacyExtractor:
+    """Per-hit, per-field extraction with config lookups on every hit."""
+
+    def __init__(self, project_config: Any):
+        self.project_config = project_config
+
+    def process(
+        self,
+        search_results: Any,
+        document_type: DocumentType,
+        search_mode: SearchMode
+    ) -> List[LegacySearchResult]:
+        """Process raw search results into SearchResult objects with multimodal support."""
+        results = []
+
+        # Get content_fields from project config for this document type
+        content_fields = self._get_content_fields_for_document_type(document_type)
+        logger.debug(f"Content fields for {document_type.value}: {content_fields}")
+
+        for result in search_results:
+            # Extract content text using configured content_fields
+            content_text = self._extract_content_text(result, content_fields)
+            if not content_text:
+                continue
+
+            # Create search result
+            search_result = LegacySearchResult(
+                content_text=content_text,
+                search_type=self._get_search_type_name(document_type),
+                search_mode=search_mode.value
+            )
+
+            # Extract all configured content fields
+            self._extract_configured_fields(result, search_result, content_fields)
+
+            # Enhanced multimodal metadata extraction
+            self._extract_multimodal_metadata(result, search_result, document_type)
+
+            # Extract location metadata using configured fields
+            self._extract_location_metadata(result, search_result, content_fields)
+
+            # Search scores
+            if "@search.score" in result:
+                search_result.score = result["@search.score"]
+            if "@search.reranker_score" in result:
+                search_result.reranker_score = result["@search.reranker_score"]
+            if "@search.highlights" in result:
+                search_result.highlights = result["@search.highlights"]
+            if "@search.captions" in result:
+                search_result.captions = result["@search.captions"]
+            if "@search.answers" in result:
+                search_result.answers = result["@search.answers"]
+
+            # Document type-specific metadata extraction
+            metadata = getattr(document_type, 'get_metadata', lambda: {})()
+            if metadata and metadata.get('category') == 'list':
+                # Extract all available fields from content_fields configuration
+                structured_metadata = {}
+
+                for field in content_fields:
+                    if field in result and result[field] is not None:
+                        structured_metadata[field] = result[field]
+
+                if structured_metadata:
+                    if search_result.metadata is None:
+                        search_result.metadata = {}
+                    search_result.metadata.update(structured_metadata)
+                    logger.debug(f"Extracted structured metadata: {list(structured_metadata.keys())}")
+
+            results.append(search_result)
+
+        logger.info(f"Processed {len(results)} search results using configuration-driven field extraction")
+        return results
+
+    def _get_content_fields_for_document_type(self, document_type: DocumentType) -> List[str]:
+        """Get content_fields configuration for specific document type."""
+        if not self.project_config:
+            return []
+
+        document_type_value = getattr(document_type, 'value', str(document_type))
+        for doc_type_config in self.project_config.document_types:
+            if doc_type_config.name == document_type_value:
+                return doc_type_config.content_fields
+
+        return []
+
+    def _get_key_fields_for_document_type(self, document_type: DocumentType) -> List[str]:
+        """Get key_fields configuration for specific document type."""
+        if not self.project_config:
+            return []
+
+        document_type_value = getattr(document_type, 'value', str(document_type))
+        for doc_type_config in self.project_config.document_types:
+            if doc_type_config.name == document_type_value:
+                return doc_type_config.key_fields
+
+        return []
+
+    def _get_search_type_name(self, document_type: DocumentType) -> str:
+        """Get human-readable search type name from project configuration."""
+        if self.project_config:
+            document_type_value = getattr(
+                document_type, 'value', str(document_type))
+            for doc_type_config in self.project_config.document_types:
+                if doc_type_config.name == document_type_value:
+                    return doc_type_config.display_name_en
+
+        # If no project config or type not found, use enum value
+        return getattr(document_type, 'value', str(document_type))
+
+    def _extract_multimodal_metadata(
+            self, result: Dict[str, Any], search_result: LegacySearchResult, document_type: DocumentType) -> None:
+        """Extract multimodal-specific metadata from search results."""
+        if search_result.metadata is None:
+            search_result.metadata = {}
+
+        # Get key_fields from project config to determine filterable fields
+        key_fields = self._get_key_fields_for_document_type(document_type)
+        logger.debug(f"Key fields for {document_type.value}: {key_fields}")
+
+        # Extract multimodal identifiers from key_fields and result
+        multimodal_fields = []
+        for field in key_fields:
+            if any(identifier in field.lower() for identifier in ['text_document_id', 'image_document_id', 'content_id']):
+                multimodal_fields.append(field)
+
+        logger.debug(f"Multimodal fields detected from key_fields: {multimodal_fields}")
+
+        # Add configured multimodal fields to metadata
+        for field in multimodal_fields:
+            if field in result and result[field] is not None:
+                search_result.metadata[field] = result[field]
+
+        # Identify content type based on document IDs
+        has_text_content = result.get("text_document_id") is not None
+        has_image_content = result.get("image_document_id") is not None
+
+        if has_text_content and not has_image_content:
+            search_result.metadata["content_type"] = "text"
+        elif has_image_content and not has_text_content:
+            search_result.metadata["content_type"] = "image"
+            # Add image verbalization indicator
+            if "content_text" in result:
+                search_result.metadata["is_image_verbalization"] = True
+                search_result.metadata["description"] = "Image content described in natural language"
+        elif has_text_content and has_image_content:
+            search_result.metadata["content_type"] = "mixed"
+        else:
+            search_result.metadata["content_type"] = "unknown"
+
+        # Log multimodal content detection
+        content_type = search_result.metadata.get("content_type", "unknown")
+        logger.debug(f"Detected {content_type} content in search result")
+
+    def _extract_content_text(self, result: Dict[str, Any], content_fields: List[str]) -> str:
+        """Extract main content text using configured content_fields."""
+        # Priority order for main content (generic field names only)
+        content_priority = ["content_text", "chunk", "text", "description", "content"]
+
+        for field in content_priority:
+            if field in content_fields and field in result and result[field]:
+                logger.debug(f"Selected main content field: '{field}' (priority match)")
+                return str(result[field])
+
+        # Use first available content field
+        for field in content_fields:
+            if field in result and result[field]:
+                logger.debug(f"Selected main content field: '{field}' (first available)")
+                return str(result[field])
+
+        logger.debug("No suitable content field found for main content")
+        return ""
+
+    def _extract_configured_fields(
+            self, result: Dict[str, Any], search_result: LegacySearchResult, content_fields: List[str]) -> None:
+        """Extract all configured content fields into search result."""
+        if search_result.metadata is None:
+            search_result.metadata = {}
+
+        # Extract all content_fields into metadata
+        extracted_fields = {}
+        for field in content_fields:
+            if field in result and result[field] is not None:
+                extracted_fields[field] = result[field]
+
+                # Set specific fields to SearchResult properties if they match
+                if field == "document_title":
+                    search_result.document_title = result[field]
+                elif field == "content_path":
+                    search_result.content_path = result[field]
+
+        # Add all extracted fields to metadata
+        search_result.metadata["extracted_fields"] = extracted_fields
+
+        # Log what fields were extracted
+        logger.debug(f"Extracted fields: {list(extracted_fields.keys())}")
+
+    def _extract_location_metadata(
+            self, result: Dict[str, Any], search_result: LegacySearchResult, content_fields: List[str]) -> None:
+        """Extract location metadata using configured content fields."""
+        # Look for location-related fields in content_fields
+        location_fields = []
+        for field in content_fields:
+            if any(location_term in field.lower() for location_term in ['location', 'metadata', 'page', 'polygon']):
+                location_fields.append(field)
+
+        logger.debug(f"Location fields detected from content_fields: {location_fields}")
+
+        # Extract location metadata
+        for field in location_fields:
+            if field in result and result[field] is not None:
+                if field == "locationMetadata" and isinstance(result[field], dict):
+                    # Handle nested locationMetadata
+                    location_meta = result[field]
+                    if "pageNumber" in location_meta:
+                        search_result.page_number = location_meta["pageNumber"]
+                    if "boundingPolygons" in location_meta:
+                        if search_result.metadata is None:
+                            search_result.metadata = {}
+                        search_result.metadata["boundingPolygons"] = location_meta["boundingPolygons"]
+                    # Add entire locationMetadata to metadata
+                    if search_result.metadata is None:
+                        search_result.metadata = {}
+                    search_result.metadata["locationMetadata"] = location_meta
+                elif field == "pageNumber":
+                    # Direct page number field
+                    search_result.page_number = result[field]
+                elif field == "boundingPolygons":
+                    # Direct bounding polygons field
+                    if search_result.metadata is None:
+                        search_result.metadata = {}
+                    search_result.metadata["boundingPolygons"] = result[field]
+                else:
+                    # Other location-related fields
+                    if search_result.metadata is None:
+                        search_result.metadata = {}
+                    search_result.metadata[field] = result[field]
+
+        # Log location metadata extraction
+        if hasattr(search_result, 'page_number') and search_result.page_number:
+            logger.debug(f"Extracted page number: {search_result.page_number}")
+        if search_result.metadata and any(key in search_result.metadata for key in ['boundingPolygons', 'locationMetadata']):
+            logger.debug("Extracted location metadata information")
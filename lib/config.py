@@ -72,6 +72,10 @@ class Config:
         self.azure_search_endpoint = os.getenv("AZURE_SEARCH_ENDPOINT", "")
         self.azure_search_api_key = os.getenv("AZURE_SEARCH_API_KEY", "")
         self.azure_search_index_name = os.getenv("AZURE_SEARCH_INDEX_NAME", "")
+        self.azure_search_max_connections = int(
+            os.getenv("AZURE_SEARCH_MAX_CONNECTIONS", "100"))
+        self.azure_search_keepalive_timeout = int(
+            os.getenv("AZURE_SEARCH_KEEPALIVE_TIMEOUT", "30"))  # Seconds
 
         # Tavily API Configuration for web search
         self.tavily_api_key = os.getenv("TAVILY_API_KEY", "")
@@ -4,7 +4,7 @@ Handles loading and parsing of the new agent-centric project_config.yaml structu
 """
 import logging
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
 import yaml
@@ -63,6 +63,187 @@ class SearchDefaultConfig:
     fallback_to_simple: bool = True
 
 
+@dataclass
+class SearchFanoutConfig:
+    """Concurrent multi-index search (search_all) configuration."""
+    enabled: bool = True
+    max_concurrency: int = 8
+    per_index_timeout: float = 20.0
+
+
+@dataclass
+class LeanQueryConfig:
+    """Field projection and payload trimming for Azure AI Search queries."""
+    enabled: bool = True
+    include_total_count: bool = False
+    extra_select_fields: List[str] = field(default_factory=list)
+
+
+@dataclass
+class DeepRetrievalConfig:
+    """Concurrent skip/top paging for requests larger than one page."""
+    enabled: bool = True
+    page_size: int = 50
+    max_concurrent_pages: int = 4
+    max_results: int = 200
+    # Early-stop thresholds on @search.score, whose scale differs per mode
+    min_text_score: float = 0.0
+    min_hybrid_score: float = 0.0
+
+
+@dataclass
+class LocalSearchConfig:
+    """Offline BM25 + vector search over local chunk files."""
+    enabled: bool = False
+    data_dir: str = "data/local_search"
+    embedding: str = "hashing"
+    embedding_dim: int = 384
+    embedding_batch_size: int = 64
+    chunk_chars: int = 1200
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
+    rrf_k: int = 60
+
+
+@dataclass
+class SearchFusionConfig:
+    """Cross-index score fusion and global top-K for search_all."""
+    enabled: bool = True
+    method: str = "rrf"
+    top_k: int = 30
+    rrf_k: int = 60
+    prefer_reranker: bool = True
+
+
+@dataclass
+class EmbeddingCacheConfig:
+    """Query-embedding cache configuration."""
+    enabled: bool = True
+    max_entries: int = 10000
+    ttl_seconds: float = 86400.0
+    disk_path: str = ""
+    disk_max_entries: int = 100000
+
+
+@dataclass
+class EmbeddingBatchingConfig:
+    """Micro-batching of concurrent embedding requests."""
+    enabled: bool = True
+    max_batch_size: int = 16
+    max_wait_ms: float = 5.0
+
+
+@dataclass
+class SearchResultCacheConfig:
+    """SearchManager result cache and in-flight query deduplication."""
+    enabled: bool = True
+    max_entries: int = 512
+    ttl_seconds: float = 300.0
+    provider_ttl_seconds: Dict[str, float] = field(
+        default_factory=lambda: {"web": 60.0})
+
+
+@dataclass
+class WebResultCacheConfig:
+    """Persistent SQLite cache of web search responses."""
+    enabled: bool = True
+    path: str = ".cache/web_search.db"
+    max_entries: int = 5000
+    ttl_seconds: float = 604800.0
+    ttl_by_time_range: Dict[str, float] = field(
+        default_factory=lambda: {
+            "day": 3600.0, "week": 21600.0, "month": 86400.0, "year": 604800.0})
+
+
+@dataclass
+class WebContentConfig:
+    """Streaming page fetch and chunking for web results with raw content."""
+    enabled: bool = True
+    max_pages: int = 5
+    fetch_concurrency: int = 5
+    fetch_timeout: float = 10.0
+    max_page_chars: int = 200000
+    chunk_chars: int = 1000
+    chunk_overlap: int = 150
+    max_chunks_per_page: int = 3
+    max_redirects: int = 5
+
+
+@dataclass
+class DedupConfig:
+    """Near-duplicate collapsing of search hits across indexes and providers."""
+    enabled: bool = True
+    similarity_threshold: float = 0.8
+    num_perm: int = 64
+    shingle_size: int = 3
+
+
+@dataclass
+class ResultPackingConfig:
+    """Token-budgeted packing of search tool outputs."""
+    enabled: bool = True
+    max_tokens: int = 6000
+    max_content_chars: int = 1500
+    min_content_chars: int = 200
+
+
+@dataclass
+class MultimodalSearchConfig:
+    """Content-type selection for multimodal search."""
+    filter_pushdown: bool = True
+    initial_overfetch: float = 2.0
+    max_overfetch: float = 4.0
+
+
+@dataclass
+class IndexCapabilityConfig:
+    """Cached per-index schema capabilities and negative caching of failures."""
+    enabled: bool = True
+    refresh_seconds: float = 3600.0
+    probe_failure_ttl: float = 60.0
+    semantic_failure_ttl: float = 900.0
+    vectorizer_failure_ttl: float = 900.0
+
+
+@dataclass
+class VectorizationConfig:
+    """Server-side query vectorization through index vectorizers (opt-in)."""
+    enabled: bool = False
+    fallback_to_client: bool = True
+
+
+@dataclass
+class SemanticCacheConfig:
+    """Reuse of search results for near-identical (paraphrased) hybrid queries (opt-in)."""
+    enabled: bool = False
+    similarity_threshold: float = 0.98
+    max_entries: int = 1024
+    ttl_seconds: float = 300.0
+
+
+@dataclass
+class HedgingConfig:
+    """Hedged Azure Search requests for tail-latency control (opt-in)."""
+    enabled: bool = False
+    percentile: float = 95.0
+    min_samples: int = 20
+    window: int = 200
+    min_delay_ms: float = 50.0
+    budget_ratio: float = 0.1
+
+
+@dataclass
+class ProviderHealthConfig:
+    """Per-provider/index health tracking, circuit breakers and routing."""
+    enabled: bool = True
+    ewma_alpha: float = 0.2
+    failure_threshold: int = 5
+    error_rate_threshold: float = 0.5
+    min_requests: int = 10
+    open_seconds: float = 30.0
+    error_penalty: float = 4.0
+
+
 @dataclass
 class ExtractionConfig:
     """Content extraction configuration."""
@@ -231,6 +412,12 @@ class WebSearchConfig:
     fallback_enabled: bool = True
     max_results: int = 10
     timeout: int = 30
+    api_url: str = "https://api.tavily.com"
+    requests_per_minute: int = 100
+    burst: int = 5
+    latency_budget: float = 20.0
+    retry_base_delay: float = 0.5
+    max_connections: int = 10
 
 
 @dataclass
@@ -246,6 +433,27 @@ class SearchConfig:
     default_settings: SearchDefaultConfig
     extraction: ExtractionConfig
     examples: Dict[str, SearchExampleConfig]
+    fanout: SearchFanoutConfig = field(default_factory=SearchFanoutConfig)
+    fusion: SearchFusionConfig = field(default_factory=SearchFusionConfig)
+    lean_query: LeanQueryConfig = field(default_factory=LeanQueryConfig)
+    deep_retrieval: DeepRetrievalConfig = field(default_factory=DeepRetrievalConfig)
+    local: LocalSearchConfig = field(default_factory=LocalSearchConfig)
+    embedding_cache: EmbeddingCacheConfig = field(
+        default_factory=EmbeddingCacheConfig)
+    embedding_batching: EmbeddingBatchingConfig = field(
+        default_factory=EmbeddingBatchingConfig)
+    result_cache: SearchResultCacheConfig = field(
+        default_factory=SearchResultCacheConfig)
+    web_cache: WebResultCacheConfig = field(default_factory=WebResultCacheConfig)
+    web_content: WebContentConfig = field(default_factory=WebContentConfig)
+    dedup: DedupConfig = field(default_factory=DedupConfig)
+    packing: ResultPackingConfig = field(default_factory=ResultPackingConfig)
+    capabilities: IndexCapabilityConfig = field(default_factory=IndexCapabilityConfig)
+    multimodal: MultimodalSearchConfig = field(default_factory=MultimodalSearchConfig)
+    vectorization: VectorizationConfig = field(default_factory=VectorizationConfig)
+    semantic_cache: SemanticCacheConfig = field(default_factory=SemanticCacheConfig)
+    hedging: HedgingConfig = field(default_factory=HedgingConfig)
+    health: ProviderHealthConfig = field(default_factory=ProviderHealthConfig)
 
     @property
     def default_top_k(self) -> int:
@@ -344,7 +552,29 @@ class ProjectConfig:
             examples={
                 name: SearchExampleConfig(**config)
                 for name, config in search_config.get('examples', {}).items()
-            }
+            },
+            fanout=SearchFanoutConfig(**search_config.get('fanout', {})),
+            fusion=SearchFusionConfig(**search_config.get('fusion', {})),
+            lean_query=LeanQueryConfig(**search_config.get('lean_query', {})),
+            deep_retrieval=DeepRetrievalConfig(
+                **search_config.get('deep_retrieval', {})),
+            local=LocalSearchConfig(**search_config.get('local', {})),
+            embedding_cache=EmbeddingCacheConfig(
+                **search_config.get('embedding_cache', {})),
+            embedding_batching=EmbeddingBatchingConfig(
+                **search_config.get('embedding_batching', {})),
+            result_cache=SearchResultCacheConfig(
+                **search_config.get('result_cache', {})),
+            web_cache=WebResultCacheConfig(**search_config.get('web_cache', {})),
+            web_content=WebContentConfig(**search_config.get('web_content', {})),
+            dedup=DedupConfig(**search_config.get('dedup', {})),
+            packing=ResultPackingConfig(**search_config.get('packing', {})),
+            capabilities=IndexCapabilityConfig(**search_config.get('capabilities', {})),
+            multimodal=MultimodalSearchConfig(**search_config.get('multimodal', {})),
+            vectorization=VectorizationConfig(**search_config.get('vectorization', {})),
+            semantic_cache=SemanticCacheConfig(**search_config.get('semantic_cache', {})),
+            hedging=HedgingConfig(**search_config.get('hedging', {})),
+            health=ProviderHealthConfig(**search_config.get('health', {}))
         )
         self.search = self.search_config.default_settings
         self.extraction = self.search_config.extraction
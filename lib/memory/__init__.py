@@ -10,7 +10,8 @@ from .manager import MemoryManager
 # Semantic Kernel integration
 from .plugin import MemoryPlugin
 # Utilities
-from .utils import (create_azure_openai_text_embedding, create_memory_metadata,
+from .utils import (CachedOpenAITextEmbedding,
+                    create_azure_openai_text_embedding, create_memory_metadata,
                     format_memory_results)
 
 
@@ -25,6 +26,7 @@ __all__ = [
     'MemoryPlugin',
 
     # Utilities
+    'CachedOpenAITextEmbedding',
     'create_azure_openai_text_embedding',
     'format_memory_results',
     'create_memory_metadata',
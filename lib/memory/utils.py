@@ -3,13 +3,79 @@ Memory utilities for Azure OpenAI integration.
 Provides factory functions and common utilities for memory operations.
 """
 import logging
+from typing import Any, List, Optional
 
 from openai import AsyncAzureOpenAI
 from semantic_kernel.connectors.ai.open_ai import OpenAITextEmbedding
 
+from ..search.embedding_batcher import EmbeddingBatcher, create_embedding_batcher
+from ..search.embedding_cache import get_embedding_cache
+
 logger = logging.getLogger(__name__)
 
 
+class CachedOpenAITextEmbedding(OpenAITextEmbedding):
+    """
+    OpenAI text embedding service backed by the shared embedding cache.
+
+    Cache misses are routed through this service's own embedding batcher so
+    concurrent memory writes share batched requests.
+    """
+
+    # Created on first use; None when batching is disabled
+    _batcher: Optional[EmbeddingBatcher] = None
+    _batcher_created: bool = False
+
+    async def generate_raw_embeddings(
+        self,
+        texts: List[str],
+        settings: Any = None,
+        batch_size: int = None,
+        **kwargs: Any
+    ) -> Any:
+        """Return cached embeddings and generate only the missing ones."""
+        # Custom settings (e.g. dimensions) change the vectors - bypass cache
+        if settings is not None or kwargs:
+            return await super().generate_raw_embeddings(
+                texts, settings, batch_size, **kwargs)
+
+        cache = get_embedding_cache()
+        if cache is not None:
+            embeddings = await cache.get_many(self.ai_model_id, texts)
+        else:
+            embeddings = [None] * len(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            batcher = self._get_batcher()
+            if batcher is not None:
+                generated = await batcher.embed_many(missing_texts)
+            else:
+                generated = await self._generate_uncached(missing_texts)
+            for i, embedding in zip(missing, generated):
+                if not embedding:
+                    raise ValueError(f"Failed to generate embedding for memory text {i}")
+                embeddings[i] = list(embedding)
+            if cache is not None:
+                await cache.put_many(
+                    self.ai_model_id, missing_texts, [embeddings[i] for i in missing])
+
+        logger.debug(
+            f"Embedding cache served {len(texts) - len(missing)}/{len(texts)} memory embeddings")
+        return embeddings
+
+    def _get_batcher(self) -> Optional[EmbeddingBatcher]:
+        """Get the batcher bound to this service's client."""
+        if not self._batcher_created:
+            self._batcher = create_embedding_batcher(self._generate_uncached)
+            self._batcher_created = True
+        return self._batcher
+
+    async def _generate_uncached(self, texts: List[str]) -> List[List[float]]:
+        """Request embeddings from Azure OpenAI without the cache."""
+        return await OpenAITextEmbedding.generate_raw_embeddings(self, texts)
+
+
 def create_azure_openai_text_embedding(
     api_key: str,
     endpoint: str,
@@ -28,7 +94,8 @@ def create_azure_openai_text_embedding(
         service_id: Service identifier for the embedding service
 
     Returns:
-        OpenAITextEmbedding: Configured embedding service
+        OpenAITextEmbedding: Configured embedding service backed by the shared
+        embedding cache
     """
     logger.debug(f"Creating Azure OpenAI text embedding service: {service_id}")
     logger.debug(f"Deployment: {deployment_name}, Endpoint: {endpoint}")
@@ -39,7 +106,7 @@ def create_azure_openai_text_embedding(
         api_version=api_version
     )
 
-    embedding_service = OpenAITextEmbedding(
+    embedding_service = CachedOpenAITextEmbedding(
         ai_model_id=deployment_name,
         async_client=azure_client,
         service_id=service_id
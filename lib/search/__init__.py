@@ -12,9 +12,9 @@ Usage:
     from lib.search import ModularSearchPlugin
     plugin = ModularSearchPlugin()
 
-    # Use the search manager directly for advanced scenarios
-    from lib.search import SearchManager, SearchQuery, DocumentType
-    manager = SearchManager(config)
+    # Use the shared search manager directly for advanced scenarios
+    from lib.search import get_search_manager, SearchQuery, DocumentType
+    manager = get_search_manager()
     # Use from_name to get document type dynamically
     doc_type = DocumentType.from_name("category_a")
     results = await manager.search(SearchQuery("query"), doc_type)
@@ -24,12 +24,25 @@ Usage:
     provider = AzureSearchProvider(config)
 """
 
-from .base import (DocumentType, EmbeddingProvider, SearchMode, SearchProvider,
-                   SearchQuery, SearchResult, SearchStatistics)
-from .manager import SearchManager
+from .base import (DocumentType, DynamicDocumentType, EmbeddingProvider,
+                   SearchMode, SearchProvider, SearchQuery, SearchResult,
+                   SearchStatistics)
+from .dedup import NearDuplicateDetector, collapse_duplicates
+from .embedding_batcher import (BatchingEmbeddingProvider, EmbeddingBatcher,
+                                create_embedding_batcher)
+from .embedding_cache import (CachedEmbeddingProvider, EmbeddingCache,
+                              get_embedding_cache)
+from .fusion import fuse_results
+from .health import CircuitOpenError, HealthTracker
+from .manager import SearchManager, close_search_managers, get_search_manager
+from .packing import ResultPacker
 from .plugin import ModularSearchPlugin
 from .providers import (AzureEmbeddingProvider, AzureSearchProvider,
-                        WebSearchProvider)
+                        LocalSearchProvider, WebSearchProvider)
+from .rate_limit import RateLimitedError, TokenBucket, get_rate_limiter
+from .result_cache import SearchResultCache
+from .semantic_cache import SemanticQueryCache
+from .serialization import encode_results
 
 __all__ = [
     # Base classes and models
@@ -39,14 +52,44 @@ __all__ = [
     'SearchResult',
     'SearchStatistics',
     'DocumentType',
+    'DynamicDocumentType',
     'SearchMode',
 
+    # Caching
+    'EmbeddingCache',
+    'CachedEmbeddingProvider',
+    'get_embedding_cache',
+    'EmbeddingBatcher',
+    'BatchingEmbeddingProvider',
+    'create_embedding_batcher',
+    'SearchResultCache',
+    'SemanticQueryCache',
+
+    # Ranking
+    'fuse_results',
+    'NearDuplicateDetector',
+    'collapse_duplicates',
+
+    # Resilience
+    'HealthTracker',
+    'CircuitOpenError',
+    'TokenBucket',
+    'RateLimitedError',
+    'get_rate_limiter',
+
+    # Tool output
+    'ResultPacker',
+    'encode_results',
+
     # Main components
     'SearchManager',
     'ModularSearchPlugin',
+    'close_search_managers',
+    'get_search_manager',
 
     # Providers
     'AzureSearchProvider',
     'AzureEmbeddingProvider',
+    'LocalSearchProvider',
     'WebSearchProvider'
 ]
@@ -1,8 +1,9 @@
 """
 Abstract base classes for search providers.
 """
+import asyncio
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
@@ -60,6 +61,49 @@ class DocumentType(Enum):
         # Allow dynamic creation of document types from project config
         return None
 
+    @classmethod
+    def _registry(cls) -> Dict[str, Any]:
+        """Get the interned type registry, building it on first use."""
+        global _document_type_registry
+        if _document_type_registry is None:
+            registry = {}
+
+            # Add static types
+            for member in cls:
+                registry[member.value] = member
+
+            # Add configured types, one shared object per name
+            for name, value in cls.get_configured_types().items():
+                if value not in registry:
+                    registry[value] = DynamicDocumentType(value, name)
+
+            # Also resolve upper-case names (e.g. "WEB_SEARCH")
+            for value, doc_type in list(registry.items()):
+                registry.setdefault(doc_type.name, doc_type)
+
+            _document_type_registry = registry
+        return _document_type_registry
+
+    @classmethod
+    def reload_registry(cls) -> None:
+        """Rebuild the type registry on next use (after a config reload)."""
+        global _document_type_registry
+        _document_type_registry = None
+
+    @classmethod
+    def resolve(cls, document_type: Any) -> Optional[Any]:
+        """
+        Get the interned document type for a name, value or type object.
+
+        Args:
+            document_type: Type name/value string or any document type object
+
+        Returns:
+            Shared document type object, or None if unknown
+        """
+        key = getattr(document_type, 'value', document_type)
+        return cls._registry().get(key)
+
     @classmethod
     def get_configured_types(cls):
         """Get document types from project configuration."""
@@ -78,40 +122,11 @@ class DocumentType(Enum):
     @classmethod
     def get_all_types(cls):
         """Get all available document types (static + configured)."""
-        all_types = {}
-
-        # Add static types
-        for member in cls:
-            all_types[member.value] = member
-
-        # Add configured types
-        configured = cls.get_configured_types()
-        for name, value in configured.items():
-            if value not in all_types:
-                # Create dynamic enum-like object with proper equality
-                class DynamicDocumentType:
-                    def __init__(self, value, name):
-                        self.value = value
-                        self.name = name.upper()
-
-                    def __eq__(self, other):
-                        if isinstance(other, DocumentType):
-                            return self.value == other.value
-                        elif hasattr(other, 'value'):
-                            return self.value == other.value
-                        elif isinstance(other, str):
-                            return self.value == other
-                        return False
-
-                    def __hash__(self):
-                        return hash(self.value)
-
-                    def get_metadata(self):
-                        return cls._get_metadata_for_type(self.value)
-
-                all_types[value] = DynamicDocumentType(value, name)
-
-        return all_types
+        return {
+            doc_type.value: doc_type
+            for key, doc_type in cls._registry().items()
+            if key == doc_type.value
+        }
 
     def get_metadata(self):
         """Get metadata for this document type from project configuration."""
@@ -177,37 +192,11 @@ class DocumentType(Enum):
     @classmethod
     def from_name(cls, name: str):
         """Get DocumentType enum from string name."""
-        # Check static types first
-        for member in cls:
-            if member.value == name:
-                return member
+        doc_type = cls._registry().get(name)
+        if doc_type is not None:
+            return doc_type
 
-        # Check configured types
         configured_types = cls.get_configured_types()
-        if name in configured_types:
-            # Create a dynamic type object with proper equality
-            class DynamicDocumentType:
-                def __init__(self, value, name):
-                    self.value = value
-                    self.name = name.upper()
-
-                def __eq__(self, other):
-                    if isinstance(other, DocumentType):
-                        return self.value == other.value
-                    elif hasattr(other, 'value'):
-                        return self.value == other.value
-                    elif isinstance(other, str):
-                        return self.value == other
-                    return False
-
-                def __hash__(self):
-                    return hash(self.value)
-
-                def get_metadata(self):
-                    return cls._get_metadata_for_type(self.value)
-
-            return DynamicDocumentType(name, name)
-
         raise ValueError(f"Unknown document type: {name}. Available static types: {
                          [m.value for m in cls]}, Configured types: {list(configured_types.keys())}")
 
@@ -261,6 +250,42 @@ class DocumentType(Enum):
                 f"Document type '{name}' not found in configuration")
 
 
+class DynamicDocumentType:
+    """Document type defined in project configuration rather than the enum."""
+
+    __slots__ = ("value", "name", "_metadata")
+
+    def __init__(self, value: str, name: str):
+        self.value = value
+        self.name = name.upper()
+        self._metadata = None
+
+    def __eq__(self, other):
+        if isinstance(other, DocumentType):
+            return self.value == other.value
+        elif hasattr(other, 'value'):
+            return self.value == other.value
+        elif isinstance(other, str):
+            return self.value == other
+        return False
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return f"<DynamicDocumentType.{self.name}: '{self.value}'>"
+
+    def get_metadata(self):
+        """Get metadata from project configuration (resolved once)."""
+        if self._metadata is None:
+            self._metadata = DocumentType._get_metadata_for_type(self.value)
+        return self._metadata
+
+
+# Interned document types keyed by value and upper-case name, built lazily
+_document_type_registry: Optional[Dict[str, Any]] = None
+
+
 @dataclass
 class SearchQuery:
     """Search query parameters."""
@@ -270,11 +295,21 @@ class SearchQuery:
     use_hybrid_search: bool = True
     use_semantic_search: bool = True
     document_type: Optional[DocumentType] = None
+    # Precomputed query embedding, shared across indexes by search_all
+    vector: Optional[List[float]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
-    """Search result data structure."""
+    """
+    Search result data structure.
+
+    Every value of a hit is stored once: the main content field lives only in
+    content_text (named by content_field), the title, path and page number in
+    their own fields, and metadata["extracted_fields"] holds just the content
+    fields not represented elsewhere. get_extracted_fields() rebuilds the full
+    field map on demand.
+    """
     content_text: str
     search_type: str
     search_mode: str
@@ -287,6 +322,41 @@ class SearchResult:
     captions: Optional[List[Dict[str, Any]]] = None
     answers: Optional[List[Dict[str, Any]]] = None
     metadata: Optional[Dict[str, Any]] = None
+    # Index field that supplied content_text, if any
+    content_field: Optional[str] = field(default=None, repr=False)
+
+    def get_extracted_fields(self, field_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Materialize every content field extracted from the hit.
+
+        Args:
+            field_names: Content fields of the document type, to also collect
+                fields kept at the top level of metadata (list-category types)
+
+        Returns:
+            Field name to value, as the index returned them
+        """
+        metadata = self.metadata or {}
+        fields: Dict[str, Any] = {}
+        if self.content_field:
+            fields[self.content_field] = self.content_text
+        if self.document_title is not None:
+            fields["document_title"] = self.document_title
+        if self.content_path is not None:
+            fields["content_path"] = self.content_path
+        fields.update(metadata.get("extracted_fields") or {})
+        for name in field_names or ():
+            if name not in fields and metadata.get(name) is not None:
+                fields[name] = metadata[name]
+
+        location = dict(metadata.get("locationMetadata") or {})
+        if "boundingPolygons" in metadata:
+            location.setdefault("boundingPolygons", metadata["boundingPolygons"])
+        if location:
+            if self.page_number is not None:
+                location.setdefault("pageNumber", self.page_number)
+            fields["locationMetadata"] = location
+        return fields
 
 
 @dataclass
@@ -360,6 +430,10 @@ class SearchProvider(ABC):
         """Get list of supported document types."""
         pass
 
+    async def close(self) -> None:
+        """Release network resources held by the provider."""
+        pass
+
 
 class EmbeddingProvider(ABC):
     """Abstract base class for embedding providers."""
@@ -376,3 +450,23 @@ class EmbeddingProvider(ABC):
             Embedding vector
         """
         pass
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embedding vectors for several texts.
+
+        Providers with a native batch endpoint should override this; the
+        default issues one generate_embedding call per text concurrently.
+
+        Args:
+            texts: Texts to generate embeddings for
+
+        Returns:
+            Embedding vectors in the same order as texts
+        """
+        return list(await asyncio.gather(
+            *(self.generate_embedding(text) for text in texts)))
+
+    async def close(self) -> None:
+        """Release network resources held by the provider."""
+        pass
@@ -0,0 +1,241 @@
+"""
+Per-index capability cache for Azure AI Search.
+
+Each index schema is read once (lazily or through an explicit probe) and
+refreshed periodically. Queries are then built from what the index is known
+to support: semantic configurations, vector fields and their vectorizers, and
+filterable fields. Semantic rankers and vectorizers that fail at query time
+are cached negatively, so later calls skip the failing round trip.
+
+Reading a schema needs an admin key. With a query key the probe is refused
+once and not retried for the life of the process; queries are then built
+without capability checks, as if the cache were disabled. Concurrent probes
+of the same index share one request.
+"""
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from azure.core.exceptions import ClientAuthenticationError, HttpResponseError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexCapabilities:
+    """What one index supports, as read from its schema."""
+    index_name: str
+    fields: Dict[str, str] = field(default_factory=dict)
+    subfields: Dict[str, List[str]] = field(default_factory=dict)
+    filterable_fields: Set[str] = field(default_factory=set)
+    vector_fields: Dict[str, Optional[str]] = field(default_factory=dict)
+    vectorizer_kinds: Dict[str, str] = field(default_factory=dict)
+    semantic_configs: List[str] = field(default_factory=list)
+    fetched_at: float = 0.0
+
+    @classmethod
+    def from_index(cls, index: Any) -> "IndexCapabilities":
+        """Build capabilities from a SearchIndex model."""
+        capabilities = cls(index_name=index.name, fetched_at=time.monotonic())
+
+        vector_search = index.vector_search
+        profiles = {}
+        if vector_search is not None:
+            capabilities.vectorizer_kinds = {
+                vectorizer.vectorizer_name: str(getattr(vectorizer.kind, "value", vectorizer.kind))
+                for vectorizer in vector_search.vectorizers or []}
+            profiles = {
+                profile.name: profile.vectorizer_name
+                for profile in vector_search.profiles or []}
+
+        for search_field in index.fields or []:
+            capabilities.fields[search_field.name] = str(search_field.type)
+            if search_field.filterable:
+                capabilities.filterable_fields.add(search_field.name)
+            if search_field.fields:
+                capabilities.subfields[search_field.name] = [
+                    subfield.name for subfield in search_field.fields]
+                capabilities.filterable_fields.update(
+                    f"{search_field.name}/{subfield.name}"
+                    for subfield in search_field.fields if subfield.filterable)
+            if search_field.vector_search_profile_name:
+                vectorizer = profiles.get(search_field.vector_search_profile_name)
+                capabilities.vector_fields[search_field.name] = (
+                    vectorizer if vectorizer in capabilities.vectorizer_kinds else None)
+
+        semantic_search = getattr(index, "semantic_search", None)
+        if semantic_search is not None:
+            capabilities.semantic_configs = [
+                configuration.name for configuration in semantic_search.configurations or []]
+        return capabilities
+
+    def vectorizer_for(self, vector_field: str) -> Optional[str]:
+        """Get the vectorizer that embeds query text for a vector field, if any."""
+        return self.vector_fields.get(vector_field)
+
+    def is_filterable(self, field_path: str) -> bool:
+        """Check whether a field (or complex/sub path) can be used in $filter."""
+        return field_path in self.filterable_fields
+
+
+class IndexCapabilityCache:
+    """Lazily probed, periodically refreshed capabilities with negative caching."""
+
+    def __init__(
+        self,
+        fetch_index: Callable[[str], Awaitable[Any]],
+        refresh_seconds: float = 3600.0,
+        probe_failure_ttl: float = 60.0,
+        semantic_failure_ttl: float = 900.0,
+        vectorizer_failure_ttl: float = 900.0
+    ):
+        """
+        Initialize the capability cache.
+
+        Args:
+            fetch_index: Coroutine returning the SearchIndex for an index name
+            refresh_seconds: Age after which a schema is read again
+            probe_failure_ttl: Seconds before an unreadable schema is retried
+            semantic_failure_ttl: Seconds a failed semantic configuration is skipped
+            vectorizer_failure_ttl: Seconds a failed vectorizer is skipped
+        """
+        self._fetch_index = fetch_index
+        self.refresh_seconds = refresh_seconds
+        self.probe_failure_ttl = probe_failure_ttl
+        self.semantic_failure_ttl = semantic_failure_ttl
+        self.vectorizer_failure_ttl = vectorizer_failure_ttl
+
+        self._capabilities: Dict[str, IndexCapabilities] = {}
+        # Expiry times of negative entries
+        self._probe_failures: Dict[str, float] = {}
+        self._semantic_failures: Dict[Tuple[str, str], float] = {}
+        self._vectorizer_failures: Dict[str, float] = {}
+        self._probes_inflight: Dict[str, asyncio.Task] = {}
+        self._permission_denied: Set[str] = set()
+
+        self.probes = 0
+        self.probe_errors = 0
+        self.semantic_skips = 0
+
+    async def get(self, index_name: str) -> Optional[IndexCapabilities]:
+        """
+        Get capabilities, probing the index when unknown or stale.
+
+        Returns:
+            The capabilities, stale ones if a refresh fails, or None if the
+            schema has never been readable
+        """
+        now = time.monotonic()
+        cached = self._capabilities.get(index_name)
+        if cached is not None and now - cached.fetched_at < self.refresh_seconds:
+            return cached
+        if self._probe_failures.get(index_name, 0.0) > now:
+            return cached
+        return await self.probe(index_name)
+
+    async def probe(self, index_name: str) -> Optional[IndexCapabilities]:
+        """Read an index schema now and cache its capabilities, joining a probe in flight."""
+        task = self._probes_inflight.get(index_name)
+        if task is None:
+            task = asyncio.ensure_future(self._probe(index_name))
+            self._probes_inflight[index_name] = task
+            task.add_done_callback(lambda _: self._probes_inflight.pop(index_name, None))
+        # Shield so one cancelled caller does not cancel the shared probe
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _is_permission_error(error: Exception) -> bool:
+        """Check whether a probe was refused for the key rather than failing transiently."""
+        if isinstance(error, ClientAuthenticationError):
+            return True
+        return isinstance(error, HttpResponseError) and error.status_code in (401, 403)
+
+    async def _probe(self, index_name: str) -> Optional[IndexCapabilities]:
+        self.probes += 1
+        try:
+            capabilities = IndexCapabilities.from_index(await self._fetch_index(index_name))
+        except Exception as e:
+            self.probe_errors += 1
+            if self._is_permission_error(e):
+                # A query key never gains schema access; stop asking
+                self._permission_denied.add(index_name)
+                self._probe_failures[index_name] = math.inf
+                logger.warning(
+                    f"Schema of {index_name} is not readable with this key (reading it needs "
+                    f"an admin key); querying it without capability checks: {e}")
+            else:
+                self._probe_failures[index_name] = time.monotonic() + self.probe_failure_ttl
+                logger.warning(f"Could not read schema of {index_name}: {e}")
+            return self._capabilities.get(index_name)
+
+        self._probe_failures.pop(index_name, None)
+        self._capabilities[index_name] = capabilities
+        logger.info(
+            f"{index_name}: {len(capabilities.fields)} fields, "
+            f"{len(capabilities.filterable_fields)} filterable, "
+            f"semantic configs {capabilities.semantic_configs}, "
+            f"vector fields {capabilities.vector_fields}")
+        return capabilities
+
+    def peek(self, index_name: str) -> Optional[IndexCapabilities]:
+        """Get cached capabilities without probing."""
+        return self._capabilities.get(index_name)
+
+    def semantic_available(self, index_name: str, semantic_config: str) -> bool:
+        """Check whether semantic ranking with a configuration is worth attempting."""
+        capabilities = self._capabilities.get(index_name)
+        if capabilities is not None and semantic_config not in capabilities.semantic_configs:
+            self.semantic_skips += 1
+            return False
+        if self._semantic_failures.get((index_name, semantic_config), 0.0) > time.monotonic():
+            self.semantic_skips += 1
+            return False
+        return True
+
+    def mark_semantic_failure(self, index_name: str, semantic_config: str) -> None:
+        """Skip semantic ranking with a configuration for semantic_failure_ttl seconds."""
+        self._semantic_failures[(index_name, semantic_config)] = (
+            time.monotonic() + self.semantic_failure_ttl)
+        logger.warning(
+            f"Semantic configuration {semantic_config} failed on {index_name}, "
+            f"using simple queries for {self.semantic_failure_ttl:.0f}s")
+
+    def vectorizer_available(self, index_name: str, vector_field: str) -> bool:
+        """Check whether the index can vectorize query text for a vector field."""
+        capabilities = self._capabilities.get(index_name)
+        if capabilities is None or capabilities.vectorizer_for(vector_field) is None:
+            return False
+        return self._vectorizer_failures.get(index_name, 0.0) <= time.monotonic()
+
+    def mark_vectorizer_failure(self, index_name: str) -> None:
+        """Use client-side embeddings for an index for vectorizer_failure_ttl seconds."""
+        self._vectorizer_failures[index_name] = time.monotonic() + self.vectorizer_failure_ttl
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get probe counters and the capabilities known per index."""
+        now = time.monotonic()
+        return {
+            "probes": self.probes,
+            "probe_errors": self.probe_errors,
+            "semantic_skips": self.semantic_skips,
+            "permission_denied": sorted(self._permission_denied),
+            "indexes": {
+                name: {
+                    "age_seconds": round(now - capabilities.fetched_at, 1),
+                    "semantic_configs": capabilities.semantic_configs,
+                    "vector_fields": capabilities.vector_fields,
+                    "filterable_fields": sorted(capabilities.filterable_fields)
+                }
+                for name, capabilities in self._capabilities.items()
+            },
+            "semantic_failures": [
+                f"{index_name}/{semantic_config}"
+                for (index_name, semantic_config), until in self._semantic_failures.items()
+                if until > now],
+            "vectorizer_failures": [
+                index_name for index_name, until in self._vectorizer_failures.items()
+                if until > now]
+        }
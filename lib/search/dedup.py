@@ -0,0 +1,294 @@
+"""
+Near-duplicate collapsing of search hits across indexes and providers.
+
+Overlapping corpora return the same passage from several indexes, and web
+results often repeat syndicated text. Exact duplicates are found by content
+hash, near duplicates by MinHash signatures over word shingles. Each cluster
+is collapsed into its best-scored hit, which records the merged sources.
+"""
+import hashlib
+import logging
+import os
+import re
+import unicodedata
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .base import SearchResult
+
+# Import project configuration
+try:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from config.project_config import get_project_config
+except ImportError:
+    def get_project_config():
+        return None
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Mersenne prime modulus for the MinHash permutations
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_HASH_MASK = np.uint64((1 << 32) - 1)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the LLM token count of text (about four characters per token)."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def _normalize(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def _shingle_hashes(text: str, shingle_size: int) -> np.ndarray:
+    """32-bit hashes of the word shingles of normalized text."""
+    words = _WORD_PATTERN.findall(text)
+    if len(words) <= shingle_size:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {
+            " ".join(words[i:i + shingle_size])
+            for i in range(len(words) - shingle_size + 1)}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+         for shingle in shingles),
+        dtype=np.uint64, count=len(shingles))
+
+
+class NearDuplicateDetector:
+    """Content-hash and MinHash clustering of texts."""
+
+    def __init__(self, similarity_threshold: float = 0.8, num_perm: int = 64, shingle_size: int = 3):
+        """
+        Initialize the detector.
+
+        Args:
+            similarity_threshold: Estimated Jaccard similarity at which texts are duplicates
+            num_perm: MinHash permutations per signature
+            shingle_size: Words per shingle
+        """
+        self.similarity_threshold = similarity_threshold
+        self.shingle_size = shingle_size
+        # Fixed seed keeps signatures comparable across calls and processes
+        rng = np.random.default_rng(0x5EED)
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def _signature(self, text: str) -> np.ndarray:
+        hashes = _shingle_hashes(text, self.shingle_size)
+        if hashes.size == 0:
+            return np.full(self._a.size, _HASH_MASK, dtype=np.uint64)
+        # (a*x + b) mod p stays below 2^64 because a, x < 2^32 and b < 2^32
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0) & _HASH_MASK
+
+    def cluster(self, texts: Sequence[str]) -> Tuple[List[int], int, int]:
+        """
+        Assign each text to a cluster.
+
+        Returns:
+            (cluster id per text, exact duplicate count, near duplicate count).
+            The cluster id is the index of the cluster's first text.
+        """
+        normalized = [_normalize(text or "") for text in texts]
+        parent = list(range(len(texts)))
+
+        # Exact duplicates by content hash
+        first_by_hash: Dict[bytes, int] = {}
+        exact = 0
+        unique = []
+        for i, text in enumerate(normalized):
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+            if digest in first_by_hash:
+                parent[i] = first_by_hash[digest]
+                exact += 1
+            else:
+                first_by_hash[digest] = i
+                unique.append(i)
+
+        # Near duplicates among the distinct texts by MinHash agreement
+        near = 0
+        if len(unique) > 1:
+            signatures = np.stack([self._signature(normalized[i]) for i in unique])
+            for row, i in enumerate(unique[1:], start=1):
+                agreement = (signatures[:row] == signatures[row]).mean(axis=1)
+                best = int(agreement.argmax())
+                if agreement[best] >= self.similarity_threshold and normalized[i]:
+                    parent[i] = parent[unique[best]]
+                    near += 1
+
+        # Exact duplicates of a near duplicate join its cluster
+        clusters = [parent[parent[i]] for i in range(len(texts))]
+        return clusters, exact, near
+
+
+def _result_score(result: SearchResult) -> float:
+    metadata = result.metadata or {}
+    for score in (metadata.get("fused_score"), result.reranker_score, result.score):
+        if score is not None:
+            return float(score)
+    return 0.0
+
+
+def _collapse(
+    items: List[Any],
+    texts: List[str],
+    score: Callable[[Any], float],
+    merge: Callable[[Any, List[Any]], Any],
+    detector: NearDuplicateDetector
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """Collapse clustered items into their best-scored representative."""
+    clusters, exact, near = detector.cluster(texts)
+    members: Dict[int, List[int]] = {}
+    for i, cluster_id in enumerate(clusters):
+        members.setdefault(cluster_id, []).append(i)
+
+    kept: List[Tuple[int, Any]] = []
+    tokens_saved = 0
+    for indices in members.values():
+        best = max(indices, key=lambda i: (score(items[i]), -i))
+        others = [i for i in indices if i != best]
+        tokens_saved += sum(estimate_tokens(texts[i]) for i in others)
+        item = merge(items[best], [items[i] for i in others]) if others else items[best]
+        # Keep the representative at the rank of the cluster's first member
+        kept.append((indices[0], item))
+    kept.sort(key=lambda pair: pair[0])
+
+    total = len(items)
+    report = {
+        "input": total,
+        "output": len(kept),
+        "exact_duplicates": exact,
+        "near_duplicates": near,
+        "dedup_ratio": (total - len(kept)) / total if total else 0.0,
+        "tokens_saved": tokens_saved
+    }
+    return [item for _, item in kept], report
+
+
+def _merge_search_results(best: SearchResult, duplicates: List[SearchResult]) -> SearchResult:
+    metadata = dict(best.metadata or {})
+    metadata["merged_sources"] = [
+        {
+            "search_type": duplicate.search_type,
+            "document_title": duplicate.document_title,
+            "content_path": duplicate.content_path,
+            "score": _result_score(duplicate)
+        }
+        for duplicate in duplicates
+    ]
+    metadata["duplicate_count"] = len(duplicates)
+    # Copy so cached results shared with other callers are never modified
+    return replace(best, metadata=metadata)
+
+
+def _merge_web_results(best: Dict[str, Any], duplicates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = dict(best)
+    merged["merged_sources"] = [duplicate.get("url", "") for duplicate in duplicates]
+    return merged
+
+
+def collapse_duplicates(
+    results: List[SearchResult],
+    detector: NearDuplicateDetector
+) -> Tuple[List[SearchResult], Dict[str, Any]]:
+    """
+    Collapse duplicate search results into their best-scored representative.
+
+    Returns:
+        (deduplicated results in rank order, per-call report)
+    """
+    if len(results) < 2:
+        return list(results), _empty_report(len(results))
+    return _collapse(
+        results, [result.content_text or "" for result in results],
+        _result_score, _merge_search_results, detector)
+
+
+def collapse_provider_duplicates(
+    results_by_provider: Dict[str, List[SearchResult]],
+    detector: NearDuplicateDetector
+) -> Tuple[Dict[str, List[SearchResult]], Dict[str, Any]]:
+    """
+    Collapse duplicates across providers, keeping each representative under its own provider.
+
+    Returns:
+        (deduplicated results per provider, per-call report)
+    """
+    tagged = [
+        (provider_name, result)
+        for provider_name, results in results_by_provider.items()
+        for result in results]
+    collapsed: Dict[str, List[SearchResult]] = {name: [] for name in results_by_provider}
+    if len(tagged) < 2:
+        for provider_name, result in tagged:
+            collapsed[provider_name].append(result)
+        return collapsed, _empty_report(len(tagged))
+
+    kept, report = _collapse(
+        tagged, [result.content_text or "" for _, result in tagged],
+        lambda item: _result_score(item[1]),
+        lambda best, duplicates: (best[0], _merge_search_results(
+            best[1], [result for _, result in duplicates])),
+        detector)
+    for provider_name, result in kept:
+        collapsed[provider_name].append(result)
+    return collapsed, report
+
+
+def collapse_duplicate_web_results(
+    results: List[Dict[str, Any]],
+    detector: NearDuplicateDetector
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Collapse duplicate formatted web results, keeping the best-scored page."""
+    if len(results) < 2:
+        return list(results), _empty_report(len(results))
+    return _collapse(
+        results, [result.get("content", "") for result in results],
+        lambda result: float(result.get("score") or 0.0), _merge_web_results, detector)
+
+
+def _empty_report(total: int) -> Dict[str, Any]:
+    return {
+        "input": total,
+        "output": total,
+        "exact_duplicates": 0,
+        "near_duplicates": 0,
+        "dedup_ratio": 0.0,
+        "tokens_saved": 0
+    }
+
+
+# Global near-duplicate detector instance
+_detector = None
+
+
+def get_duplicate_detector() -> Optional[NearDuplicateDetector]:
+    """Get the process-wide near-duplicate detector, or None when disabled."""
+    global _detector
+    if _detector is None:
+        settings = None
+        try:
+            project_config = get_project_config()
+            if project_config:
+                settings = project_config.search_config.dedup
+        except Exception as e:
+            logger.warning(f"Could not load deduplication configuration: {e}")
+
+        if settings is not None and not settings.enabled:
+            return None
+
+        if settings is not None:
+            _detector = NearDuplicateDetector(
+                similarity_threshold=settings.similarity_threshold,
+                num_perm=settings.num_perm,
+                shingle_size=settings.shingle_size
+            )
+        else:
+            _detector = NearDuplicateDetector()
+    return _detector
@@ -0,0 +1,199 @@
+"""
+Micro-batching coalescer for embedding requests.
+
+Concurrent callers (parallel searches, researchers, memory writes) each ask
+for a single embedding. Requests arriving within a short window are merged
+into one batched embeddings call and the vectors are fanned back out, which
+cuts request count and rate-limit pressure on the embedding deployment.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from .base import EmbeddingProvider
+
+# Import project configuration
+try:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from config.project_config import get_project_config
+except ImportError:
+    def get_project_config():
+        return None
+
+logger = logging.getLogger(__name__)
+
+BatchEmbeddingFunction = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class EmbeddingBatcher:
+    """Coalesce single-text embedding requests into batched calls."""
+
+    def __init__(
+        self,
+        batch_fn: BatchEmbeddingFunction,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            batch_fn: Coroutine embedding a list of texts in one request
+            max_batch_size: Distinct texts sent per request
+            max_wait_ms: Time to wait for more requests before sending
+        """
+        self._batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        # text -> futures awaiting its vector (identical texts share a slot)
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._closed = False
+
+        self.requests = 0
+        self.batches = 0
+        self.texts_sent = 0
+
+    async def embed(self, text: str) -> List[float]:
+        """Queue one text and wait for its vector from the next batch."""
+        if self._closed:
+            raise RuntimeError("Embedding batcher is closed")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.requests += 1
+        self._pending.setdefault(text, []).append(future)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Queue several texts; they may share a batch with other callers."""
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    def _flush(self) -> None:
+        """Send everything queued so far as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        """Run one batched call and resolve every waiting caller."""
+        texts = list(batch)
+        self.batches += 1
+        self.texts_sent += len(texts)
+        logger.debug(
+            f"Embedding batch of {len(texts)} texts for "
+            f"{sum(len(waiters) for waiters in batch.values())} requests")
+
+        try:
+            vectors = await self._batch_fn(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(
+                    f"Embedding batch returned {len(vectors)} vectors for {len(texts)} texts")
+        except Exception as e:
+            for waiters in batch.values():
+                for future in waiters:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for text, vector in zip(texts, vectors):
+            for future in batch[text]:
+                if not future.done():
+                    future.set_result(vector)
+
+    async def close(self) -> None:
+        """Send queued requests, wait for batches in flight and refuse new ones."""
+        self._closed = True
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics."""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts_sent": self.texts_sent,
+            "avg_batch_size": self.texts_sent / self.batches if self.batches else 0.0,
+            "requests_saved": self.requests - self.batches
+        }
+
+
+class BatchingEmbeddingProvider(EmbeddingProvider):
+    """Embedding provider wrapper that routes requests through a batcher."""
+
+    def __init__(self, provider: EmbeddingProvider, batcher: EmbeddingBatcher):
+        """
+        Wrap an embedding provider with a request coalescer.
+
+        Args:
+            provider: Provider whose generate_embeddings serves the batches
+            batcher: Batcher owned by this provider
+        """
+        self.provider = provider
+        self.batcher = batcher
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        """Generate an embedding through the batcher."""
+        try:
+            return await self.batcher.embed(text)
+        except Exception as e:
+            logger.error(f"Failed to generate embedding: {e}")
+            return []
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate several embeddings through the batcher."""
+        try:
+            return await self.batcher.embed_many(texts)
+        except Exception as e:
+            logger.error(f"Failed to generate {len(texts)} embeddings: {e}")
+            return [[] for _ in texts]
+
+    async def close(self) -> None:
+        """Drain the batcher, then close the wrapped provider."""
+        await self.batcher.close()
+        await self.provider.close()
+
+
+def create_embedding_batcher(batch_fn: BatchEmbeddingFunction) -> Optional[EmbeddingBatcher]:
+    """
+    Create a batcher for one embedding client from the project configuration.
+
+    Each client owns its batcher, so batches are always sent with the
+    endpoint, key and error handling of the client that queued them, and the
+    batcher is closed together with that client. Returns None when batching
+    is disabled.
+    """
+    settings = None
+    try:
+        project_config = get_project_config()
+        if project_config:
+            settings = project_config.search_config.embedding_batching
+    except Exception as e:
+        logger.warning(f"Could not load embedding batching configuration: {e}")
+
+    if settings is None:
+        return EmbeddingBatcher(batch_fn)
+    if not settings.enabled:
+        return None
+    return EmbeddingBatcher(
+        batch_fn,
+        max_batch_size=settings.max_batch_size,
+        max_wait_ms=settings.max_wait_ms
+    )
@@ -0,0 +1,385 @@
+"""
+Tiered query-embedding cache shared by all embedding providers.
+
+Embeddings are keyed by deployment name and normalized text, held in a
+bounded in-process LRU with TTL and optionally persisted to a SQLite file so
+repeated queries survive restarts without another Azure OpenAI round trip.
+Async callers read the memory tier inline and reach the SQLite tier through
+asyncio.to_thread so disk I/O stays off the event loop.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import EmbeddingProvider
+
+# Import project configuration
+try:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from config.project_config import get_project_config
+except ImportError:
+    def get_project_config():
+        return None
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_embedding_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class EmbeddingCache:
+    """Bounded LRU + TTL embedding cache with an optional SQLite tier."""
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 86400,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 100000
+    ):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            max_entries: Maximum embeddings kept in process memory
+            ttl_seconds: Lifetime of an entry in both tiers
+            disk_path: SQLite file for the persistent tier (disabled if empty)
+            disk_max_entries: Maximum rows kept in the SQLite tier
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_entries = disk_max_entries
+
+        # key -> (expires_at, float32 vector)
+        self._memory: "OrderedDict[str, Tuple[float, array]]" = OrderedDict()
+        # Guards the memory tier and counters; never held during disk I/O
+        self._lock = threading.Lock()
+        # Serializes use of the SQLite connection
+        self._db_lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+        if disk_path:
+            self._open_disk_tier(disk_path)
+
+    def _open_disk_tier(self, disk_path: str) -> None:
+        """Open (or create) the SQLite persistent tier."""
+        try:
+            directory = os.path.dirname(os.path.abspath(disk_path))
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_created ON embeddings(created_at)")
+            self._db.commit()
+            logger.info(f"Embedding cache disk tier enabled at {disk_path}")
+        except Exception as e:
+            logger.warning(
+                f"Failed to open embedding cache disk tier, using memory only: {e}")
+            self._db = None
+
+    @staticmethod
+    def make_key(namespace: str, text: str) -> str:
+        """Build a cache key from the deployment name and normalized text."""
+        payload = f"{namespace}\x1f{normalize_embedding_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def disk_enabled(self) -> bool:
+        """Whether the SQLite tier is open."""
+        return self._db is not None
+
+    def get(self, namespace: str, text: str) -> Optional[List[float]]:
+        """Return a cached embedding, or None on a miss."""
+        embedding = self.get_memory(namespace, text)
+        if embedding is not None:
+            return embedding
+        return self.get_disk(namespace, text)
+
+    def get_memory(self, namespace: str, text: str) -> Optional[List[float]]:
+        """Return an embedding from the memory tier; a miss here is not counted."""
+        key = self.make_key(namespace, text)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, vector = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return vector.tolist()
+                del self._memory[key]
+            return None
+
+    def get_disk(self, namespace: str, text: str) -> Optional[List[float]]:
+        """Return an embedding from the SQLite tier, promoting it to memory."""
+        key = self.make_key(namespace, text)
+        now = time.time()
+
+        vector = None
+        if self._db is not None:
+            with self._db_lock:
+                if self._db is not None:
+                    vector = self._disk_get(key, now)
+
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+                return None
+            self._memory_put(key, vector, now)
+            self.disk_hits += 1
+            return vector.tolist()
+
+    def put(self, namespace: str, text: str, embedding: List[float]) -> None:
+        """Store an embedding in every enabled tier."""
+        self.put_memory(namespace, text, embedding)
+        self.put_disk(namespace, text, embedding)
+
+    def put_memory(self, namespace: str, text: str, embedding: List[float]) -> None:
+        """Store an embedding in the memory tier."""
+        if not embedding:
+            return
+        key = self.make_key(namespace, text)
+        with self._lock:
+            self._memory_put(key, array("f", embedding), time.time())
+
+    def put_disk(self, namespace: str, text: str, embedding: List[float]) -> None:
+        """Store an embedding in the SQLite tier, if enabled."""
+        if not embedding or self._db is None:
+            return
+        key = self.make_key(namespace, text)
+        with self._db_lock:
+            if self._db is not None:
+                self._disk_put(key, array("f", embedding), time.time())
+
+    async def get_many(
+        self,
+        namespace: str,
+        texts: List[str]
+    ) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings without blocking the event loop.
+
+        Memory hits are served inline; the remaining texts are read from the
+        SQLite tier in a single worker thread.
+
+        Args:
+            namespace: Deployment name the embeddings come from
+            texts: Texts to look up
+
+        Returns:
+            One embedding per text, None for misses
+        """
+        embeddings = [self.get_memory(namespace, text) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not missing:
+            return embeddings
+
+        def read_disk() -> List[Optional[List[float]]]:
+            return [self.get_disk(namespace, texts[i]) for i in missing]
+
+        if self.disk_enabled:
+            found = await asyncio.to_thread(read_disk)
+        else:
+            found = read_disk()
+        for i, embedding in zip(missing, found):
+            embeddings[i] = embedding
+        return embeddings
+
+    async def put_many(
+        self,
+        namespace: str,
+        texts: List[str],
+        embeddings: List[List[float]]
+    ) -> None:
+        """
+        Store embeddings without blocking the event loop.
+
+        Args:
+            namespace: Deployment name the embeddings come from
+            texts: Texts the embeddings were generated for
+            embeddings: One embedding per text
+        """
+        for text, embedding in zip(texts, embeddings):
+            self.put_memory(namespace, text, embedding)
+        if self.disk_enabled:
+            await asyncio.to_thread(
+                lambda: [self.put_disk(namespace, text, embedding)
+                         for text, embedding in zip(texts, embeddings)])
+
+    def _memory_put(self, key: str, vector: array, now: float) -> None:
+        """Insert into the LRU tier, evicting the least recently used entries."""
+        self._memory[key] = (now + self.ttl_seconds, vector)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[array]:
+        """Read a non-expired vector from the SQLite tier."""
+        try:
+            row = self._db.execute(
+                "SELECT vector, created_at FROM embeddings WHERE key = ?",
+                (key,)).fetchone()
+        except Exception as e:
+            logger.warning(f"Embedding cache disk read failed: {e}")
+            return None
+        if row is None:
+            return None
+        blob, created_at = row
+        if created_at + self.ttl_seconds <= now:
+            return None
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector
+
+    def _disk_put(self, key: str, vector: array, now: float) -> None:
+        """Write a vector to the SQLite tier and trim it periodically."""
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                (key, vector.tobytes(), now))
+            self._disk_writes += 1
+            # Trim expired and overflow rows every 256 writes
+            if self._disk_writes % 256 == 0:
+                self._db.execute(
+                    "DELETE FROM embeddings WHERE created_at <= ?",
+                    (now - self.ttl_seconds,))
+                self._db.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "SELECT key FROM embeddings ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_max_entries,))
+            self._db.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache disk write failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the cache."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "disk_enabled": self._db is not None
+            }
+
+    def clear(self) -> None:
+        """Drop every cached embedding from all tiers."""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the SQLite tier."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """Embedding provider wrapper that consults an EmbeddingCache first."""
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        cache: EmbeddingCache,
+        namespace: str
+    ):
+        """
+        Wrap an embedding provider with a cache.
+
+        Args:
+            provider: Provider used on cache misses
+            cache: Shared embedding cache
+            namespace: Deployment name the embeddings come from
+        """
+        self.provider = provider
+        self.cache = cache
+        self.namespace = namespace
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        """Return a cached embedding or generate and cache a new one."""
+        cached = (await self.cache.get_many(self.namespace, [text]))[0]
+        if cached is not None:
+            return cached
+
+        embedding = await self.provider.generate_embedding(text)
+        await self.cache.put_many(self.namespace, [text], [embedding])
+        return embedding
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Return cached embeddings and generate only the missing ones."""
+        embeddings = await self.cache.get_many(self.namespace, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            generated = await self.provider.generate_embeddings(missing_texts)
+            await self.cache.put_many(self.namespace, missing_texts, generated)
+            for i, embedding in zip(missing, generated):
+                embeddings[i] = embedding
+        return embeddings
+
+    async def close(self) -> None:
+        """Close the wrapped provider."""
+        await self.provider.close()
+
+
+# Global embedding cache instance
+_embedding_cache = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the process-wide embedding cache, or None when disabled."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        settings = None
+        try:
+            project_config = get_project_config()
+            if project_config:
+                settings = project_config.search_config.embedding_cache
+        except Exception as e:
+            logger.warning(f"Could not load embedding cache configuration: {e}")
+
+        if settings is not None and not settings.enabled:
+            return None
+
+        if settings is not None:
+            _embedding_cache = EmbeddingCache(
+                max_entries=settings.max_entries,
+                ttl_seconds=settings.ttl_seconds,
+                disk_path=settings.disk_path or None,
+                disk_max_entries=settings.disk_max_entries
+            )
+        else:
+            _embedding_cache = EmbeddingCache()
+    return _embedding_cache
@@ -0,0 +1,258 @@
+"""
+Configuration-driven extraction of raw index hits into SearchResult objects.
+
+Each document type's field layout is compiled once into an ExtractionPlan so
+the per-hit loop does no config lookups. Shared by every provider that serves
+the configured document_types (Azure AI Search, local index).
+
+Each value of a hit is stored once on its SearchResult; the search type and
+mode strings come from the plan, so every result of a type shares them.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .base import DocumentType, SearchMode, SearchResult
+
+logger = logging.getLogger(__name__)
+
+# Main-content field priority (generic field names only)
+_CONTENT_PRIORITY = ("content_text", "chunk", "text", "description", "content")
+# Key field substrings that mark multimodal document identifiers
+_MULTIMODAL_IDENTIFIERS = ("text_document_id", "image_document_id", "content_id")
+# Content field substrings that mark location metadata
+_LOCATION_TERMS = ("location", "metadata", "page", "polygon")
+# Content fields copied to their own SearchResult attributes
+_ATTRIBUTE_FIELDS = ("document_title", "content_path")
+
+
+@dataclass(frozen=True)
+class ExtractionPlan:
+    """Field layout of one document type, resolved once per provider."""
+    search_type: str
+    content_fields: Tuple[str, ...]
+    main_content_fields: Tuple[str, ...]
+    # Content fields stored under metadata (neither attributes nor location)
+    residual_fields: Tuple[str, ...]
+    multimodal_fields: Tuple[str, ...]
+    location_fields: Tuple[str, ...]
+    title_field_configured: bool
+    path_field_configured: bool
+    structured_metadata: bool
+
+
+class ResultExtractor:
+    """Convert raw hits into SearchResult objects using per-type plans."""
+
+    def __init__(self, project_config: Any):
+        """
+        Initialize the extractor.
+
+        Args:
+            project_config: Project configuration holding document_types
+        """
+        self.project_config = project_config
+        self._plans: Dict[str, ExtractionPlan] = {}
+
+    def compile(self, document_types: Iterable[DocumentType]) -> None:
+        """Compile plans for the given document types ahead of use."""
+        for document_type in document_types:
+            self.get_plan(document_type)
+
+    def process(
+        self,
+        search_results: Iterable[Dict[str, Any]],
+        document_type: DocumentType,
+        search_mode: SearchMode
+    ) -> List[SearchResult]:
+        """Process raw search results into SearchResult objects with multimodal support."""
+        results = []
+
+        plan = self.get_plan(document_type)
+        search_type = plan.search_type
+        mode = search_mode.value
+
+        for result in search_results:
+            # Extract content text using the plan's main-content field order
+            content_text = None
+            for content_field in plan.main_content_fields:
+                value = result.get(content_field)
+                if value:
+                    content_text = str(value)
+                    break
+            if content_text is None:
+                continue
+
+            metadata = {}
+            search_result = SearchResult(
+                content_text=content_text,
+                search_type=search_type,
+                search_mode=mode,
+                score=result.get("@search.score"),
+                reranker_score=result.get("@search.reranker_score"),
+                highlights=result.get("@search.highlights"),
+                captions=result.get("@search.captions"),
+                answers=result.get("@search.answers"),
+                metadata=metadata,
+                content_field=content_field
+            )
+            if plan.title_field_configured:
+                search_result.document_title = result.get("document_title")
+            if plan.path_field_configured:
+                search_result.content_path = result.get("content_path")
+
+            # Content fields not stored elsewhere: at the top level for
+            # list-category types, otherwise grouped under extracted_fields
+            extracted_fields = metadata if plan.structured_metadata else {}
+            for field in plan.residual_fields:
+                if field == content_field:
+                    continue
+                value = result.get(field)
+                if value is not None:
+                    extracted_fields[field] = value
+            if extracted_fields and not plan.structured_metadata:
+                metadata["extracted_fields"] = extracted_fields
+
+            # Enhanced multimodal metadata extraction
+            self._extract_multimodal_metadata(result, metadata, plan)
+
+            # Extract location metadata using configured fields
+            if plan.location_fields:
+                self._extract_location_metadata(result, search_result, plan)
+
+            results.append(search_result)
+
+        logger.info(f"Processed {len(results)} search results using configuration-driven field extraction")
+        return results
+
+    def get_plan(self, document_type: DocumentType) -> ExtractionPlan:
+        """Get the compiled extraction plan for a document type."""
+        document_type_value = getattr(document_type, 'value', str(document_type))
+        plan = self._plans.get(document_type_value)
+        if plan is None:
+            plan = self._compile_plan(document_type)
+            self._plans[document_type_value] = plan
+        return plan
+
+    def _compile_plan(self, document_type: DocumentType) -> ExtractionPlan:
+        """Resolve per-type field lists once so the per-hit loop does no lookups."""
+        content_fields = self._get_content_fields_for_document_type(document_type)
+        key_fields = self._get_key_fields_for_document_type(document_type)
+
+        # Priority order for main content (generic field names only), then
+        # the remaining configured content fields in order
+        main_content_fields = [
+            field for field in _CONTENT_PRIORITY if field in content_fields]
+        main_content_fields += [
+            field for field in content_fields if field not in main_content_fields]
+
+        metadata = getattr(document_type, 'get_metadata', lambda: {})()
+        location_fields = tuple(
+            field for field in content_fields
+            if any(term in field.lower() for term in _LOCATION_TERMS))
+
+        plan = ExtractionPlan(
+            search_type=self._get_search_type_name(document_type),
+            content_fields=tuple(content_fields),
+            main_content_fields=tuple(main_content_fields),
+            residual_fields=tuple(
+                field for field in content_fields
+                if field not in _ATTRIBUTE_FIELDS and field not in location_fields),
+            multimodal_fields=tuple(
+                field for field in key_fields
+                if any(identifier in field.lower() for identifier in _MULTIMODAL_IDENTIFIERS)),
+            location_fields=location_fields,
+            title_field_configured="document_title" in content_fields,
+            path_field_configured="content_path" in content_fields,
+            structured_metadata=bool(metadata) and metadata.get('category') == 'list'
+        )
+        logger.debug(f"Compiled extraction plan for {getattr(document_type, 'value', document_type)}: {plan}")
+        return plan
+
+    def _get_search_type_name(self, document_type: DocumentType) -> str:
+        """Get human-readable search type name from project configuration."""
+        if self.project_config:
+            document_type_value = getattr(
+                document_type, 'value', str(document_type))
+            for doc_type_config in self.project_config.document_types:
+                if doc_type_config.name == document_type_value:
+                    return doc_type_config.display_name_en
+
+        # If no project config or type not found, use enum value
+        return getattr(document_type, 'value', str(document_type))
+
+    def _extract_multimodal_metadata(
+            self, result: Dict[str, Any], metadata: Dict[str, Any], plan: ExtractionPlan) -> None:
+        """Extract multimodal-specific metadata from search results."""
+        # Add configured multimodal fields to metadata
+        for field in plan.multimodal_fields:
+            value = result.get(field)
+            if value is not None:
+                metadata[field] = value
+
+        # Identify content type based on document IDs
+        has_text_content = result.get("text_document_id") is not None
+        has_image_content = result.get("image_document_id") is not None
+
+        if has_text_content and not has_image_content:
+            metadata["content_type"] = "text"
+        elif has_image_content and not has_text_content:
+            metadata["content_type"] = "image"
+            # Add image verbalization indicator
+            if "content_text" in result:
+                metadata["is_image_verbalization"] = True
+                metadata["description"] = "Image content described in natural language"
+        elif has_text_content and has_image_content:
+            metadata["content_type"] = "mixed"
+        else:
+            metadata["content_type"] = "unknown"
+
+    def _get_content_fields_for_document_type(self, document_type: DocumentType) -> List[str]:
+        """Get content_fields configuration for specific document type."""
+        if not self.project_config:
+            return []
+        
+        document_type_value = getattr(document_type, 'value', str(document_type))
+        for doc_type_config in self.project_config.document_types:
+            if doc_type_config.name == document_type_value:
+                return doc_type_config.content_fields
+        
+        return []
+
+    def _get_key_fields_for_document_type(self, document_type: DocumentType) -> List[str]:
+        """Get key_fields configuration for specific document type."""
+        if not self.project_config:
+            return []
+        
+        document_type_value = getattr(document_type, 'value', str(document_type))
+        for doc_type_config in self.project_config.document_types:
+            if doc_type_config.name == document_type_value:
+                return doc_type_config.key_fields
+        
+        return []
+
+    def _extract_location_metadata(self, result: Dict[str, Any], search_result: SearchResult, plan: ExtractionPlan) -> None:
+        """Extract location metadata using configured content fields."""
+        metadata = search_result.metadata
+        for field in plan.location_fields:
+            value = result.get(field)
+            if value is None:
+                continue
+            if field == "locationMetadata" and isinstance(value, dict):
+                # Handle nested locationMetadata
+                if "pageNumber" in value:
+                    search_result.page_number = value["pageNumber"]
+                if "boundingPolygons" in value:
+                    metadata["boundingPolygons"] = value["boundingPolygons"]
+                # Keep only the keys not stored above
+                remaining = {
+                    key: item for key, item in value.items()
+                    if key not in ("pageNumber", "boundingPolygons")}
+                if remaining:
+                    metadata["locationMetadata"] = remaining
+            elif field == "pageNumber":
+                # Direct page number field
+                search_result.page_number = value
+            else:
+                # Direct bounding polygons and other location-related fields
+                metadata[field] = value
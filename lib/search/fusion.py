@@ -0,0 +1,104 @@
+"""
+Cross-index result fusion for multi-index search.
+
+Raw ``@search.score`` values are not comparable between indexes or between
+text, hybrid and semantic modes, so per-index result lists are fused into a
+single ranking before a global top-K cap is applied.
+"""
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+from .base import SearchResult
+
+logger = logging.getLogger(__name__)
+
+FUSION_METHODS = ("rrf", "minmax", "zscore")
+
+# Semantic reranker scores are calibrated on a fixed 0-4 scale
+RERANKER_SCORE_MAX = 4.0
+
+
+def fuse_results(
+    result_lists: List[List[SearchResult]],
+    method: str = "rrf",
+    top_k: Optional[int] = None,
+    rrf_k: int = 60,
+    prefer_reranker: bool = True
+) -> List[SearchResult]:
+    """
+    Fuse per-index result lists into one ranking.
+
+    Args:
+        result_lists: Results from each index, each in that index's rank order
+        method: "rrf" (reciprocal rank), "minmax" or "zscore" normalization
+        top_k: Global cap on returned results (None keeps all)
+        rrf_k: Rank offset constant for reciprocal rank fusion
+        prefer_reranker: Rank by the calibrated reranker score when every hit has one
+
+    Returns:
+        Fused results, best first, with "fused_score" and "fusion_method" in metadata
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(
+            f"Unknown fusion method '{method}', expected one of {FUSION_METHODS}")
+
+    lists = [results for results in result_lists if results]
+    hits = [result for results in lists for result in results]
+    if not hits:
+        return []
+
+    lengths = np.fromiter((len(results) for results in lists), dtype=np.intp)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    group = np.repeat(np.arange(len(lists)), lengths)
+    rank = np.arange(len(hits)) - offsets[group]
+
+    scores = np.array(
+        [np.nan if result.score is None else result.score for result in hits],
+        dtype=np.float64)
+    reranker = np.array(
+        [np.nan if result.reranker_score is None else result.reranker_score
+         for result in hits],
+        dtype=np.float64)
+
+    if prefer_reranker and not np.isnan(reranker).any():
+        # Reranker scores share one scale across indexes: no normalization needed
+        fused = reranker / RERANKER_SCORE_MAX
+        method_used = "reranker"
+    elif method == "rrf":
+        fused = 1.0 / (rrf_k + rank + 1.0)
+        method_used = method
+    else:
+        raw = np.where(np.isnan(reranker), scores, reranker) if prefer_reranker else scores
+        raw = np.nan_to_num(raw, nan=0.0)
+        if method == "minmax":
+            low = np.minimum.reduceat(raw, offsets)[group]
+            high = np.maximum.reduceat(raw, offsets)[group]
+            span = high - low
+            fused = np.divide(raw - low, span, out=np.ones_like(raw), where=span > 0)
+        else:
+            mean = (np.add.reduceat(raw, offsets) / lengths)[group]
+            variance = (np.add.reduceat((raw - mean) ** 2, offsets) / lengths)[group]
+            std = np.sqrt(variance)
+            fused = np.divide(raw - mean, std, out=np.zeros_like(raw), where=std > 0)
+        method_used = method
+
+    # Stable sort keeps per-index rank order between equal fused scores
+    order = np.argsort(-fused, kind="stable")
+    if top_k is not None and top_k > 0:
+        order = order[:top_k]
+
+    fused_results = []
+    for i in order.tolist():
+        result = hits[i]
+        if result.metadata is None:
+            result.metadata = {}
+        result.metadata["fused_score"] = float(fused[i])
+        result.metadata["fusion_method"] = method_used
+        fused_results.append(result)
+
+    logger.debug(
+        f"Fused {len(hits)} hits from {len(lists)} indexes with {method_used}, "
+        f"returning {len(fused_results)}")
+    return fused_results
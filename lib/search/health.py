@@ -0,0 +1,243 @@
+"""
+Provider health tracking and circuit breakers.
+
+Each (provider, index) backend keeps an EWMA of its latency and error rate.
+Backends that keep failing are opened and rejected immediately instead of
+paying the full request timeout; after a cool-down a single half-open probe
+decides whether they close again. Only backend faults count as failures:
+transport errors, timeouts, throttling (429) and server errors (5xx). Caller
+errors such as an invalid filter or a 400/404 pass through untouched.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from azure.core.exceptions import (HttpResponseError, ServiceRequestError,
+                                   ServiceResponseError)
+
+from .rate_limit import RateLimitedError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because its backend circuit is open."""
+
+
+# Errors raised when a backend could not be reached or did not answer in time
+_TRANSPORT_ERRORS = (ConnectionError, TimeoutError, ServiceRequestError, ServiceResponseError)
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """
+    Check whether an error says the backend is unhealthy.
+
+    Transport errors, timeouts, throttling and 5xx responses count; caller
+    errors such as a ValueError for a malformed filter or a 4xx response
+    other than 408/429 do not.
+    """
+    if isinstance(error, RateLimitedError):
+        return True
+    if isinstance(error, HttpResponseError):
+        status = error.status_code
+        return status is None or status in (408, 429) or status >= 500
+    return isinstance(error, _TRANSPORT_ERRORS)
+
+
+@dataclass
+class BackendHealth:
+    """Health counters for one provider/index backend."""
+    ewma_latency: Optional[float] = None
+    error_rate: float = 0.0
+    consecutive_failures: int = 0
+    state: str = CIRCUIT_CLOSED
+    opened_at: float = 0.0
+    probe_in_flight: bool = False
+    requests: int = 0
+    failures: int = 0
+    rejected: int = 0
+
+
+class HealthTracker:
+    """EWMA latency/error tracking with half-open circuit breakers per backend."""
+
+    def __init__(
+        self,
+        ewma_alpha: float = 0.2,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        min_requests: int = 10,
+        open_seconds: float = 30.0,
+        error_penalty: float = 4.0
+    ):
+        """
+        Initialize the health tracker.
+
+        Args:
+            ewma_alpha: Weight of the newest sample in latency and error EWMAs
+            failure_threshold: Consecutive failures that open a circuit
+            error_rate_threshold: Error rate EWMA that opens a circuit
+            min_requests: Requests before the error rate can open a circuit
+            open_seconds: Cool-down before an open circuit allows a probe
+            error_penalty: Latency multiplier per unit of error rate when ranking
+        """
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.error_penalty = error_penalty
+
+        self._backends: Dict[Tuple[str, str], BackendHealth] = {}
+
+    def get(self, provider_name: str, target: str) -> BackendHealth:
+        """Get the health record of a backend, creating it on first use."""
+        key = (provider_name, target)
+        health = self._backends.get(key)
+        if health is None:
+            health = self._backends[key] = BackendHealth()
+        return health
+
+    def is_open(self, provider_name: str, target: str) -> bool:
+        """Check whether a backend is rejecting requests right now."""
+        health = self._backends.get((provider_name, target))
+        if health is None or health.state == CIRCUIT_CLOSED:
+            return False
+        if health.state == CIRCUIT_OPEN:
+            return time.monotonic() - health.opened_at < self.open_seconds
+        return health.probe_in_flight
+
+    def score(self, provider_name: str, target: str) -> float:
+        """
+        Get the routing cost of a backend, lower is healthier.
+
+        Backends without samples score 0 so they are tried; open circuits
+        score infinity.
+        """
+        if self.is_open(provider_name, target):
+            return float("inf")
+        health = self._backends.get((provider_name, target))
+        if health is None or health.ewma_latency is None:
+            return 0.0
+        return health.ewma_latency * (1.0 + self.error_penalty * health.error_rate)
+
+    def _acquire(self, provider_name: str, target: str) -> BackendHealth:
+        """Admit a request or raise CircuitOpenError."""
+        health = self.get(provider_name, target)
+        if health.state == CIRCUIT_OPEN:
+            if time.monotonic() - health.opened_at < self.open_seconds:
+                health.rejected += 1
+                raise CircuitOpenError(
+                    f"Circuit open for {provider_name}/{target}")
+            health.state = CIRCUIT_HALF_OPEN
+            health.probe_in_flight = False
+        if health.state == CIRCUIT_HALF_OPEN:
+            if health.probe_in_flight:
+                health.rejected += 1
+                raise CircuitOpenError(
+                    f"Circuit half-open for {provider_name}/{target}, probe in flight")
+            health.probe_in_flight = True
+        health.requests += 1
+        return health
+
+    def _record(
+        self,
+        provider_name: str,
+        target: str,
+        health: BackendHealth,
+        latency: float,
+        failed: bool
+    ) -> None:
+        """Update EWMAs and circuit state with a request outcome."""
+        alpha = self.ewma_alpha
+        health.ewma_latency = latency if health.ewma_latency is None else (
+            alpha * latency + (1 - alpha) * health.ewma_latency)
+        health.error_rate = alpha * float(failed) + (1 - alpha) * health.error_rate
+        health.probe_in_flight = False
+
+        if not failed:
+            health.consecutive_failures = 0
+            if health.state != CIRCUIT_CLOSED:
+                logger.info(f"Circuit closed for {provider_name}/{target}")
+                health.state = CIRCUIT_CLOSED
+                health.error_rate = 0.0
+            return
+
+        health.failures += 1
+        health.consecutive_failures += 1
+        if (health.state == CIRCUIT_HALF_OPEN
+                or health.consecutive_failures >= self.failure_threshold
+                or (health.requests >= self.min_requests
+                    and health.error_rate >= self.error_rate_threshold)):
+            if health.state != CIRCUIT_OPEN:
+                logger.warning(
+                    f"Circuit opened for {provider_name}/{target} "
+                    f"({health.consecutive_failures} consecutive failures, "
+                    f"error rate {health.error_rate:.2f})")
+            health.state = CIRCUIT_OPEN
+            health.opened_at = time.monotonic()
+
+    async def call(
+        self,
+        provider_name: str,
+        target: str,
+        request: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Run a request against a backend, recording its outcome.
+
+        Args:
+            provider_name: Registered provider name
+            target: Index or document type the request goes to
+            request: Factory creating the request coroutine
+
+        Returns:
+            The request result
+
+        Raises:
+            CircuitOpenError: If the backend circuit is open
+
+        Errors from the request are re-raised; only backend faults (see
+        is_backend_failure) are recorded as failures.
+        """
+        health = self._acquire(provider_name, target)
+        started = time.monotonic()
+        try:
+            result = await request()
+        except BaseException as e:
+            # Cancellation and caller errors say nothing about backend health
+            if isinstance(e, Exception) and is_backend_failure(e):
+                self._record(provider_name, target, health,
+                             time.monotonic() - started, failed=True)
+            else:
+                health.probe_in_flight = False
+            raise
+        self._record(provider_name, target, health,
+                     time.monotonic() - started, failed=False)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get health counters per provider/index backend."""
+        stats = {}
+        for (provider_name, target), health in self._backends.items():
+            state = health.state
+            if state == CIRCUIT_OPEN and not self.is_open(provider_name, target):
+                state = CIRCUIT_HALF_OPEN
+            stats[f"{provider_name}/{target}"] = {
+                "state": state,
+                "ewma_latency_ms": (
+                    round(health.ewma_latency * 1000, 1)
+                    if health.ewma_latency is not None else None),
+                "error_rate": round(health.error_rate, 3),
+                "requests": health.requests,
+                "failures": health.failures,
+                "rejected": health.rejected
+            }
+        return stats
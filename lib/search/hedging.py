@@ -0,0 +1,152 @@
+"""
+Hedged requests for tail-latency control.
+
+When a request runs longer than the observed p95 latency for its target, a
+duplicate is sent and whichever response arrives first wins. A hedge budget
+caps the extra load to a fraction of all requests.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgingPolicy:
+    """Per-target latency tracking and budgeted request hedging."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        window: int = 200,
+        min_delay_ms: float = 50.0,
+        budget_ratio: float = 0.1
+    ):
+        """
+        Initialize the hedging policy.
+
+        Args:
+            enabled: Send hedges (latencies are tracked either way)
+            percentile: Latency percentile after which a hedge is sent
+            min_samples: Samples needed per target before hedging starts
+            window: Recent latencies kept per target
+            min_delay_ms: Lower bound on the hedge delay
+            budget_ratio: Maximum hedges as a fraction of all requests
+        """
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.min_delay = min_delay_ms / 1000.0
+        self.budget_ratio = budget_ratio
+
+        self._latencies: Dict[str, Deque[float]] = {}
+
+        self.requests = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def record(self, target: str, latency: float) -> None:
+        """Record a completed request latency in seconds."""
+        samples = self._latencies.get(target)
+        if samples is None:
+            samples = self._latencies[target] = deque(maxlen=self.window)
+        samples.append(latency)
+
+    def hedge_delay(self, target: str) -> Optional[float]:
+        """Get the delay before hedging a request to a target, or None if too few samples."""
+        samples = self._latencies.get(target)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        return max(self.min_delay, float(np.percentile(samples, self.percentile)))
+
+    def _budget_allows(self) -> bool:
+        return self.hedges_sent < self.budget_ratio * self.requests
+
+    async def run(self, target: str, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a request, hedging it once if it outlives the target's p95 latency.
+
+        Args:
+            target: Latency tracking key (e.g. index name)
+            request: Factory creating a fresh request coroutine per call
+
+        Returns:
+            The first successful response
+        """
+        self.requests += 1
+        delay = self.hedge_delay(target) if self.enabled else None
+
+        started = time.monotonic()
+        primary = asyncio.ensure_future(request())
+        if delay is None:
+            result = await primary
+            self.record(target, time.monotonic() - started)
+            return result
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            result = primary.result()
+            self.record(target, time.monotonic() - started)
+            return result
+
+        if not self._budget_allows():
+            self.budget_denied += 1
+            result = await primary
+            self.record(target, time.monotonic() - started)
+            return result
+
+        self.hedges_sent += 1
+        hedge_started = time.monotonic()
+        hedge = asyncio.ensure_future(request())
+        logger.debug(f"Hedging request to {target} after {delay * 1000:.0f}ms")
+
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if task is hedge:
+                        self.hedge_wins += 1
+                        self.record(target, time.monotonic() - hedge_started)
+                    else:
+                        self.record(target, time.monotonic() - started)
+                    return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging counters and per-target hedge delays."""
+        return {
+            "enabled": self.enabled,
+            "requests": self.requests,
+            "hedges_sent": self.hedges_sent,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "hedge_rate": self.hedges_sent / self.requests if self.requests else 0.0,
+            "hedge_delays_ms": {
+                target: round(delay * 1000, 1)
+                for target in self._latencies
+                if (delay := self.hedge_delay(target)) is not None
+            }
+        }
@@ -2,15 +2,56 @@
 Search manager for orchestrating multiple search providers.
 """
 import logging
-from typing import Any, Dict, List, Optional
+import weakref
+from dataclasses import replace
+from typing import (Any, AsyncIterator, Awaitable, Callable, Dict, List,
+                    Optional)
 
 from .base import (DocumentType, SearchProvider, SearchQuery, SearchResult,
                    SearchStatistics)
+from .dedup import (collapse_duplicates, collapse_provider_duplicates,
+                    get_duplicate_detector)
+from .health import HealthTracker
+from .multimodal import OverfetchEstimator, content_type_matches
 from .providers.azure_search import AzureSearchProvider
+from .providers.local_search import LocalSearchProvider
 from .providers.web_search import WebSearchProvider
+from .result_cache import SearchResultCache
+from .semantic_cache import SemanticQueryCache
 
 logger = logging.getLogger(__name__)
 
+# Managers that may hold open provider connections, closed on shutdown
+_live_managers: "weakref.WeakSet[SearchManager]" = weakref.WeakSet()
+
+
+# Process-wide manager shared by every plugin, created on first use
+_shared_manager: Optional["SearchManager"] = None
+
+
+def get_search_manager() -> "SearchManager":
+    """
+    Get the process-wide SearchManager, creating it on first use.
+
+    All plugins share its provider clients, connection pool, result cache and
+    statistics.
+
+    Returns:
+        Shared search manager
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        from ..config import get_config
+        _shared_manager = SearchManager(get_config())
+        logger.info("Shared Search Manager created")
+    return _shared_manager
+
+
+async def close_search_managers() -> None:
+    """Close every live SearchManager and its provider connections."""
+    for manager in list(_live_managers):
+        await manager.close()
+
 
 class SearchManager:
     """Manager for orchestrating multiple search providers."""
@@ -19,9 +60,125 @@ class SearchManager:
         """Initialize search manager with available providers."""
         self.config = config
         self.providers: Dict[str, SearchProvider] = {}
+        # Supported document type values per provider id, built on first check
+        self._supported_values: Dict[int, frozenset] = {}
+        self.result_cache = self._create_result_cache()
+        self.semantic_cache = self._create_semantic_cache()
+        self.health = self._create_health_tracker()
+        self.deduplicator = get_duplicate_detector()
+        self.multimodal_overfetch = self._create_overfetch_estimator()
+        self.last_dedup_report: Optional[Dict[str, Any]] = None
+        self._dedup_totals = {"calls": 0, "input": 0, "output": 0, "tokens_saved": 0}
 
         # Initialize available providers
         self._initialize_providers()
+        _live_managers.add(self)
+
+    def _create_result_cache(self) -> Optional[SearchResultCache]:
+        """Create the result cache from project configuration, or None if disabled."""
+        try:
+            from lib.config.project_config import get_project_config
+            project_config = get_project_config()
+            if project_config:
+                settings = project_config.search_config.result_cache
+                if not settings.enabled:
+                    logger.info("Search result cache disabled by configuration")
+                    return None
+                return SearchResultCache(
+                    max_entries=settings.max_entries,
+                    ttl_seconds=settings.ttl_seconds,
+                    provider_ttl_seconds=settings.provider_ttl_seconds
+                )
+        except Exception as e:
+            logger.warning(
+                f"Could not load result cache configuration, using defaults: {e}")
+        return SearchResultCache()
+
+    def _create_semantic_cache(self) -> Optional[SemanticQueryCache]:
+        """Create the semantic query cache from project configuration, or None if disabled."""
+        try:
+            from lib.config.project_config import get_project_config
+            project_config = get_project_config()
+            if project_config:
+                settings = project_config.search_config.semantic_cache
+                if not settings.enabled:
+                    logger.info("Semantic query cache disabled by configuration")
+                    return None
+                return SemanticQueryCache(
+                    similarity_threshold=settings.similarity_threshold,
+                    max_entries=settings.max_entries,
+                    ttl_seconds=settings.ttl_seconds
+                )
+        except Exception as e:
+            logger.warning(
+                f"Could not load semantic cache configuration, leaving it disabled: {e}")
+        return None
+
+    def _create_health_tracker(self) -> Optional[HealthTracker]:
+        """Create the provider health tracker from project configuration, or None if disabled."""
+        try:
+            from lib.config.project_config import get_project_config
+            project_config = get_project_config()
+            if project_config:
+                settings = project_config.search_config.health
+                if not settings.enabled:
+                    logger.info("Provider health tracking disabled by configuration")
+                    return None
+                return HealthTracker(
+                    ewma_alpha=settings.ewma_alpha,
+                    failure_threshold=settings.failure_threshold,
+                    error_rate_threshold=settings.error_rate_threshold,
+                    min_requests=settings.min_requests,
+                    open_seconds=settings.open_seconds,
+                    error_penalty=settings.error_penalty
+                )
+        except Exception as e:
+            logger.warning(
+                f"Could not load provider health configuration, using defaults: {e}")
+        return HealthTracker()
+
+    def _create_overfetch_estimator(self) -> OverfetchEstimator:
+        """Create the multimodal post-filter over-fetch estimator from project configuration."""
+        try:
+            from lib.config.project_config import get_project_config
+            project_config = get_project_config()
+            if project_config:
+                settings = project_config.search_config.multimodal
+                return OverfetchEstimator(
+                    initial_factor=settings.initial_overfetch,
+                    max_factor=settings.max_overfetch
+                )
+        except Exception as e:
+            logger.warning(
+                f"Could not load multimodal search configuration, using defaults: {e}")
+        return OverfetchEstimator()
+
+    def _record_dedup(self, operation: str, report: Dict[str, Any]) -> None:
+        """Log a per-call deduplication report and add it to the running totals."""
+        self.last_dedup_report = report
+        self._dedup_totals["calls"] += 1
+        self._dedup_totals["input"] += report["input"]
+        self._dedup_totals["output"] += report["output"]
+        self._dedup_totals["tokens_saved"] += report["tokens_saved"]
+        if report["output"] < report["input"]:
+            logger.info(
+                f"{operation}: collapsed {report['input']} hits to {report['output']} "
+                f"({report['exact_duplicates']} exact, {report['near_duplicates']} near duplicates, "
+                f"~{report['tokens_saved']} tokens saved)")
+
+    async def close(self) -> None:
+        """Close all registered providers."""
+        for provider_name, provider in self.providers.items():
+            try:
+                await provider.close()
+            except Exception as e:
+                logger.warning(
+                    f"Failed to close provider {provider_name}: {e}")
+        _live_managers.discard(self)
+
+        global _shared_manager
+        if _shared_manager is self:
+            _shared_manager = None
 
     def _initialize_providers(self) -> None:
         """Initialize all available search providers."""
@@ -36,6 +193,15 @@ class SearchManager:
         except Exception as e:
             logger.error(f"Failed to initialize Azure Search Provider: {e}")
 
+        try:
+            # Register the offline local provider when configured
+            from lib.config.project_config import get_project_config
+            project_config = get_project_config()
+            if project_config and project_config.search_config.local.enabled:
+                self.add_provider("local", LocalSearchProvider(self.config))
+        except Exception as e:
+            logger.error(f"Failed to initialize Local Search Provider: {e}")
+
         try:
             # Check if web search is enabled in configuration
             web_search_enabled = True  # Default to enabled for backward compatibility
@@ -87,12 +253,50 @@ class SearchManager:
         Returns:
             List of search results
         """
+        providers = self._get_search_candidates(document_type, provider_name)
+        if not providers:
+            raise ValueError(
+                f"No available provider for document type {document_type}")
+
+        # Fail over to the next healthiest provider that serves the type
+        for provider in providers[:-1]:
+            try:
+                return await self._cached_search(provider, query, document_type)
+            except Exception as e:
+                logger.warning(
+                    f"Search on {self._get_provider_name(provider)} failed, "
+                    f"failing over: {e}")
+        return await self._cached_search(providers[-1], query, document_type)
+
+    async def search_stream(
+        self,
+        query: SearchQuery,
+        document_type: DocumentType,
+        provider_name: Optional[str] = None
+    ) -> AsyncIterator[List[SearchResult]]:
+        """
+        Stream search results page by page, best page first.
+
+        Providers without paged retrieval yield their full result list once.
+
+        Args:
+            query: Search query parameters
+            document_type: Type of documents to search
+            provider_name: Specific provider to use (optional)
+
+        Yields:
+            Lists of search results, one per page
+        """
         provider = self._get_provider_for_search(document_type, provider_name)
         if not provider:
             raise ValueError(
                 f"No available provider for document type {document_type}")
 
-        return await provider.search(query, document_type)
+        if hasattr(provider, 'search_pages'):
+            async for page in provider.search_pages(query, document_type):
+                yield page
+        else:
+            yield await self._cached_search(provider, query, document_type)
 
     async def search_internal_all(
         self,
@@ -126,13 +330,40 @@ class SearchManager:
         internal_providers = {k: v for k, v in self.providers.items() if k != "web"}
         if provider_name and provider_name in internal_providers:
             provider = internal_providers[provider_name]
+        elif self.health is not None and internal_providers:
+            name = min(internal_providers,
+                       key=lambda name: self.health.score(name, "all"))
+            provider = internal_providers[name]
         else:
             provider = next(iter(internal_providers.values())) if internal_providers else None
 
         if not provider:
             raise ValueError("No available internal providers for search_internal_all")
 
-        return await provider.search_all(query, top_k_per_source)
+        name = self._get_provider_name(provider)
+
+        async def fetch():
+            # Embed only on an exact cache miss
+            vector_query = await self._with_query_vector(provider, query)
+            return await self._semantic_fetch(
+                SemanticQueryCache.make_partition(
+                    name, "search_all", vector_query, None, top_k_per_source),
+                vector_query,
+                lambda: self._tracked(
+                    name, "all", lambda: provider.search_all(vector_query, top_k_per_source)))
+
+        if self.result_cache is None:
+            results = await fetch()
+        else:
+            key = SearchResultCache.make_key(
+                name, "search_all", query, None, top_k_per_source)
+            results = await self.result_cache.get_or_fetch(key, name, fetch)
+
+        if self.deduplicator is None:
+            return results
+        results, report = collapse_duplicates(results, self.deduplicator)
+        self._record_dedup("search_all", report)
+        return results
 
     async def search_multi_provider(
         self,
@@ -164,13 +395,17 @@ class SearchManager:
                         use_semantic_search=query.use_semantic_search,
                         document_type=document_type
                     )
-                    provider_results = await provider.search(search_query, document_type)
+                    provider_results = await self._cached_search(
+                        provider, search_query, document_type)
                     results[provider_name] = provider_results
                 except Exception as e:
                     logger.warning(
                         f"Search failed for provider {provider_name}: {e}")
                     results[provider_name] = []
 
+        if self.deduplicator is not None:
+            results, report = collapse_provider_duplicates(results, self.deduplicator)
+            self._record_dedup("search_multi_provider", report)
         return results
 
     async def search_multimodal(
@@ -199,38 +434,154 @@ class SearchManager:
             raise ValueError(
                 f"No available provider for document type {document_type}")
 
+        name = self._get_provider_name(provider)
+        target = getattr(document_type, 'value', str(document_type))
+
         # Check if provider supports multimodal search
         if hasattr(provider, 'search_multimodal'):
-            return await provider.search_multimodal(query, document_type, include_images, include_text)
+            return await self._tracked(
+                name, target,
+                lambda: provider.search_multimodal(
+                    query, document_type, include_images, include_text))
         else:
-            # Fallback to regular search with post-processing
-            results = await provider.search(query, document_type)
+            # Fallback to regular search with post-processing, over-fetching
+            # by the pass rate seen for this provider and selection
+            overfetch_key = (name, target, include_images, include_text)
+            fetch_k = self.multimodal_overfetch.fetch_size(overfetch_key, query.top_k)
+            fetch_query = replace(query, top_k=fetch_k)
+            results = await self._tracked(
+                name, target, lambda: provider.search(fetch_query, document_type))
 
             # Filter results based on content type if metadata is available
             filtered_results = []
             for result in results:
                 if result.metadata and "content_type" in result.metadata:
-                    content_type = result.metadata["content_type"]
-
-                    should_include = False
-                    if content_type == "text" and include_text:
-                        should_include = True
-                    elif content_type == "image" and include_images:
-                        should_include = True
-                    elif content_type == "mixed" and (include_text or include_images):
-                        should_include = True
-
-                    if should_include:
+                    if content_type_matches(
+                            result.metadata["content_type"], include_images, include_text):
                         filtered_results.append(result)
                 else:
                     # If no content type metadata, include by default
                     filtered_results.append(result)
+            self.multimodal_overfetch.record(
+                overfetch_key, len(results), len(filtered_results))
+            filtered_results = filtered_results[:query.top_k]
 
             logger.info(f"Multimodal search completed via fallback: {len(
                 filtered_results)} results " f"(images: {include_images}, text: {include_text})")
 
             return filtered_results
 
+    async def _cached_search(
+        self,
+        provider: SearchProvider,
+        query: SearchQuery,
+        document_type: DocumentType
+    ) -> List[SearchResult]:
+        """Run a provider search through the exact and semantic result caches when enabled."""
+        name = self._get_provider_name(provider)
+        target = getattr(document_type, 'value', str(document_type))
+
+        async def fetch():
+            # Embed only on an exact cache miss
+            vector_query = await self._with_query_vector(provider, query)
+            return await self._semantic_fetch(
+                SemanticQueryCache.make_partition(name, "search", vector_query, document_type),
+                vector_query,
+                lambda: self._tracked(
+                    name, target, lambda: provider.search(vector_query, document_type)))
+
+        if self.result_cache is None:
+            return await fetch()
+
+        key = SearchResultCache.make_key(name, "search", query, document_type)
+        return await self.result_cache.get_or_fetch(key, name, fetch)
+
+    async def _with_query_vector(self, provider: SearchProvider, query: SearchQuery) -> SearchQuery:
+        """
+        Attach the query embedding to a hybrid query for semantic cache lookups.
+
+        The provider reuses the attached vector instead of embedding the text
+        again, so this moves the embedding call rather than adding one.
+        """
+        if (self.semantic_cache is None or not query.use_hybrid_search
+                or query.vector is not None):
+            return query
+        embedding_provider = getattr(provider, 'embedding_provider', None)
+        if embedding_provider is None:
+            return query
+        try:
+            vector = await embedding_provider.generate_embedding(query.text)
+        except Exception as e:
+            logger.warning(f"Could not embed query for the semantic cache: {e}")
+            return query
+        return replace(query, vector=vector) if vector else query
+
+    async def _semantic_fetch(
+        self,
+        partition: Any,
+        query: SearchQuery,
+        fetch: Callable[[], Awaitable[List[SearchResult]]]
+    ) -> List[SearchResult]:
+        """Serve a near-identical earlier query from the semantic cache, else fetch and remember."""
+        if self.semantic_cache is None or query.vector is None:
+            return await fetch()
+        results = self.semantic_cache.lookup(partition, query.text, query.vector)
+        if results is not None:
+            return results
+        results = await fetch()
+        self.semantic_cache.put(partition, query.text, query.vector, results)
+        return results
+
+    async def _tracked(
+        self,
+        provider_name: str,
+        target: str,
+        request: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run a provider request through its circuit breaker when health tracking is enabled."""
+        if self.health is None:
+            return await request()
+        return await self.health.call(provider_name, target, request)
+
+    def _get_provider_name(self, provider: SearchProvider) -> str:
+        """Get the name a provider is registered under."""
+        for name, registered in self.providers.items():
+            if registered is provider:
+                return name
+        return type(provider).__name__
+
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Get hit-rate metrics for the search result cache."""
+        if self.result_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.result_cache.get_stats()}
+
+    def get_semantic_cache_statistics(self) -> Dict[str, Any]:
+        """Get hit-rate and similarity metrics for the semantic query cache."""
+        if self.semantic_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.semantic_cache.get_stats()}
+
+    def get_dedup_statistics(self) -> Dict[str, Any]:
+        """Get running deduplication totals and the last per-call report."""
+        if self.deduplicator is None:
+            return {"enabled": False}
+        totals = self._dedup_totals
+        return {
+            "enabled": True,
+            **totals,
+            "dedup_ratio": (
+                (totals["input"] - totals["output"]) / totals["input"]
+                if totals["input"] else 0.0),
+            "last_call": self.last_dedup_report
+        }
+
+    def get_health_statistics(self) -> Dict[str, Any]:
+        """Get latency, error rate and circuit state per provider/index backend."""
+        if self.health is None:
+            return {"enabled": False}
+        return {"enabled": True, "backends": self.health.get_stats()}
+
     def get_statistics(self) -> Dict[str, Dict[str, Any]]:
         """Get statistics from all providers."""
         all_stats = {}
@@ -283,35 +634,15 @@ class SearchManager:
                         image_fields = []
                         text_fields = []
 
-                        # Try to access index schema if available
-                        schema = None
-                        if hasattr(client, 'get_index_schema'):
-                            try:
-                                schema = client.get_index_schema()
-                            except Exception as e:
-                                logger.warning(
-                                    f"Failed to get index schema for {doc_type}: {e}")
-                                # Try fallback method if primary method fails
-                                if hasattr(client, 'get_index_definition'):
-                                    try:
-                                        schema = client.get_index_definition()
-                                        logger.debug(
-                                            f"Successfully retrieved schema using fallback method for {doc_type}")
-                                    except Exception as e2:
-                                        logger.warning(
-                                            f"Failed to get index definition for {doc_type}: {e2}")
-                        elif hasattr(client, 'get_index_definition'):
-                            try:
-                                schema = client.get_index_definition()
-                            except Exception as e:
-                                logger.warning(
-                                    f"Failed to get index definition for {doc_type}: {e}")
+                        # Use schemas already probed by the provider instead of
+                        # fetching them again on every call
+                        capabilities = None
+                        if hasattr(provider, 'get_index_capabilities'):
+                            capabilities = provider.get_index_capabilities().get(doc_type.value)
 
                         # Analyze schema for image understanding features
-                        if schema and 'fields' in schema:
-                            for field in schema['fields']:
-                                field_name = field.get('name', '')
-
+                        if capabilities is not None:
+                            for field_name, field_type in capabilities.fields.items():
                                 # Detect image fields
                                 if field_name == 'image_document_id':
                                     has_image_document_id = True
@@ -325,28 +656,20 @@ class SearchManager:
 
                                 # Detect location metadata (indicates image
                                 # understanding)
-                                if field_name == 'locationMetadata' and field.get(
-                                        'type') == 'Edm.ComplexType':
+                                if field_name == 'locationMetadata' and field_type == 'Edm.ComplexType':
                                     has_location_metadata = True
-
-                                    # Check for bounding polygons in nested
-                                    # fields
-                                    if 'fields' in field:
-                                        for subfield in field['fields']:
-                                            if subfield.get(
-                                                    'name') == 'boundingPolygons':
-                                                has_bounding_polygons = True
+                                    # Check for bounding polygons in nested fields
+                                    has_bounding_polygons = 'boundingPolygons' in capabilities.subfields.get(
+                                        field_name, [])
 
                             # Check if verbalization is likely supported
                             has_verbalization_capability = is_multimodal or has_location_metadata
 
                             # Check for vectorizers that support image
                             # verbalization
-                            if 'vectorSearch' in schema and 'vectorizers' in schema['vectorSearch']:
-                                for vectorizer in schema['vectorSearch']['vectorizers']:
-                                    if vectorizer.get('kind') == 'azureOpenAI' or 'multimodal' in vectorizer.get(
-                                            'name', '').lower():
-                                        has_verbalization_capability = True
+                            for vectorizer_name, kind in capabilities.vectorizer_kinds.items():
+                                if kind == 'azureOpenAI' or 'multimodal' in vectorizer_name.lower():
+                                    has_verbalization_capability = True
 
                         # Determine image understanding capabilities based on
                         # detected features
@@ -364,7 +687,8 @@ class SearchManager:
                             "has_bounding_polygons": has_bounding_polygons,
                             "image_fields": image_fields,
                             "text_fields": text_fields,
-                            "vector_field": getattr(provider, 'vector_field_map', {}).get(doc_type, "content_embedding")
+                            "vector_field": getattr(provider, 'vector_field_map', {}).get(doc_type, "content_embedding"),
+                            "schema_probed": capabilities is not None
                         }
 
                         # Add semantic configuration info if available
@@ -407,47 +731,60 @@ class SearchManager:
         provider_name: Optional[str] = None
     ) -> Optional[SearchProvider]:
         """Get the best provider for a specific search."""
+        providers = self._get_search_candidates(document_type, provider_name)
+        return providers[0] if providers else None
+
+    def _get_search_candidates(
+        self,
+        document_type: DocumentType,
+        provider_name: Optional[str] = None
+    ) -> List[SearchProvider]:
+        """
+        Get the providers that can serve a search, healthiest first.
+
+        A requested provider that supports the document type is used alone.
+        Otherwise providers are ranked by health score, keeping registration
+        order between equally healthy providers.
+        """
         if provider_name and provider_name in self.providers:
             provider = self.providers[provider_name]
             if self._provider_supports_document_type(provider, document_type):
-                return provider
+                return [provider]
             else:
                 logger.warning(
                     f"Provider {provider_name} does not support {document_type}")
 
-        # Find first available provider that supports the document type
-        for provider in self.providers.values():
-            if self._provider_supports_document_type(provider, document_type):
-                return provider
+        candidates = [
+            provider for provider in self.providers.values()
+            if self._provider_supports_document_type(provider, document_type)]
+        if self.health is None or len(candidates) < 2:
+            return candidates
 
-        return None
+        target = getattr(document_type, 'value', str(document_type))
+        return sorted(
+            candidates,
+            key=lambda provider: self.health.score(
+                self._get_provider_name(provider), target))
 
     def _provider_supports_document_type(
             self,
             provider: SearchProvider,
             document_type: DocumentType) -> bool:
         """Check if provider supports the document type using value comparison."""
-        supported_types = provider.get_supported_document_types()
-
-        # Check for exact object match first
-        if document_type in supported_types:
-            return True
-
-        # Check for value-based match
-        document_type_value = getattr(
-            document_type, 'value', str(document_type))
-        for supported_type in supported_types:
-            supported_value = getattr(
-                supported_type, 'value', str(supported_type))
-            if document_type_value == supported_value:
-                return True
+        supported_values = self._supported_values.get(id(provider))
+        if supported_values is None:
+            supported_values = frozenset(
+                getattr(supported_type, 'value', str(supported_type))
+                for supported_type in provider.get_supported_document_types())
+            self._supported_values[id(provider)] = supported_values
 
-        return False
+        return getattr(document_type, 'value', str(document_type)) in supported_values
 
     def add_provider(self, name: str, provider: SearchProvider):
         """Add a search provider to the manager."""
         if provider.is_available():
             self.providers[name] = provider
+            self._supported_values.pop(id(provider), None)
             logger.info(f"{name.title()} Search Provider registered")
         else:
             logger.warning(f"{name.title()} Search Provider is not available")
@@ -455,7 +792,12 @@ class SearchManager:
     def remove_provider(self, name: str):
         """Remove a search provider from the manager."""
         if name in self.providers:
+            self._supported_values.pop(id(self.providers[name]), None)
             del self.providers[name]
+            if self.result_cache is not None:
+                self.result_cache.clear()
+            if self.semantic_cache is not None:
+                self.semantic_cache.clear()
             logger.info(f"{name.title()} Search Provider removed")
 
     def get_provider(self, name: str) -> Optional[SearchProvider]:
@@ -476,7 +818,8 @@ class SearchManager:
             
             # Create a basic SearchQuery from search_params for compatibility
             # Web provider may use search_params directly or convert as needed
-            response = await web_provider.search_web(search_params)
+            response = await self._tracked(
+                "web", "web", lambda: web_provider.search_web(search_params))
             
             return response
             
@@ -0,0 +1,103 @@
+"""
+Content-type selection for multimodal search.
+
+A hit's content type follows from which document ids it carries: text
+(text_document_id), image (image_document_id) or mixed (both). When the index
+can filter on those ids the selection is compiled into the OData $filter, so
+the service returns top_k matching hits. Otherwise hits are post-filtered,
+over-fetching by the pass rate observed for that index and selection.
+"""
+import logging
+import math
+from typing import Any, Dict, Hashable, Optional
+
+from .capabilities import IndexCapabilities
+
+logger = logging.getLogger(__name__)
+
+TEXT_ID_FIELD = "text_document_id"
+IMAGE_ID_FIELD = "image_document_id"
+
+
+def content_type_matches(content_type: str, include_images: bool, include_text: bool) -> bool:
+    """Check whether a hit's content type is selected."""
+    if content_type == "text":
+        return include_text
+    if content_type == "image":
+        return include_images
+    if content_type == "mixed":
+        return include_text or include_images
+    return False
+
+
+def content_type_filter(
+    include_images: bool,
+    include_text: bool,
+    capabilities: Optional[IndexCapabilities]
+) -> Optional[str]:
+    """
+    Compile a content-type selection into an OData filter.
+
+    Text selects hits with a text id (text and mixed), images select hits with
+    an image id (image and mixed), both select hits with either id.
+
+    Returns:
+        The filter, or None if the index is not known to filter on the ids
+    """
+    if capabilities is None or not (include_images or include_text):
+        return None
+    clauses = []
+    if include_text:
+        clauses.append(f"{TEXT_ID_FIELD} ne null")
+    if include_images:
+        clauses.append(f"{IMAGE_ID_FIELD} ne null")
+    fields = [clause.split(" ", 1)[0] for clause in clauses]
+    if not all(capabilities.is_filterable(field) for field in fields):
+        return None
+    return clauses[0] if len(clauses) == 1 else f"({' or '.join(clauses)})"
+
+
+def combine_filters(filter_expression: Optional[str], extra_filter: str) -> str:
+    """AND an extra clause onto an optional existing filter."""
+    if not filter_expression:
+        return extra_filter
+    return f"({filter_expression}) and {extra_filter}"
+
+
+class OverfetchEstimator:
+    """Learns how many hits to fetch so post-filtering still yields top_k."""
+
+    def __init__(self, initial_factor: float = 2.0, max_factor: float = 4.0, alpha: float = 0.3):
+        """
+        Initialize the estimator.
+
+        Args:
+            initial_factor: Over-fetch factor before any pass rate is observed
+            max_factor: Largest over-fetch factor
+            alpha: Weight of the newest observation in the pass rate average
+        """
+        self.initial_factor = max(1.0, initial_factor)
+        self.max_factor = max(self.initial_factor, max_factor)
+        self.alpha = alpha
+        self._pass_rates: Dict[Hashable, float] = {}
+
+    def fetch_size(self, key: Hashable, top_k: int, limit: Optional[int] = None) -> int:
+        """Get the number of hits to request for top_k to survive the post-filter."""
+        pass_rate = self._pass_rates.get(key, 1.0 / self.initial_factor)
+        factor = min(self.max_factor, 1.0 / max(pass_rate, 1e-6))
+        size = max(top_k, math.ceil(top_k * factor))
+        return min(size, max(limit, top_k)) if limit else size
+
+    def record(self, key: Hashable, fetched: int, kept: int) -> None:
+        """Record how many fetched hits passed the post-filter."""
+        if fetched <= 0:
+            return
+        observed = kept / fetched
+        previous = self._pass_rates.get(key)
+        self._pass_rates[key] = (
+            observed if previous is None
+            else self.alpha * observed + (1 - self.alpha) * previous)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the observed pass rate per key."""
+        return {str(key): round(rate, 3) for key, rate in self._pass_rates.items()}
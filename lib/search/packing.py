@@ -0,0 +1,163 @@
+"""
+Token-budgeted packing of search results into tool-call output.
+
+Every character a search tool returns is paid for in LLM context. The packer
+encodes results compactly, truncates long content with an ellipsis marker
+and adds results best first until the per-call token budget is spent. Only
+retrieved text is truncated; URLs, titles, paths and ids are kept intact so
+citations still resolve.
+"""
+import logging
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .base import SearchResult
+from .dedup import estimate_tokens
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+ELLIPSIS = "…"
+
+# Keys holding retrieved text, truncated together with everything nested in them
+CONTENT_FIELDS = frozenset({
+    "content_text", "snippet", "raw_content", "chunks", "text", "captions",
+    "highlights", "answers", "image_description"})
+# Citation and identity keys, never truncated even inside content
+CITATION_FIELDS = frozenset({
+    "url", "image_url", "title", "document_title", "content_path", "domain",
+    "source_index", "document_type"})
+# SearchResult attributes holding retrieved text
+_RESULT_CONTENT_FIELDS = ("content_text", "captions", "highlights", "answers")
+
+PackItem = Union[SearchResult, Dict[str, Any]]
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Cut text to at most max_chars at a word boundary, marking the cut."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", max_chars // 2, max_chars)
+    return text[:cut if cut != -1 else max_chars].rstrip() + ELLIPSIS
+
+
+def _is_citation_field(key: Any) -> bool:
+    return key in CITATION_FIELDS or (isinstance(key, str) and key.endswith("_id"))
+
+
+class ResultPacker:
+    """Packs result dictionaries into a compact JSON list within a token budget."""
+
+    def __init__(self, max_tokens: int = 6000, max_content_chars: int = 1500, min_content_chars: int = 200):
+        """
+        Initialize the packer.
+
+        Args:
+            max_tokens: Token budget for one tool call's output
+            max_content_chars: Content characters kept per result before truncation
+            min_content_chars: Smallest content worth shrinking the last result to
+        """
+        self.max_tokens = max_tokens
+        self.max_content_chars = max_content_chars
+        self.min_content_chars = min_content_chars
+
+    @staticmethod
+    def _fused_score(item: PackItem) -> Optional[float]:
+        if isinstance(item, SearchResult):
+            return (item.metadata or {}).get("fused_score")
+        return item.get("fused_score")
+
+    @classmethod
+    def _order(cls, items: Sequence[PackItem]) -> List[PackItem]:
+        """Order by fused score when every result has one, otherwise keep rank order."""
+        if items and all(cls._fused_score(item) is not None for item in items):
+            return sorted(items, key=lambda item: -cls._fused_score(item))
+        return list(items)
+
+    @classmethod
+    def _shrink(cls, value: Any, max_chars: int, cut: bool = False) -> Tuple[Any, bool]:
+        """
+        Copy a value without null fields and with its retrieved text truncated to max_chars.
+
+        Strings are cut only under a CONTENT_FIELDS key, and never under a
+        citation key such as a URL, title or id.
+        """
+        if isinstance(value, SearchResult):
+            changes, truncated = {}, False
+            for name in _RESULT_CONTENT_FIELDS:
+                item = getattr(value, name)
+                if item is not None:
+                    shrunk, was_truncated = cls._shrink(item, max_chars, True)
+                    if was_truncated:
+                        changes[name] = shrunk
+                        truncated = True
+            return (replace(value, **changes) if changes else value), truncated
+        if isinstance(value, str):
+            if cut and len(value) > max_chars:
+                return _truncate(value, max_chars), True
+            return value, False
+        if isinstance(value, dict):
+            shrunk, truncated = {}, False
+            for key, item in value.items():
+                if item is None:
+                    continue
+                child_cut = not _is_citation_field(key) and (cut or key in CONTENT_FIELDS)
+                shrunk[key], was_truncated = cls._shrink(item, max_chars, child_cut)
+                truncated |= was_truncated
+            return shrunk, truncated
+        if isinstance(value, list):
+            pairs = [cls._shrink(item, max_chars, cut) for item in value]
+            return [item for item, _ in pairs], any(flag for _, flag in pairs)
+        return value, False
+
+    def pack(self, items: Sequence[PackItem], max_tokens: Optional[int] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Encode results best first until the token budget is spent.
+
+        The JSON list holds only results; the packed token count and the
+        numbers of truncated and dropped results are returned separately.
+
+        Args:
+            items: SearchResult objects or result dictionaries in rank order
+            max_tokens: Budget override for this call
+
+        Returns:
+            (compact JSON string, packing report)
+        """
+        budget = max_tokens or self.max_tokens
+        encoded: List[str] = []
+        used = 2  # Enclosing brackets
+        truncated = 0
+        ordered = self._order(items)
+
+        for item in ordered:
+            packed, was_truncated = self._shrink(item, self.max_content_chars)
+            text = dumps(packed)
+            tokens = estimate_tokens(text) + 1
+            if used + tokens > budget:
+                # Squeeze a shortened version of this result into what is left
+                overhead = estimate_tokens(dumps(self._shrink(item, 0)[0])) + 1
+                remaining_chars = (budget - used - overhead) * 4
+                if remaining_chars < self.min_content_chars:
+                    break
+                packed, was_truncated = self._shrink(item, remaining_chars)
+                text = dumps(packed)
+                tokens = estimate_tokens(text) + 1
+                if used + tokens > budget:
+                    break
+            truncated += was_truncated
+            encoded.append(text)
+            used += tokens
+
+        report = {
+            "results": len(encoded),
+            "dropped": len(ordered) - len(encoded),
+            "truncated": truncated,
+            "packed_tokens": used,
+            "token_budget": budget
+        }
+        if report["dropped"] or report["truncated"]:
+            logger.info(
+                f"Packed {report['results']} results into ~{used} tokens "
+                f"({report['truncated']} truncated, {report['dropped']} dropped, budget {budget})")
+        return "[" + ",".join(encoded) + "]", report
@@ -2,15 +2,16 @@
 Semantic Kernel plugin wrapper for the modular search system.
 Dynamically generates search functions based on project configuration.
 """
-import json
 from typing import Annotated, Literal, Optional
 import logging
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Tuple
 
 from semantic_kernel.functions import kernel_function
 
 from .base import DocumentType, SearchQuery
-from .manager import SearchManager
+from .manager import SearchManager, get_search_manager
+from .packing import ResultPacker
+from .serialization import dumps, encode_results, result_to_dict
 
 logger = logging.getLogger(__name__)
 
@@ -21,11 +22,13 @@ class ModularSearchPlugin:
     def __init__(self, config: Optional[any] = None):
         """Initialize the modular search plugin with dynamic functions."""
         if config is None:
-            from ..config import get_config
-            config = get_config()
-
-        self.search_manager = SearchManager(config)
+            # Providers and their pooled clients are shared process-wide
+            self.search_manager = get_search_manager()
+            config = self.search_manager.config
+        else:
+            self.search_manager = SearchManager(config)
         self.config = config
+        self.packer = self._create_packer()
 
         # Generate dynamic search functions based on project config
         self._generate_dynamic_functions()
@@ -34,6 +37,54 @@ class ModularSearchPlugin:
         self._configure_web_search_function()
 
         logger.info("Modular Search Plugin initialized with dynamic functions")
+
+    def _create_packer(self) -> Optional[ResultPacker]:
+        """Create the result packer from project configuration, or None if disabled."""
+        try:
+            from lib.config.project_config import get_project_config
+            project_config = get_project_config()
+            if project_config:
+                settings = project_config.search_config.packing
+                if not settings.enabled:
+                    return None
+                return ResultPacker(
+                    max_tokens=settings.max_tokens,
+                    max_content_chars=settings.max_content_chars,
+                    min_content_chars=settings.min_content_chars
+                )
+        except Exception as e:
+            logger.warning(
+                f"Could not load result packing configuration, using defaults: {e}")
+        return ResultPacker()
+
+    def _dump_results(self, json_results: list) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Serialize tool results, packing them into the token budget when enabled.
+
+        The plugin is shared by concurrent tool calls, so the packing report is
+        returned to the caller instead of being stored on the instance.
+
+        Returns:
+            The serialized results and this call's packing report (None when packing is disabled)
+        """
+        if self.packer is None:
+            return dumps(json_results), None
+        return self.packer.pack(json_results)
+
+    def _dump_search_results(self, results: list) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Serialize SearchResult objects directly, packing them into the token budget when enabled."""
+        if self.packer is None:
+            return encode_results(results), None
+        return self.packer.pack(results)
+
+    async def close(self) -> None:
+        """
+        Close the underlying search manager and its provider connections.
+
+        Plugins created without a config share one manager, so only call this
+        at shutdown (or use close_search_managers()).
+        """
+        await self.search_manager.close()
     
     def _toggle_internal_all_documents_function(self):
         """Enable or disable function calling for search_internal_all_documents based on _internal_functions_enabled."""
@@ -101,10 +152,12 @@ class ModularSearchPlugin:
                     time_range: Optional[str] = None,
                     topic: str = "general",
                     search_depth: str = "advanced",
-                    include_image_descriptions: bool = False
+                    include_image_descriptions: bool = False,
+                    include_page_content: bool = False
                 ) -> str:
                     return await original_method(
-                        query, top_k, time_range, topic, search_depth, include_image_descriptions
+                        query, top_k, time_range, topic, search_depth, include_image_descriptions,
+                        include_page_content
                     )
                 
                 decorated = kernel_function(
@@ -294,13 +347,14 @@ class ModularSearchPlugin:
 
             results = await self.search_manager.search(search_query, doc_type)
 
-            json_results = [self._result_to_dict(result) for result in results]
-            return json.dumps(json_results, ensure_ascii=False, indent=2)
+            packed, report = self._dump_search_results(results)
+            logger.debug(f"{doc_type_name} search packing report: {report}")
+            return packed
 
         except Exception as e:
             error_msg = f"{doc_type_name} search failed: {str(e)}"
             logger.error(error_msg)
-            return json.dumps([{"error": error_msg}], ensure_ascii=False)
+            return dumps([{"error": error_msg}])
 
     def _get_document_type_enum(self, doc_type_name: str):
         """Convert document type name to DocumentType enum dynamically."""
@@ -321,7 +375,7 @@ class ModularSearchPlugin:
         if not getattr(self, '_internal_functions_enabled', False):
             error_msg = "search_internal_all_documents is not enabled because no internal search functions exist."
             logger.error(error_msg)
-            return json.dumps([{"error": error_msg}], ensure_ascii=False)
+            return dumps([{"error": error_msg}])
         try:
             # Get search example configuration for all_documents if available
             search_example_config = None
@@ -379,44 +433,19 @@ class ModularSearchPlugin:
                 top_k_per_source
             )
 
-            json_results = [self._result_to_dict(result) for result in results]
-            return json.dumps(json_results, ensure_ascii=False, indent=2)
+            packed, report = self._dump_search_results(results)
+            logger.debug(f"Comprehensive search packing report: {report}")
+            return packed
 
         except Exception as e:
             error_msg = f"Comprehensive search failed: {str(e)}"
             logger.error(error_msg)
-            return json.dumps([{"error": error_msg}], ensure_ascii=False)
+            return dumps([{"error": error_msg}])
 
     def _result_to_dict(self, result) -> dict:
         """Convert SearchResult object to dictionary for JSON serialization."""
-        result_dict = {
-            "content_text": result.content_text,
-            "search_type": result.search_type,
-            "search_mode": result.search_mode
-        }
-
-        # Add optional fields if they exist
-        if result.document_title:
-            result_dict["document_title"] = result.document_title
-        if result.content_path:
-            result_dict["content_path"] = result.content_path
-        if result.page_number is not None:
-            result_dict["page_number"] = result.page_number
-        if result.score is not None:
-            result_dict["score"] = result.score
-        if result.reranker_score is not None:
-            result_dict["reranker_score"] = result.reranker_score
-        if result.highlights:
-            result_dict["highlights"] = result.highlights
-        if result.captions:
-            result_dict["captions"] = result.captions
-        if result.answers:
-            result_dict["answers"] = result.answers
-        if result.metadata:
-            result_dict.update(result.metadata)
-
-        return result_dict
-    
+        return result_to_dict(result)
+
     async def web_search_impl(
         self,
         query: str,
@@ -424,7 +453,8 @@ class ModularSearchPlugin:
         time_range: Optional[str] = None,
         topic: str = "general",
         search_depth: str = "advanced",
-        include_image_descriptions: bool = False
+        include_image_descriptions: bool = False,
+        include_page_content: bool = False
     ) -> str:
         """
         Perform web search using external API with enhanced error handling.
@@ -437,6 +467,7 @@ class ModularSearchPlugin:
             topic: Search topic ("general", "news", "finance")
             search_depth: Search depth ("basic", "advanced")
             include_image_descriptions: Include query-related images and descriptions
+            include_page_content: Fetch the top pages and add their query-relevant chunks
 
         Returns:
             str: JSON string containing search results
@@ -454,7 +485,7 @@ class ModularSearchPlugin:
                 "topic": topic,
                 "search_depth": search_depth,
                 "include_answer": False,
-                "include_raw_content": False
+                "include_raw_content": include_page_content
             }
             if include_image_descriptions:
                 search_params["include_image_descriptions"] = True
@@ -468,6 +499,14 @@ class ModularSearchPlugin:
             # Execute web search (assumes search_manager.search_web exists)
             response = await self.search_manager.search_web(search_params)
 
+            # Tell the agent to move on instead of retrying a rate-limited search
+            if isinstance(response, dict) and response.get("rate_limited"):
+                return dumps([{
+                    "error": "rate_limited",
+                    "message": response.get("message", "Web search is rate limited"),
+                    "retry_after": response.get("retry_after")
+                }])
+
             # Process and validate response
             results = response.get('results', []) if isinstance(response, dict) else []
             processed_results = []
@@ -484,6 +523,8 @@ class ModularSearchPlugin:
                 }
                 if 'raw_content' in result and result['raw_content']:
                     result_data['raw_content'] = result['raw_content']
+                if result.get('chunks'):
+                    result_data['chunks'] = result['chunks']
                 processed_results.append(result_data)
 
             # Optionally process images if requested
@@ -497,12 +538,14 @@ class ModularSearchPlugin:
             logger.info(f"Web search completed - Found {len(processed_results)} results (including images if requested)")
             logger.debug(f"Response summary - Results: {len(results)}, Images: {len(response.get('images', []))}")
 
-            return json.dumps(processed_results, ensure_ascii=False, indent=2)
+            packed, report = self._dump_results(processed_results)
+            logger.debug(f"Web search packing report: {report}")
+            return packed
 
         except Exception as e:
             error_msg = f"Web search failed: {str(e)}"
             logger.error(error_msg)
-            return json.dumps([{"error": error_msg}], ensure_ascii=False)
+            return dumps([{"error": error_msg}])
 
     async def web_search(
         self,
@@ -511,12 +554,14 @@ class ModularSearchPlugin:
         time_range: Optional[str] = None,
         topic: str = "general",
         search_depth: str = "advanced",
-        include_image_descriptions: bool = False
+        include_image_descriptions: bool = False,
+        include_page_content: bool = False
     ) -> str:
         """
         Web search method that may or may not be decorated based on configuration.
         Falls back to implementation method.
         """
         return await self.web_search_impl(
-            query, top_k, time_range, topic, search_depth, include_image_descriptions
+            query, top_k, time_range, topic, search_depth, include_image_descriptions,
+            include_page_content
         )
\ No newline at end of file
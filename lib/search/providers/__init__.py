@@ -3,10 +3,13 @@ Search providers package.
 """
 
 from .azure_search import AzureEmbeddingProvider, AzureSearchProvider
+from .local_search import HashingEmbeddingProvider, LocalSearchProvider
 from .web_search import WebSearchProvider
 
 __all__ = [
     'AzureSearchProvider',
     'AzureEmbeddingProvider',
+    'LocalSearchProvider',
+    'HashingEmbeddingProvider',
     'WebSearchProvider'
 ]
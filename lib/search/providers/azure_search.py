@@ -1,19 +1,36 @@
 """
 Azure AI Search provider implementation.
 """
+import asyncio
 import json
 import logging
+import re
 import uuid
-from typing import Any, Dict, List, Optional
+from collections import deque
+from dataclasses import replace
+from typing import Any, AsyncIterator, Dict, List, Optional
 
+import aiohttp
 import openai
 from azure.core.credentials import AzureKeyCredential
-from azure.search.documents import SearchClient
-from azure.search.documents.models import VectorizedQuery
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import AioHttpTransport, AsyncHttpTransport
+from azure.search.documents.aio import SearchClient
+from azure.search.documents.indexes.aio import SearchIndexClient
+from azure.search.documents.models import VectorizableTextQuery, VectorizedQuery
 
 from ..base import (DocumentType, EmbeddingProvider, SearchMode,
                     SearchProvider, SearchQuery, SearchResult,
                     SearchStatistics)
+from ..capabilities import IndexCapabilities, IndexCapabilityCache
+from ..embedding_batcher import BatchingEmbeddingProvider, create_embedding_batcher
+from ..embedding_cache import CachedEmbeddingProvider, get_embedding_cache
+from ..extraction import ResultExtractor
+from ..fusion import fuse_results
+from ..hedging import HedgingPolicy
+from ..multimodal import (IMAGE_ID_FIELD, TEXT_ID_FIELD, OverfetchEstimator,
+                          combine_filters, content_type_filter,
+                          content_type_matches)
 
 # Import project configuration
 try:
@@ -27,13 +44,83 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# OData pieces used to check filters against the filterable fields of an index
+_ODATA_STRING = re.compile(r"'(?:[^']|'')*'")
+_ODATA_LAMBDA_VARIABLE = re.compile(r"\b(?:any|all)\(\s*(\w+)\s*:")
+_ODATA_COMPARISON = re.compile(
+    r"(?<![\w/.])([A-Za-z_]\w*(?:/\w+)*)\s+(?:eq|ne|gt|ge|lt|le)\s", re.IGNORECASE)
+
+class _SharedAioHttpTransport(AsyncHttpTransport):
+    """
+    Keep-alive aiohttp transport shared by every per-index SearchClient.
+
+    Each async SearchClient closes its transport when it is closed, so the
+    per-client open/close hooks are no-ops here and the underlying session is
+    only torn down by the owning provider through ``shutdown()``.
+    """
+
+    def __init__(self, max_connections: int = 100, keepalive_timeout: float = 30.0):
+        self._max_connections = max_connections
+        self._keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._transport: Optional[AioHttpTransport] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _ensure_transport(self) -> AioHttpTransport:
+        """Create the pooled aiohttp session lazily inside the running loop."""
+        if self._transport is not None:
+            return self._transport
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._transport is None:
+                connector = aiohttp.TCPConnector(
+                    limit=self._max_connections,
+                    keepalive_timeout=self._keepalive_timeout
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    cookie_jar=aiohttp.DummyCookieJar(),
+                    auto_decompress=False
+                )
+                self._transport = AioHttpTransport(
+                    session=self._session, session_owner=False)
+                await self._transport.open()
+                logger.debug(
+                    f"Opened shared Azure Search HTTP pool (limit={self._max_connections})")
+        return self._transport
+
+    async def send(self, request, **kwargs):
+        """Send a request over the shared keep-alive session."""
+        transport = await self._ensure_transport()
+        return await transport.send(request, **kwargs)
+
+    async def open(self):
+        """No-op: the shared session is opened lazily on first send."""
+
+    async def close(self):
+        """No-op: individual clients must not close the shared session."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def shutdown(self) -> None:
+        """Close the shared aiohttp session."""
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._transport = None
+
 
 class AzureEmbeddingProvider(EmbeddingProvider):
     """Azure OpenAI embedding provider."""
 
     def __init__(self, config: Any):
         """Initialize Azure OpenAI embedding provider."""
-        self.openai_client = openai.AzureOpenAI(
+        self.openai_client = openai.AsyncAzureOpenAI(
             azure_endpoint=config.azure_openai_endpoint,
             api_key=config.azure_openai_api_key,
             api_version=config.azure_openai_api_version
@@ -43,7 +130,7 @@ class AzureEmbeddingProvider(EmbeddingProvider):
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding vector using Azure OpenAI."""
         try:
-            response = self.openai_client.embeddings.create(
+            response = await self.openai_client.embeddings.create(
                 input=text,
                 model=self.embedding_model
             )
@@ -52,6 +139,47 @@ class AzureEmbeddingProvider(EmbeddingProvider):
             logger.error(f"Failed to generate embedding: {e}")
             return []
 
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embedding vectors for several texts in one request."""
+        if not texts:
+            return []
+        try:
+            response = await self.openai_client.embeddings.create(
+                input=texts,
+                model=self.embedding_model
+            )
+            embeddings = sorted(response.data, key=lambda item: item.index)
+            return [item.embedding for item in embeddings]
+        except Exception as e:
+            logger.error(f"Failed to generate {len(texts)} embeddings: {e}")
+            return [[] for _ in texts]
+
+    async def close(self) -> None:
+        """Close the underlying Azure OpenAI HTTP client."""
+        await self.openai_client.close()
+
+
+def create_azure_embedding_provider(config: Any) -> EmbeddingProvider:
+    """
+    Create the Azure OpenAI embedding stack used by search providers.
+
+    Cache hits return immediately and misses are coalesced into batched
+    requests by a batcher owned by this provider's client.
+    """
+    embedding_provider = AzureEmbeddingProvider(config)
+    embedding_batcher = create_embedding_batcher(embedding_provider.generate_embeddings)
+    if embedding_batcher is not None:
+        embedding_provider = BatchingEmbeddingProvider(
+            embedding_provider, embedding_batcher)
+    embedding_cache = get_embedding_cache()
+    if embedding_cache is not None:
+        embedding_provider = CachedEmbeddingProvider(
+            embedding_provider,
+            embedding_cache,
+            namespace=config.azure_embedding_deployment
+        )
+    return embedding_provider
+
 
 class AzureSearchProvider(SearchProvider):
     """Azure AI Search provider implementation."""
@@ -65,15 +193,36 @@ class AzureSearchProvider(SearchProvider):
         self.project_config = get_project_config()
 
         # Initialize embedding provider
-        self.embedding_provider = AzureEmbeddingProvider(config)
+        self.embedding_provider = create_azure_embedding_provider(config)
 
         # Use API Key authentication for Azure Search
         credential = AzureKeyCredential(config.azure_search_api_key)
 
+        # One keep-alive connection pool shared by all per-index clients
+        self._transport = _SharedAioHttpTransport(
+            max_connections=getattr(config, 'azure_search_max_connections', 100),
+            keepalive_timeout=getattr(config, 'azure_search_keepalive_timeout', 30)
+        )
+
         # Initialize search clients dynamically from project config
         self.search_clients = {}
         self.semantic_config_map = {}
         self.vector_field_map = {}
+        self.select_fields_map = {}
+
+        # Indexes that rejected the select list and are queried unprojected
+        self._unprojected_indexes = set()
+        self._response_bytes = 0
+        self._response_count = 0
+
+        # Schema reads for capability probing share the same pool
+        self.index_client = SearchIndexClient(
+            endpoint=config.azure_search_endpoint,
+            credential=credential,
+            transport=self._transport
+        )
+        self._server_vectorized_queries = 0
+        self._client_vector_fallbacks = 0
 
         if self.project_config:
             # Use project configuration to build search clients
@@ -84,10 +233,38 @@ class AzureSearchProvider(SearchProvider):
                     self.search_clients[doc_type] = SearchClient(
                         endpoint=config.azure_search_endpoint,
                         index_name=doc_type_config.index_name,
-                        credential=credential
+                        credential=credential,
+                        transport=self._transport
                     )
                     self.semantic_config_map[doc_type] = doc_type_config.semantic_config
                     self.vector_field_map[doc_type] = doc_type_config.vector_field
+                    self.select_fields_map[doc_type] = self._build_select_fields(
+                        doc_type_config)
+            # Compile per-type extraction plans once instead of per hit
+            self.extractor = ResultExtractor(self.project_config)
+            self.extractor.compile(self.search_clients)
+            capabilities = self.project_config.search_config.capabilities
+            self.capabilities = IndexCapabilityCache(
+                self.index_client.get_index,
+                refresh_seconds=capabilities.refresh_seconds,
+                probe_failure_ttl=capabilities.probe_failure_ttl,
+                semantic_failure_ttl=capabilities.semantic_failure_ttl,
+                vectorizer_failure_ttl=capabilities.vectorizer_failure_ttl
+            )
+            multimodal = self.project_config.search_config.multimodal
+            self.overfetch = OverfetchEstimator(
+                initial_factor=multimodal.initial_overfetch,
+                max_factor=multimodal.max_overfetch
+            )
+            hedging = self.project_config.search_config.hedging
+            self.hedging = HedgingPolicy(
+                enabled=hedging.enabled,
+                percentile=hedging.percentile,
+                min_samples=hedging.min_samples,
+                window=hedging.window,
+                min_delay_ms=hedging.min_delay_ms,
+                budget_ratio=hedging.budget_ratio
+            )
         else:
             # No project config available - cannot initialize search clients
             logger.error(
@@ -97,16 +274,39 @@ class AzureSearchProvider(SearchProvider):
 
         logger.info("Azure Search Provider initialized successfully")
 
-        logger.info("Azure Search Provider initialized successfully")
+    async def close(self) -> None:
+        """Close all search clients, the shared HTTP pool and the embedding client."""
+        for doc_type, client in self.search_clients.items():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(
+                    f"Failed to close search client for {doc_type.value}: {e}")
+        try:
+            await self.index_client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close search index client: {e}")
+        await self._transport.shutdown()
+        try:
+            await self.embedding_provider.close()
+        except Exception as e:
+            logger.warning(f"Failed to close embedding client: {e}")
+        logger.info("Azure Search Provider closed")
 
-    def _document_types_match(
-            self,
-            type1: DocumentType,
-            type2: DocumentType) -> bool:
-        """Check if two document types match by value."""
-        value1 = getattr(type1, 'value', str(type1))
-        value2 = getattr(type2, 'value', str(type2))
-        return value1 == value2
+    def _build_select_fields(self, doc_type_config: Any) -> List[str]:
+        """
+        Build the select list for an index from its configured fields.
+
+        The multimodal document ids are always selected because the content
+        type of every hit is derived from them; an index without them rejects
+        the list once and is queried unprojected from then on.
+        """
+        lean_query = self.project_config.search_config.lean_query
+        fields = (doc_type_config.key_fields + doc_type_config.content_fields
+                  + [TEXT_ID_FIELD, IMAGE_ID_FIELD] + lean_query.extra_select_fields)
+        # Preserve order, drop duplicates and never pull vectors back
+        return [field for field in dict.fromkeys(fields)
+                if field != doc_type_config.vector_field]
 
     def _get_document_type_enum(self, name: str) -> Optional[Any]:
         """Map document type name to enum or dynamic type."""
@@ -117,47 +317,26 @@ class AzureSearchProvider(SearchProvider):
             # If not found, return None
             return None
 
-    def _get_content_fields_for_document_type(self, document_type: DocumentType) -> List[str]:
-        """Get content_fields configuration for specific document type."""
-        if not self.project_config:
-            return []
-        
-        document_type_value = getattr(document_type, 'value', str(document_type))
-        for doc_type_config in self.project_config.document_types:
-            if doc_type_config.name == document_type_value:
-                return doc_type_config.content_fields
-        
-        return []
-
-    def _get_key_fields_for_document_type(self, document_type: DocumentType) -> List[str]:
-        """Get key_fields configuration for specific document type."""
-        if not self.project_config:
-            return []
-        
-        document_type_value = getattr(document_type, 'value', str(document_type))
-        for doc_type_config in self.project_config.document_types:
-            if doc_type_config.name == document_type_value:
-                return doc_type_config.key_fields
-        
-        return []
-
     async def search(
         self,
         query: SearchQuery,
         document_type: DocumentType
     ) -> List[SearchResult]:
         """Perform search on specific document type."""
-        # Find matching client using value-based comparison
-        client_doc_type = None
-        for doc_type in self.search_clients.keys():
-            if self._document_types_match(doc_type, document_type):
-                client_doc_type = doc_type
-                break
-
-        if client_doc_type is None:
+        # Resolve to the interned type the clients are keyed by
+        client_doc_type = DocumentType.resolve(document_type)
+        if client_doc_type is None or client_doc_type not in self.search_clients:
             raise ValueError(
                 f"Document type {document_type} not supported by Azure Search Provider")
 
+        # Requests larger than one page are fetched as concurrent pages
+        deep = self.project_config.search_config.deep_retrieval
+        if deep.enabled and query.top_k > deep.page_size:
+            results = []
+            async for page in self.search_pages(query, document_type):
+                results.extend(page)
+            return results
+
         search_mode = SearchMode.HYBRID if query.use_hybrid_search else SearchMode.TEXT
         logger.info(
             f"Performing {
@@ -168,66 +347,11 @@ class AzureSearchProvider(SearchProvider):
 
         try:
             client = self.search_clients[client_doc_type]
-
-            # Build search parameters
-            search_params = {
-                "search_text": query.text,
-                "top": min(query.top_k, 50),
-                "include_total_count": True
-            }
-
-            # Configure search mode
-            if query.use_hybrid_search:
-                # Generate embedding for vector search
-                query_vector = await self.embedding_provider.generate_embedding(query.text)
-                if query_vector:
-                    vector_field = self.vector_field_map.get(
-                        client_doc_type, "content_embedding")
-
-                    search_params["vector_queries"] = [
-                        VectorizedQuery(
-                            vector=query_vector,
-                            k_nearest_neighbors=query.top_k,
-                            fields=vector_field
-                        )
-                    ]
-
-                    # Configure semantic search
-                    if query.use_semantic_search and client_doc_type in self.semantic_config_map:
-                        try:
-                            search_params["query_type"] = "semantic"
-                            search_params["semantic_configuration_name"] = self.semantic_config_map[client_doc_type]
-                        except Exception as e:
-                            logger.warning(
-                                f"Semantic search setup failed, falling back to simple: {e}")
-                            search_params["query_type"] = "simple"
-                    else:
-                        search_params["query_type"] = "simple"
-                else:
-                    logger.warning(
-                        "Failed to generate embedding, falling back to text search")
-                    search_params["query_type"] = "simple"
-            else:
-                search_params["query_type"] = "simple"
-
-            # Add filter if provided
-            if query.filter_expression:
-                self._validate_filter_expression(
-                    query.filter_expression, client_doc_type)
-                search_params["filter"] = query.filter_expression
+            search_params = await self._build_search_params(
+                query, client_doc_type, top=min(query.top_k, deep.page_size))
 
             # Execute search with fallback handling
-            try:
-                search_results = client.search(**search_params)
-            except Exception as semantic_error:
-                if search_params.get("query_type") == "semantic":
-                    logger.warning(
-                        f"Semantic search failed, retrying with simple search: {semantic_error}")
-                    search_params["query_type"] = "simple"
-                    search_params.pop("semantic_configuration_name", None)
-                    search_results = client.search(**search_params)
-                else:
-                    raise
+            search_results = await self._run_query_with_fallback(client, search_params)
 
             # Process results
             results = self._process_search_results(
@@ -246,6 +370,337 @@ class AzureSearchProvider(SearchProvider):
                     document_type.value}: {e}")
             raise
 
+    async def search_pages(
+        self,
+        query: SearchQuery,
+        document_type: DocumentType
+    ) -> AsyncIterator[List[SearchResult]]:
+        """
+        Stream a large result set as processed pages, best page first.
+
+        Pages are requested concurrently with skip/top and yielded in rank
+        order. Fetching stops early once a page ends below the score
+        threshold for the query mode or the index runs out of matches. The
+        threshold is compared with @search.score on every page: reranker
+        scores exist only for the first 50 hits, and BM25 and RRF scores
+        differ in scale, so each mode has its own threshold.
+
+        Args:
+            query: Search query parameters (top_k may exceed one page)
+            document_type: Type of documents to search
+
+        Yields:
+            Lists of search results, one per page
+        """
+        client_doc_type = DocumentType.resolve(document_type)
+        if client_doc_type is None or client_doc_type not in self.search_clients:
+            raise ValueError(
+                f"Document type {document_type} not supported by Azure Search Provider")
+
+        deep = self.project_config.search_config.deep_retrieval
+        page_size = max(1, deep.page_size)
+        total = min(query.top_k, deep.max_results)
+        search_mode = SearchMode.HYBRID if query.use_hybrid_search else SearchMode.TEXT
+        min_score = deep.min_hybrid_score if query.use_hybrid_search else deep.min_text_score
+        client = self.search_clients[client_doc_type]
+
+        logger.info(
+            f"Performing deep {search_mode.value} search on {document_type.value}: "
+            f"'{query.text}' (top {total} in pages of {page_size})")
+
+        # Vector recall must cover the whole requested depth
+        deep_query = replace(query, top_k=total)
+        base_params = await self._build_search_params(deep_query, client_doc_type, top=page_size)
+
+        async def fetch_page(skip: int) -> List[SearchResult]:
+            params = dict(base_params, skip=skip, top=min(page_size, total - skip))
+            raw_results = await self._run_query_with_fallback(client, params)
+            return self._process_search_results(raw_results, client_doc_type, search_mode)
+
+        offsets = list(range(0, total, page_size))
+        window = max(1, deep.max_concurrent_pages)
+        pending = deque(
+            asyncio.ensure_future(fetch_page(skip)) for skip in offsets[:window])
+        next_offset = window
+        returned = 0
+
+        try:
+            while pending:
+                page = await pending.popleft()
+                if next_offset < len(offsets):
+                    pending.append(asyncio.ensure_future(fetch_page(offsets[next_offset])))
+                    next_offset += 1
+
+                returned += len(page)
+                yield page
+
+                # Stop when the index is exhausted or relevance has dropped off
+                if not page or len(page) < page_size:
+                    break
+                last_score = page[-1].score
+                if min_score > 0 and last_score is not None and last_score < min_score:
+                    logger.info(
+                        f"Deep search on {document_type.value} stopped early at {returned} "
+                        f"results (score {last_score:.3f} < {min_score})")
+                    break
+        finally:
+            for task in pending:
+                if task.done() and not task.cancelled():
+                    task.exception()  # Consume errors from pages no longer needed
+                else:
+                    task.cancel()
+
+        logger.info(
+            f"Deep search found {returned} results for {document_type.value} "
+            f"using {search_mode.value} search")
+
+    async def _build_search_params(
+            self,
+            query: SearchQuery,
+            client_doc_type: DocumentType,
+            top: int) -> Dict[str, Any]:
+        """Build SearchClient.search keyword arguments for a query."""
+        client = self.search_clients[client_doc_type]
+        capabilities = await self._get_capabilities(client)
+
+        # Build search parameters
+        lean_query = self.project_config.search_config.lean_query
+        search_params = {
+            "search_text": query.text,
+            "top": top,
+            "include_total_count": lean_query.include_total_count
+        }
+
+        # Retrieve only the configured fields (skips vectors and unused text)
+        select_fields = self.select_fields_map.get(client_doc_type)
+        if (lean_query.enabled and select_fields
+                and client._index_name not in self._unprojected_indexes):
+            search_params["select"] = select_fields
+
+        # Configure search mode
+        if query.use_hybrid_search:
+            vector_field = self.vector_field_map.get(
+                client_doc_type, "content_embedding")
+            query_vector = query.vector
+            vector_query = None
+            if query_vector is None and await self._uses_server_vectorization(client_doc_type):
+                # The index vectorizer embeds the text, saving the Azure OpenAI round trip
+                vector_query = VectorizableTextQuery(
+                    text=query.text,
+                    k_nearest_neighbors=query.top_k,
+                    fields=vector_field
+                )
+                self._server_vectorized_queries += 1
+            else:
+                # Generate embedding for vector search unless precomputed
+                if query_vector is None:
+                    query_vector = await self.embedding_provider.generate_embedding(query.text)
+                if query_vector:
+                    vector_query = VectorizedQuery(
+                        vector=query_vector,
+                        k_nearest_neighbors=query.top_k,
+                        fields=vector_field
+                    )
+
+            if vector_query is not None:
+                search_params["vector_queries"] = [vector_query]
+
+                # Configure semantic search unless the index is known not to support it
+                semantic_config = self.semantic_config_map.get(client_doc_type)
+                if (query.use_semantic_search and semantic_config
+                        and self.capabilities.semantic_available(client._index_name, semantic_config)):
+                    search_params["query_type"] = "semantic"
+                    search_params["semantic_configuration_name"] = semantic_config
+                else:
+                    search_params["query_type"] = "simple"
+            else:
+                logger.warning(
+                    "Failed to generate embedding, falling back to text search")
+                search_params["query_type"] = "simple"
+        else:
+            search_params["query_type"] = "simple"
+
+        # Add filter if provided
+        if query.filter_expression:
+            self._validate_filter_expression(
+                query.filter_expression, client_doc_type, capabilities)
+            search_params["filter"] = query.filter_expression
+
+        return search_params
+
+    async def _get_capabilities(self, client: SearchClient) -> Optional[IndexCapabilities]:
+        """Get an index's cached capabilities, probing its schema when needed."""
+        search_config = self.project_config.search_config
+        if not (search_config.capabilities.enabled or search_config.vectorization.enabled):
+            return None
+        return await self.capabilities.get(client._index_name)
+
+    async def probe_capabilities(self) -> Dict[str, Optional[IndexCapabilities]]:
+        """
+        Read every index schema now, e.g. at startup, instead of on first use.
+
+        Returns:
+            Capabilities per document type (None where the schema is unreadable)
+        """
+        doc_types = list(self.search_clients)
+        probed = await asyncio.gather(
+            *(self.capabilities.probe(self.search_clients[doc_type]._index_name)
+              for doc_type in doc_types))
+        return {doc_type.value: capabilities for doc_type, capabilities in zip(doc_types, probed)}
+
+    def get_index_capabilities(self) -> Dict[str, Optional[IndexCapabilities]]:
+        """Get the cached capabilities per document type without reading schemas."""
+        return {
+            doc_type.value: self.capabilities.peek(client._index_name)
+            for doc_type, client in self.search_clients.items()
+        }
+
+    async def _uses_server_vectorization(self, client_doc_type: DocumentType) -> bool:
+        """Check whether hybrid queries on an index can be vectorized by the service."""
+        if not self.project_config.search_config.vectorization.enabled:
+            return False
+        client = self.search_clients[client_doc_type]
+        if await self._get_capabilities(client) is None:
+            return False
+        return self.capabilities.vectorizer_available(
+            client._index_name, self.vector_field_map.get(client_doc_type, "content_embedding"))
+
+    async def _fall_back_to_client_vectors(
+            self,
+            client: SearchClient,
+            search_params: Dict[str, Any],
+            error: Exception) -> bool:
+        """
+        Replace server-vectorized queries with client-side embeddings after a failure.
+
+        Returns:
+            True if search_params were rewritten and the query should be retried
+        """
+        vector_queries = search_params.get("vector_queries") or []
+        if (not self.project_config.search_config.vectorization.fallback_to_client
+                or not any(isinstance(vq, VectorizableTextQuery) for vq in vector_queries)):
+            return False
+
+        if "vectoriz" in str(error).lower():
+            # Embed client-side for a while instead of failing first on every query
+            self.capabilities.mark_vectorizer_failure(client._index_name)
+        logger.warning(
+            f"Server-side vectorization failed on {client._index_name}, "
+            f"retrying with a client-side embedding: {error}")
+        self._client_vector_fallbacks += 1
+
+        rewritten = []
+        for vector_query in vector_queries:
+            if isinstance(vector_query, VectorizableTextQuery):
+                vector = await self.embedding_provider.generate_embedding(vector_query.text)
+                if not vector:
+                    return False
+                vector_query = VectorizedQuery(
+                    vector=vector,
+                    k_nearest_neighbors=vector_query.k_nearest_neighbors,
+                    fields=vector_query.fields
+                )
+            rewritten.append(vector_query)
+        search_params["vector_queries"] = rewritten
+        return True
+
+    async def _run_query_with_fallback(
+            self,
+            client: SearchClient,
+            search_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Execute a query with fallbacks.
+
+        Server-vectorized queries are retried with client-side embeddings if
+        the index vectorizer fails, and semantic queries are retried as simple
+        queries if semantic ranking fails.
+        """
+        try:
+            return await self._run_query(client, search_params)
+        except Exception as query_error:
+            if await self._fall_back_to_client_vectors(client, search_params, query_error):
+                return await self._run_query_with_fallback(client, search_params)
+            if search_params.get("query_type") == "semantic":
+                logger.warning(
+                    f"Semantic search failed, retrying with simple search: {query_error}")
+                search_params["query_type"] = "simple"
+                semantic_config = search_params.pop("semantic_configuration_name", None)
+                results = await self._run_query(client, search_params)
+                # Skip semantic ranking for a while only if its configuration
+                # was rejected; transient faults are retried on the next query
+                if semantic_config and self._is_semantic_configuration_error(query_error, semantic_config):
+                    self.capabilities.mark_semantic_failure(client._index_name, semantic_config)
+                return results
+            raise
+
+    @staticmethod
+    def _is_semantic_configuration_error(error: Exception, semantic_config: str) -> bool:
+        """Check whether a query was rejected for its semantic configuration rather than a transient fault."""
+        if not isinstance(error, HttpResponseError):
+            return False
+        status = error.status_code or 0
+        if status in (408, 429) or status >= 500:
+            return False
+        message = str(error).lower()
+        return "semantic" in message or semantic_config.lower() in message
+
+    async def _run_query(
+            self,
+            client: SearchClient,
+            search_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Execute a query and drain the async pager.
+
+        The request is only sent when the pager is iterated, so draining it
+        here keeps service errors inside the caller's fallback handling.
+        """
+        try:
+            return await self._hedged_fetch(client, search_params)
+        except HttpResponseError as e:
+            # A configured field missing from the index invalidates $select
+            if "select" not in search_params or "select" not in str(e).lower():
+                raise
+            logger.warning(
+                f"Index {client._index_name} rejected the select list, "
+                f"retrieving all fields from now on: {e}")
+            self._unprojected_indexes.add(client._index_name)
+            search_params = {k: v for k, v in search_params.items() if k != "select"}
+            return await self._hedged_fetch(client, search_params)
+
+    async def _hedged_fetch(
+            self,
+            client: SearchClient,
+            search_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fetch results, hedging requests that outlive the index's tail latency."""
+        return await self.hedging.run(
+            client._index_name, lambda: self._fetch_results(client, search_params))
+
+    async def _fetch_results(
+            self,
+            client: SearchClient,
+            search_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Send the query, drain its pages and log the response payload size."""
+        page_sizes = []
+
+        def record_response_size(pipeline_response: Any) -> None:
+            try:
+                page_sizes.append(len(pipeline_response.http_response.body()))
+            except Exception:
+                pass
+
+        pager = await client.search(
+            **search_params, raw_response_hook=record_response_size)
+        results = [result async for result in pager]
+
+        if page_sizes:
+            response_bytes = sum(page_sizes)
+            self._response_bytes += response_bytes
+            self._response_count += len(page_sizes)
+            logger.info(
+                f"{client._index_name}: {response_bytes} bytes for {len(results)} hits "
+                f"({response_bytes // max(1, len(results))} bytes/hit, "
+                f"{'projected' if 'select' in search_params else 'all fields'})")
+        return results
+
     async def search_all(
         self,
         query: SearchQuery,
@@ -256,52 +711,110 @@ class AzureSearchProvider(SearchProvider):
             f"Performing comprehensive search across all document types: '{
                 query.text}'")
 
-        all_results = []
+        fanout = self._get_fanout_config()
 
-        for doc_type in self.get_supported_document_types():
-            try:
-                # Determine top_k for this document type
-                if top_k_per_source is not None:
-                    # Use explicitly provided top_k_per_source
-                    doc_type_top_k = top_k_per_source
-                else:
-                    # Use per-type top_k from search examples or default
-                    doc_type_top_k = self._get_per_type_top_k(
-                        doc_type, top_k_per_source)
-
-                # Create query for this document type
-                doc_query = SearchQuery(
-                    text=query.text,
-                    top_k=doc_type_top_k,
-                    filter_expression=query.filter_expression,
-                    use_hybrid_search=query.use_hybrid_search,
-                    use_semantic_search=query.use_semantic_search,
-                    document_type=doc_type
-                )
+        # Embed the query once and reuse the vector for every index, unless
+        # every index vectorizes the query text itself
+        query_vector = query.vector
+        if query.use_hybrid_search and query_vector is None:
+            server_vectorized = await asyncio.gather(
+                *(self._uses_server_vectorization(doc_type)
+                  for doc_type in self.get_supported_document_types()))
+            if not all(server_vectorized):
+                query_vector = await self.embedding_provider.generate_embedding(query.text)
 
-                results = await self.search(doc_query, doc_type)
+        semaphore = asyncio.Semaphore(max(1, fanout.max_concurrency))
 
-                # Add document type metadata
-                for result in results:
-                    if result.metadata is None:
-                        result.metadata = {}
-                    result.metadata["document_type"] = doc_type.value
-                    result.metadata["source_index"] = doc_type.value
+        async def search_index(doc_type: DocumentType) -> List[SearchResult]:
+            # Determine top_k for this document type
+            if top_k_per_source is not None:
+                # Use explicitly provided top_k_per_source
+                doc_type_top_k = top_k_per_source
+            else:
+                # Use per-type top_k from search examples or default
+                doc_type_top_k = self._get_per_type_top_k(
+                    doc_type, top_k_per_source)
+
+            # Create query for this document type
+            doc_query = SearchQuery(
+                text=query.text,
+                top_k=doc_type_top_k,
+                filter_expression=query.filter_expression,
+                use_hybrid_search=query.use_hybrid_search,
+                use_semantic_search=query.use_semantic_search,
+                document_type=doc_type,
+                vector=query_vector
+            )
 
-                all_results.extend(results)
+            # The deadline covers only this index's own request, not the
+            # time spent waiting for a concurrency slot
+            async with semaphore:
+                results = await asyncio.wait_for(
+                    self.search(doc_query, doc_type),
+                    timeout=fanout.per_index_timeout)
+
+            # Add document type metadata
+            for result in results:
+                if result.metadata is None:
+                    result.metadata = {}
+                result.metadata["document_type"] = doc_type.value
+                result.metadata["source_index"] = doc_type.value
+            return results
 
-            except Exception as e:
-                logger.warning(f"Failed to search {doc_type.value}: {e}")
-                continue
+        doc_types = self.get_supported_document_types()
+        if fanout.enabled:
+            outcomes = await asyncio.gather(
+                *(search_index(doc_type) for doc_type in doc_types),
+                return_exceptions=True)
+        else:
+            outcomes = []
+            for doc_type in doc_types:
+                try:
+                    outcomes.append(await search_index(doc_type))
+                except Exception as e:
+                    outcomes.append(e)
+
+        # Keep partial results from indexes that answered in time
+        result_lists = []
+        failed_types = []
+        for doc_type, outcome in zip(doc_types, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                logger.warning(
+                    f"Search on {doc_type.value} exceeded {fanout.per_index_timeout}s deadline")
+                failed_types.append(doc_type.value)
+            elif isinstance(outcome, BaseException):
+                logger.warning(f"Failed to search {doc_type.value}: {outcome}")
+                failed_types.append(doc_type.value)
+            else:
+                result_lists.append(outcome)
 
-        # Sort by relevance score
-        all_results.sort(key=lambda x: x.score or 0, reverse=True)
+        if failed_types:
+            logger.info(
+                f"Returning partial results; {len(failed_types)}/{len(doc_types)} "
+                f"indexes failed or timed out: {failed_types}")
+
+        fusion = self.project_config.search_config.fusion
+        if fusion.enabled:
+            # Raw scores are not comparable across indexes: fuse and cap globally
+            all_results = fuse_results(
+                result_lists,
+                method=fusion.method,
+                top_k=fusion.top_k,
+                rrf_k=fusion.rrf_k,
+                prefer_reranker=fusion.prefer_reranker and query.use_semantic_search)
+        else:
+            all_results = [result for results in result_lists for result in results]
+            all_results.sort(key=lambda x: x.score or 0, reverse=True)
 
         logger.info(
             f"Comprehensive search completed. Found {
                 len(all_results)} total results")
         return all_results
 
+    def _get_fanout_config(self) -> Any:
+        """Get concurrent fan-out settings from project config."""
+        return self.project_config.search_config.fanout
+
     def _get_per_type_top_k(
             self,
             document_type: DocumentType,
@@ -357,6 +870,40 @@ class AzureSearchProvider(SearchProvider):
 
         return stats
 
+    def get_payload_statistics(self) -> Dict[str, Any]:
+        """Get response payload size counters for lean query tuning."""
+        return {
+            "responses": self._response_count,
+            "response_bytes": self._response_bytes,
+            "avg_bytes_per_response": (
+                self._response_bytes / self._response_count if self._response_count else 0.0),
+            "unprojected_indexes": sorted(self._unprojected_indexes)
+        }
+
+    def get_vectorization_statistics(self) -> Dict[str, Any]:
+        """Get server-side vectorization usage per index."""
+        return {
+            "enabled": self.project_config.search_config.vectorization.enabled,
+            "indexes": {
+                client._index_name: self.capabilities.vectorizer_available(
+                    client._index_name, self.vector_field_map.get(doc_type, "content_embedding"))
+                for doc_type, client in self.search_clients.items()
+                if self.capabilities.peek(client._index_name) is not None
+            },
+            "server_vectorized_queries": self._server_vectorized_queries,
+            "client_fallbacks": self._client_vector_fallbacks
+        }
+
+    def get_capability_statistics(self) -> Dict[str, Any]:
+        """Get schema probe counters and the capabilities known per index."""
+        stats = self.capabilities.get_stats()
+        stats["multimodal_pass_rates"] = self.overfetch.get_stats()
+        return stats
+
+    def get_hedging_statistics(self) -> Dict[str, Any]:
+        """Get hedged request counters and per-index hedge delays."""
+        return self.hedging.get_stats()
+
     def is_available(self) -> bool:
         """Check if Azure Search is available."""
         try:
@@ -372,8 +919,22 @@ class AzureSearchProvider(SearchProvider):
     def _validate_filter_expression(
             self,
             filter_expression: str,
-            document_type: Any) -> None:
-        """Validate filter expression for common issues."""
+            document_type: Any,
+            capabilities: Optional[IndexCapabilities] = None) -> None:
+        """Validate filter expression for common issues and against known filterable fields."""
+        if capabilities is not None:
+            expression = _ODATA_STRING.sub("''", filter_expression)
+            lambda_variables = set(_ODATA_LAMBDA_VARIABLE.findall(expression))
+            unknown = sorted({
+                path for path in _ODATA_COMPARISON.findall(expression)
+                if path.split("/")[0] not in lambda_variables
+                and path.lower() not in ("null", "true", "false")
+                and not capabilities.is_filterable(path)})
+            if unknown:
+                raise ValueError(
+                    f"Fields {unknown} are not filterable in index {capabilities.index_name}. "
+                    f"Filterable fields: {sorted(capabilities.filterable_fields)}")
+
         if 'date' in filter_expression.lower() and 'date' not in filter_expression.replace(
                 'updated',
                 '').replace(
@@ -401,8 +962,6 @@ class AzureSearchProvider(SearchProvider):
         search_mode: SearchMode
     ) -> List[SearchResult]:
         """Process raw search results into SearchResult objects with multimodal support."""
-        results = []
-
         # If search_results is a coroutine, we need to get the actual results
         # This is needed for testing with mock objects that return coroutines
         if hasattr(search_results, '__await__'):
@@ -412,120 +971,7 @@ class AzureSearchProvider(SearchProvider):
                 # empty list for testing
                 return []
 
-        # Get content_fields from project config for this document type
-        content_fields = self._get_content_fields_for_document_type(document_type)
-        logger.debug(f"Content fields for {document_type.value}: {content_fields}")
-
-        for result in search_results:
-            # Extract content text using configured content_fields
-            content_text = self._extract_content_text(result, content_fields)
-            if not content_text:
-                continue
-
-            # Create search result
-            search_result = SearchResult(
-                content_text=content_text,
-                search_type=self._get_search_type_name(document_type),
-                search_mode=search_mode.value
-            )
-
-            # Extract all configured content fields
-            self._extract_configured_fields(result, search_result, content_fields)
-
-            # Enhanced multimodal metadata extraction
-            self._extract_multimodal_metadata(result, search_result, document_type)
-
-            # Extract location metadata using configured fields
-            self._extract_location_metadata(result, search_result, content_fields)
-
-            # Search scores
-            if "@search.score" in result:
-                search_result.score = result["@search.score"]
-            if "@search.reranker_score" in result:
-                search_result.reranker_score = result["@search.reranker_score"]
-            if "@search.highlights" in result:
-                search_result.highlights = result["@search.highlights"]
-            if "@search.captions" in result:
-                search_result.captions = result["@search.captions"]
-            if "@search.answers" in result:
-                search_result.answers = result["@search.answers"]
-
-            # Document type-specific metadata extraction
-            metadata = getattr(document_type, 'get_metadata', lambda: {})()
-            if metadata and metadata.get('category') == 'list':
-                # Extract all available fields from content_fields configuration
-                structured_metadata = {}
-                
-                for field in content_fields:
-                    if field in result and result[field] is not None:
-                        structured_metadata[field] = result[field]
-
-                if structured_metadata:
-                    if search_result.metadata is None:
-                        search_result.metadata = {}
-                    search_result.metadata.update(structured_metadata)
-                    logger.debug(f"Extracted structured metadata: {list(structured_metadata.keys())}")
-
-            results.append(search_result)
-
-        logger.info(f"Processed {len(results)} search results using configuration-driven field extraction")
-        return results
-
-    def _get_search_type_name(self, document_type: DocumentType) -> str:
-        """Get human-readable search type name from project configuration."""
-        if self.project_config:
-            document_type_value = getattr(
-                document_type, 'value', str(document_type))
-            for doc_type_config in self.project_config.document_types:
-                if doc_type_config.name == document_type_value:
-                    return doc_type_config.display_name_en
-
-        # If no project config or type not found, use enum value
-        return getattr(document_type, 'value', str(document_type))
-
-    def _extract_multimodal_metadata(
-            self, result: Dict[str, Any], search_result: SearchResult, document_type: DocumentType) -> None:
-        """Extract multimodal-specific metadata from search results."""
-        if search_result.metadata is None:
-            search_result.metadata = {}
-
-        # Get key_fields from project config to determine filterable fields
-        key_fields = self._get_key_fields_for_document_type(document_type)
-        logger.debug(f"Key fields for {document_type.value}: {key_fields}")
-        
-        # Extract multimodal identifiers from key_fields and result
-        multimodal_fields = []
-        for field in key_fields:
-            if any(identifier in field.lower() for identifier in ['text_document_id', 'image_document_id', 'content_id']):
-                multimodal_fields.append(field)
-        
-        logger.debug(f"Multimodal fields detected from key_fields: {multimodal_fields}")
-        
-        # Add configured multimodal fields to metadata
-        for field in multimodal_fields:
-            if field in result and result[field] is not None:
-                search_result.metadata[field] = result[field]
-
-        # Identify content type based on document IDs
-        has_text_content = result.get("text_document_id") is not None
-        has_image_content = result.get("image_document_id") is not None
-
-        if has_text_content and not has_image_content:
-            search_result.metadata["content_type"] = "text"
-        elif has_image_content and not has_text_content:
-            search_result.metadata["content_type"] = "image"
-            # Add image verbalization indicator
-            if "content_text" in result:
-                search_result.metadata["is_image_verbalization"] = True
-                search_result.metadata["description"] = "Image content described in natural language"
-        elif has_text_content and has_image_content:
-            search_result.metadata["content_type"] = "mixed"
-        else:
-            search_result.metadata["content_type"] = "unknown"
-
-        # Log multimodal content detection
-        content_type = search_result.metadata.get("content_type", "unknown")
-        logger.debug(f"Detected {content_type} content in search result")
+        return self.extractor.process(search_results, document_type, search_mode)
 
     async def search_multimodal(
         self,
@@ -546,116 +992,45 @@ class AzureSearchProvider(SearchProvider):
         Returns:
             List of search results filtered by content type
         """
-        # Perform regular search first
-        results = await self.search(query, document_type)
+        if not (include_images or include_text):
+            return []
 
-        # Filter results based on content type preferences
-        filtered_results = []
+        client_doc_type = DocumentType.resolve(document_type)
+        client = self.search_clients.get(client_doc_type)
+        multimodal = self.project_config.search_config.multimodal
+
+        # Let the service select the content types when it can filter on them
+        content_filter = None
+        if multimodal.filter_pushdown and client is not None:
+            content_filter = content_type_filter(
+                include_images, include_text, await self._get_capabilities(client))
+        if content_filter:
+            filtered_results = await self.search(
+                replace(query, filter_expression=combine_filters(
+                    query.filter_expression, content_filter)),
+                document_type)
+            logger.info(f"Multimodal search completed with filter {content_filter}: "
+                        f"{len(filtered_results)} results")
+            return filtered_results
+
+        # Otherwise post-filter, over-fetching by the pass rate seen on this index
+        overfetch_key = (
+            client._index_name if client is not None else str(document_type),
+            include_images, include_text)
+        fetch_k = self.overfetch.fetch_size(
+            overfetch_key, query.top_k, self.project_config.search.max_results_limit)
+        results = await self.search(replace(query, top_k=fetch_k), document_type)
 
+        filtered_results = []
         for result in results:
             content_type = result.metadata.get(
                 "content_type", "mixed") if result.metadata else "mixed"
-
-            should_include = False
-            if content_type == "text" and include_text:
-                should_include = True
-            elif content_type == "image" and include_images:
-                should_include = True
-            elif content_type == "mixed" and (include_text or include_images):
-                should_include = True
-
-            if should_include:
+            if content_type_matches(content_type, include_images, include_text):
                 filtered_results.append(result)
+        self.overfetch.record(overfetch_key, len(results), len(filtered_results))
+        filtered_results = filtered_results[:query.top_k]
 
         logger.info(f"Multimodal search completed: {len(filtered_results)} results "
                     f"(images: {include_images}, text: {include_text})")
 
         return filtered_results
-
-    def _extract_content_text(self, result: Dict[str, Any], content_fields: List[str]) -> str:
-        """Extract main content text using configured content_fields."""
-        # Priority order for main content (generic field names only)
-        content_priority = ["content_text", "chunk", "text", "description", "content"]
-        
-        for field in content_priority:
-            if field in content_fields and field in result and result[field]:
-                logger.debug(f"Selected main content field: '{field}' (priority match)")
-                return str(result[field])
-        
-        # Use first available content field
-        for field in content_fields:
-            if field in result and result[field]:
-                logger.debug(f"Selected main content field: '{field}' (first available)")
-                return str(result[field])
-        
-        logger.debug("No suitable content field found for main content")
-        return ""
-
-    def _extract_configured_fields(self, result: Dict[str, Any], search_result: SearchResult, content_fields: List[str]) -> None:
-        """Extract all configured content fields into search result."""
-        if search_result.metadata is None:
-            search_result.metadata = {}
-        
-        # Extract all content_fields into metadata
-        extracted_fields = {}
-        for field in content_fields:
-            if field in result and result[field] is not None:
-                extracted_fields[field] = result[field]
-                
-                # Set specific fields to SearchResult properties if they match
-                if field == "document_title":
-                    search_result.document_title = result[field]
-                elif field == "content_path":
-                    search_result.content_path = result[field]
-        
-        # Add all extracted fields to metadata
-        search_result.metadata["extracted_fields"] = extracted_fields
-        
-        # Log what fields were extracted
-        logger.debug(f"Extracted fields: {list(extracted_fields.keys())}")
-
-    def _extract_location_metadata(self, result: Dict[str, Any], search_result: SearchResult, content_fields: List[str]) -> None:
-        """Extract location metadata using configured content fields."""
-        # Look for location-related fields in content_fields
-        location_fields = []
-        for field in content_fields:
-            if any(location_term in field.lower() for location_term in ['location', 'metadata', 'page', 'polygon']):
-                location_fields.append(field)
-        
-        logger.debug(f"Location fields detected from content_fields: {location_fields}")
-        
-        # Extract location metadata
-        for field in location_fields:
-            if field in result and result[field] is not None:
-                if field == "locationMetadata" and isinstance(result[field], dict):
-                    # Handle nested locationMetadata
-                    location_meta = result[field]
-                    if "pageNumber" in location_meta:
-                        search_result.page_number = location_meta["pageNumber"]
-                    if "boundingPolygons" in location_meta:
-                        if search_result.metadata is None:
-                            search_result.metadata = {}
-                        search_result.metadata["boundingPolygons"] = location_meta["boundingPolygons"]
-                    # Add entire locationMetadata to metadata
-                    if search_result.metadata is None:
-                        search_result.metadata = {}
-                    search_result.metadata["locationMetadata"] = location_meta
-                elif field == "pageNumber":
-                    # Direct page number field
-                    search_result.page_number = result[field]
-                elif field == "boundingPolygons":
-                    # Direct bounding polygons field
-                    if search_result.metadata is None:
-                        search_result.metadata = {}
-                    search_result.metadata["boundingPolygons"] = result[field]
-                else:
-                    # Other location-related fields
-                    if search_result.metadata is None:
-                        search_result.metadata = {}
-                    search_result.metadata[field] = result[field]
-
-        # Log location metadata extraction
-        if hasattr(search_result, 'page_number') and search_result.page_number:
-            logger.debug(f"Extracted page number: {search_result.page_number}")
-        if search_result.metadata and any(key in search_result.metadata for key in ['boundingPolygons', 'locationMetadata']):
-            logger.debug("Extracted location metadata information")
@@ -0,0 +1,483 @@
+"""
+Local search provider: BM25 inverted index plus a memory-mapped vector matrix.
+
+Serves the configured document_types from a directory of text, markdown and
+JSON chunks so searches can run air-gapped and benchmarks can run without a
+live Azure AI Search service. Results have the same SearchResult shape as the
+Azure provider because both use the shared ResultExtractor.
+
+Layout of ``data_dir``::
+
+    <data_dir>/<document_type_name>/**/*.{txt,md,json,jsonl}
+    <data_dir>/.local_index/<document_type_name>.f32   (vector matrix, generated)
+    <data_dir>/.local_index/<document_type_name>.json  (matrix manifest, generated)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..base import (DocumentType, EmbeddingProvider, SearchMode,
+                    SearchProvider, SearchQuery, SearchResult,
+                    SearchStatistics)
+from ..extraction import ResultExtractor
+from ..fusion import fuse_results
+from ..text import tokenize
+
+# Import project configuration
+try:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+    from config.project_config import get_project_config
+except ImportError:
+    def get_project_config():
+        return None
+
+logger = logging.getLogger(__name__)
+
+_SUPPORTED_EXTENSIONS = (".txt", ".md", ".json", ".jsonl")
+_INDEX_DIR = ".local_index"
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Deterministic feature-hashing embeddings for air-gapped use."""
+
+    def __init__(self, dimensions: int = 384):
+        """
+        Initialize the hashing embedder.
+
+        Args:
+            dimensions: Length of the generated vectors
+        """
+        self.dimensions = dimensions
+
+    @property
+    def model_id(self) -> str:
+        """Identifier recorded in the vector manifest."""
+        return f"hashing-{self.dimensions}"
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        """Generate an L2-normalized hashed term-frequency vector."""
+        return self._embed(text).tolist()
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate vectors for several texts."""
+        return [self._embed(text).tolist() for text in texts]
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token, count in Counter(tokenize(text)).items():
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign * (1.0 + math.log(count))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+class _LocalIndex:
+    """BM25 postings and a vector matrix for one document type."""
+
+    def __init__(self, records: List[Dict[str, Any]], texts: List[str], k1: float, b: float):
+        self.records = records
+        self.k1 = k1
+        self.b = b
+
+        postings: Dict[str, List[tuple]] = defaultdict(list)
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            term_counts = Counter(tokenize(text))
+            lengths[doc_id] = sum(term_counts.values())
+            for term, count in term_counts.items():
+                postings[term].append((doc_id, count))
+
+        self.doc_lengths = lengths
+        self.avg_doc_length = float(lengths.mean()) if len(lengths) else 0.0
+        self.postings = {
+            term: (np.fromiter((doc for doc, _ in entries), dtype=np.int32, count=len(entries)),
+                   np.fromiter((tf for _, tf in entries), dtype=np.float32, count=len(entries)))
+            for term, entries in postings.items()
+        }
+        self.vectors: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def bm25_scores(self, query_text: str) -> np.ndarray:
+        """Score every document against the query with Okapi BM25."""
+        scores = np.zeros(len(self.records), dtype=np.float32)
+        if not len(self.records):
+            return scores
+        count = len(self.records)
+        norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths / max(self.avg_doc_length, 1e-9))
+        for term in set(tokenize(query_text)):
+            entry = self.postings.get(term)
+            if entry is None:
+                continue
+            docs, tf = entry
+            idf = math.log(1.0 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            # Each document appears once per term, so fancy-index add is safe
+            scores[docs] += idf * tf * (self.k1 + 1.0) / (tf + norm[docs])
+        return scores
+
+    def vector_scores(self, query_vector: np.ndarray) -> Optional[np.ndarray]:
+        """Cosine similarity of every document to the query vector."""
+        if self.vectors is None or self.vectors.shape[1] != query_vector.shape[0]:
+            return None
+        return self.vectors @ query_vector
+
+
+def _top_k(scores: np.ndarray, k: int, positive_only: bool = False) -> np.ndarray:
+    """Indices of the k highest scores, best first, via argpartition."""
+    if positive_only:
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            part = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[part]
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+class LocalSearchProvider(SearchProvider):
+    """Offline search provider over local chunk files."""
+
+    def __init__(
+        self,
+        config: Any,
+        data_dir: Optional[str] = None,
+        embedding_provider: Optional[EmbeddingProvider] = None
+    ):
+        """
+        Initialize the local search provider.
+
+        Args:
+            config: Application configuration
+            data_dir: Chunk directory (defaults to search.local.data_dir)
+            embedding_provider: Embedder for chunks and queries (defaults to
+                search.local.embedding: "hashing" or "azure")
+        """
+        self.config = config
+        self.project_config = get_project_config()
+        if not self.project_config:
+            raise ValueError(
+                "Project configuration not found. Please ensure project_config.yaml is available.")
+
+        self.settings = self.project_config.search_config.local
+        self.data_dir = os.path.abspath(data_dir or self.settings.data_dir)
+
+        if embedding_provider is None:
+            if self.settings.embedding == "azure":
+                from .azure_search import create_azure_embedding_provider
+                embedding_provider = create_azure_embedding_provider(config)
+                self.embedding_model_id = config.azure_embedding_deployment
+            else:
+                embedding_provider = HashingEmbeddingProvider(self.settings.embedding_dim)
+                self.embedding_model_id = embedding_provider.model_id
+        else:
+            self.embedding_model_id = getattr(
+                embedding_provider, 'model_id', type(embedding_provider).__name__)
+        self.embedding_provider = embedding_provider
+
+        # Document types with a chunk directory under data_dir
+        self.document_types: Dict[DocumentType, str] = {}
+        for doc_type_config in self.project_config.document_types:
+            directory = os.path.join(self.data_dir, doc_type_config.name)
+            doc_type = DocumentType.resolve(doc_type_config.name)
+            if doc_type is not None and os.path.isdir(directory):
+                self.document_types[doc_type] = directory
+
+        self.extractor = ResultExtractor(self.project_config)
+        self.extractor.compile(self.document_types)
+
+        self._indexes: Dict[DocumentType, _LocalIndex] = {}
+        self._index_locks: Dict[DocumentType, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._warned_filter = False
+
+        logger.info(
+            f"Local Search Provider initialized with {len(self.document_types)} "
+            f"document types from {self.data_dir}")
+
+    async def search(
+        self,
+        query: SearchQuery,
+        document_type: DocumentType
+    ) -> List[SearchResult]:
+        """Perform BM25 or hybrid (BM25 + vector, rank-fused) search on one document type."""
+        doc_type = DocumentType.resolve(document_type)
+        if doc_type is None or doc_type not in self.document_types:
+            raise ValueError(
+                f"Document type {document_type} not supported by Local Search Provider")
+
+        if query.filter_expression and not self._warned_filter:
+            logger.warning("Local Search Provider ignores filter expressions")
+            self._warned_filter = True
+
+        index = await self._get_index(doc_type)
+        search_mode = SearchMode.HYBRID if query.use_hybrid_search else SearchMode.TEXT
+        top_k = max(1, query.top_k)
+
+        bm25 = index.bm25_scores(query.text)
+        text_ranking = _top_k(bm25, top_k, positive_only=True)
+
+        if query.use_hybrid_search and index.vectors is not None:
+            query_vector = await self._get_query_vector(query)
+            cosine = index.vector_scores(query_vector)
+            if cosine is not None:
+                vector_ranking = _top_k(cosine, top_k)
+                ranking, scores = self._reciprocal_rank_fusion(
+                    [text_ranking, vector_ranking], top_k)
+            else:
+                ranking, scores = text_ranking, bm25[text_ranking]
+        else:
+            ranking, scores = text_ranking, bm25[text_ranking]
+
+        raw_results = []
+        for doc_id, score in zip(ranking.tolist(), scores.tolist()):
+            hit = dict(index.records[doc_id])
+            hit["@search.score"] = score
+            raw_results.append(hit)
+
+        results = self.extractor.process(raw_results, doc_type, search_mode)
+        logger.info(
+            f"Found {len(results)} local results for {doc_type.value} using {search_mode.value} search")
+        return results
+
+    async def search_all(
+        self,
+        query: SearchQuery,
+        top_k_per_source: int = None
+    ) -> List[SearchResult]:
+        """Search across all local document types and fuse the rankings."""
+        top_k = top_k_per_source or self.project_config.search_config.default_top_k_per_source
+
+        # Embed once and reuse the vector for every document type
+        if query.use_hybrid_search:
+            query = replace(query, vector=(await self._get_query_vector(query)).tolist())
+
+        result_lists = []
+        for doc_type in self.document_types:
+            results = await self.search(
+                replace(query, top_k=top_k, document_type=doc_type), doc_type)
+            for result in results:
+                result.metadata["document_type"] = doc_type.value
+                result.metadata["source_index"] = doc_type.value
+            result_lists.append(results)
+
+        fusion = self.project_config.search_config.fusion
+        if fusion.enabled:
+            return fuse_results(
+                result_lists,
+                method=fusion.method,
+                top_k=fusion.top_k,
+                rrf_k=fusion.rrf_k,
+                prefer_reranker=False)
+        all_results = [result for results in result_lists for result in results]
+        all_results.sort(key=lambda x: x.score or 0, reverse=True)
+        return all_results
+
+    def _reciprocal_rank_fusion(self, rankings: List[np.ndarray], top_k: int) -> tuple:
+        """Fuse document rankings the way hybrid search does, returning ids and scores."""
+        fused: Dict[int, float] = defaultdict(float)
+        for ranking in rankings:
+            for rank, doc_id in enumerate(ranking.tolist()):
+                fused[doc_id] += 1.0 / (self.settings.rrf_k + rank + 1)
+        ordered = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return (np.array([doc_id for doc_id, _ in ordered], dtype=np.int64),
+                np.array([score for _, score in ordered], dtype=np.float32))
+
+    async def _get_query_vector(self, query: SearchQuery) -> np.ndarray:
+        """Use a precomputed query vector when it is in this index's space."""
+        if query.vector is not None and len(query.vector) == self._vector_dimensions():
+            return np.asarray(query.vector, dtype=np.float32)
+        return np.asarray(
+            await self.embedding_provider.generate_embedding(query.text), dtype=np.float32)
+
+    def _vector_dimensions(self) -> Optional[int]:
+        for index in self._indexes.values():
+            if index.vectors is not None:
+                return index.vectors.shape[1]
+        return None
+
+    async def _get_index(self, doc_type: DocumentType) -> _LocalIndex:
+        """Load (and on first use build) the index for a document type."""
+        index = self._indexes.get(doc_type)
+        if index is not None:
+            return index
+
+        async with self._index_locks[doc_type]:
+            index = self._indexes.get(doc_type)
+            if index is None:
+                index = await asyncio.to_thread(self._build_text_index, doc_type)
+                await self._attach_vectors(doc_type, index)
+                self._indexes[doc_type] = index
+                logger.info(f"Loaded local index for {doc_type.value}: {len(index)} chunks")
+        return index
+
+    def _build_text_index(self, doc_type: DocumentType) -> _LocalIndex:
+        """Read chunk files and build the BM25 postings."""
+        plan = self.extractor.get_plan(doc_type)
+        main_field = plan.main_content_fields[0] if plan.main_content_fields else "content"
+        doc_type_config = self.project_config.get_document_type(doc_type.value)
+        configured = set(doc_type_config.key_fields + doc_type_config.content_fields) if doc_type_config else set()
+        title_field = next(
+            (name for name in ("document_title", "title") if name in configured), None)
+
+        records = []
+        directory = self.document_types[doc_type]
+        for root, _, files in sorted(os.walk(directory)):
+            for file_name in sorted(files):
+                if not file_name.endswith(_SUPPORTED_EXTENSIONS):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    records.extend(self._load_file(path, main_field, title_field, configured))
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable local chunk file {path}: {e}")
+
+        texts = [
+            " ".join(str(record.get(field, "")) for field in plan.content_fields)
+            for record in records
+        ]
+        return _LocalIndex(records, texts, self.settings.bm25_k1, self.settings.bm25_b)
+
+    def _load_file(
+            self,
+            path: str,
+            main_field: str,
+            title_field: Optional[str],
+            configured: set) -> List[Dict[str, Any]]:
+        """Load chunk records from one text, markdown or JSON file."""
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                return [json.loads(line) for line in f if line.strip()]
+            if path.endswith(".json"):
+                data = json.load(f)
+                # Accept Azure AI Search exports ({"value": [...]}) as well as plain lists
+                if isinstance(data, dict):
+                    data = data.get("value", [data])
+                return [record for record in data if isinstance(record, dict)]
+            text = f.read()
+
+        stem = os.path.splitext(os.path.basename(path))[0]
+        records = []
+        for offset, chunk in self._chunk_text(text):
+            record = {main_field: chunk}
+            if title_field:
+                record[title_field] = stem
+            if "content_path" in configured:
+                record["content_path"] = os.path.relpath(path, self.data_dir)
+            record["@local.offset"] = offset
+            records.append(record)
+        return records
+
+    def _chunk_text(self, text: str) -> List[tuple]:
+        """Split text into paragraph-aligned chunks of about chunk_chars characters."""
+        chunks = []
+        start = None
+        parts: List[str] = []
+        size = 0
+        for match in re.finditer(r"\S(?:.*?\S)?(?=\n\s*\n|\s*\Z)", text, re.S):
+            if start is None:
+                start = match.start()
+            parts.append(match.group())
+            size += len(match.group())
+            if size >= self.settings.chunk_chars:
+                chunks.append((start, "\n\n".join(parts)))
+                start, parts, size = None, [], 0
+        if parts:
+            chunks.append((start, "\n\n".join(parts)))
+        return chunks
+
+    async def _attach_vectors(self, doc_type: DocumentType, index: _LocalIndex) -> None:
+        """Memory-map the vector matrix, embedding the chunks if it is missing or stale."""
+        if not len(index):
+            return
+
+        plan = self.extractor.get_plan(doc_type)
+        texts = [
+            " ".join(str(record.get(field, "")) for field in plan.content_fields)
+            for record in index.records
+        ]
+        fingerprint = hashlib.sha256(
+            "\x1e".join([self.embedding_model_id] + texts).encode("utf-8")).hexdigest()
+
+        index_dir = os.path.join(self.data_dir, _INDEX_DIR)
+        matrix_path = os.path.join(index_dir, f"{doc_type.value}.f32")
+        manifest_path = os.path.join(index_dir, f"{doc_type.value}.json")
+
+        manifest = None
+        if os.path.exists(manifest_path) and os.path.exists(matrix_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+
+        if not manifest or manifest.get("fingerprint") != fingerprint:
+            logger.info(f"Embedding {len(texts)} local chunks for {doc_type.value}")
+            vectors = []
+            batch_size = max(1, self.settings.embedding_batch_size)
+            for i in range(0, len(texts), batch_size):
+                vectors.extend(
+                    await self.embedding_provider.generate_embeddings(texts[i:i + batch_size]))
+            if not vectors or any(not vector for vector in vectors):
+                logger.warning(
+                    f"Embedding failed for {doc_type.value}; local search will be text-only")
+                return
+
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms > 0, norms, 1.0)
+
+            os.makedirs(index_dir, exist_ok=True)
+            writer = np.memmap(matrix_path, dtype=np.float32, mode="w+", shape=matrix.shape)
+            writer[:] = matrix
+            writer.flush()
+            del writer
+            manifest = {
+                "fingerprint": fingerprint,
+                "count": matrix.shape[0],
+                "dimensions": matrix.shape[1],
+                "embedding": self.embedding_model_id
+            }
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+
+        index.vectors = np.memmap(
+            matrix_path, dtype=np.float32, mode="r",
+            shape=(manifest["count"], manifest["dimensions"]))
+
+    def get_statistics(self) -> Dict[str, SearchStatistics]:
+        """Get local index statistics."""
+        stats = {}
+        for doc_type, directory in self.document_types.items():
+            index = self._indexes.get(doc_type)
+            stats[doc_type.value] = SearchStatistics(
+                provider_name="Local Search",
+                index_name=os.path.basename(directory),
+                endpoint=self.data_dir,
+                status="available" if index is not None else "not_loaded",
+                document_count=len(index) if index is not None else None
+            )
+        return stats
+
+    def is_available(self) -> bool:
+        """Check if any configured document type has local chunks."""
+        return len(self.document_types) > 0
+
+    def get_supported_document_types(self) -> List[DocumentType]:
+        """Get supported document types."""
+        return list(self.document_types.keys())
+
+    async def close(self) -> None:
+        """Release memory-mapped matrices and the embedding client."""
+        self._indexes.clear()
+        await self.embedding_provider.close()
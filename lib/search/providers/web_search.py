@@ -1,20 +1,35 @@
 """
 Web Search provider implementation using Tavily API.
 """
+import asyncio
 import datetime as dt
 import json
 import logging
+import random
+import time
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
 
-from tavily import TavilyClient
+import httpx
 
 from ..base import (DocumentType, SearchProvider, SearchQuery, SearchResult,
                     SearchStatistics)
+from ..dedup import collapse_duplicate_web_results, get_duplicate_detector
+from ..rate_limit import RateLimitedError, get_rate_limiter
+from ..web_cache import WebResultCache, get_web_result_cache
+from ..web_content import WebContentPipeline
 
 logger = logging.getLogger(__name__)
 
 
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
 class WebSearchProvider(SearchProvider):
     """Web Search provider implementation using Tavily API."""
 
@@ -29,37 +44,99 @@ class WebSearchProvider(SearchProvider):
             raise ValueError(
                 "Tavily API key is required for web search functionality")
 
-        # Initialize Tavily client
+        # Get configuration parameters
+        self.max_results = getattr(config, 'tavily_max_results', 10)
+        self.max_retries = getattr(config, 'tavily_max_retries', 3)
+        self.timeout = getattr(
+            config,
+            'tavily_timeout',
+            30)  # Default 30 seconds
+
+        web_search_config = None
         try:
-            # Initialize with timeout settings if supported
-            self.client = TavilyClient(api_key=api_key)
+            from lib.config.project_config import get_project_config
+            project_config = get_project_config()
+            if project_config and hasattr(project_config, 'web_search'):
+                web_search_config = project_config.web_search
+        except Exception as e:
+            logger.warning(f"Could not load web search configuration, using defaults: {e}")
+        if web_search_config is None:
+            from lib.config.project_config import WebSearchConfig
+            web_search_config = WebSearchConfig()
 
-            # Set timeout on the underlying HTTP client if available
-            if hasattr(
-                    self.client,
-                    '_client') and hasattr(
-                    self.client._client,
-                    'timeout'):
-                self.client._client.timeout = 30  # 30 second timeout
+        self.api_url = web_search_config.api_url.rstrip("/")
+        self.latency_budget = web_search_config.latency_budget
+        self.retry_base_delay = web_search_config.retry_base_delay
 
+        # Pooled async client: no event loop blocking, connections are reused
+        try:
+            self.client = httpx.AsyncClient(
+                base_url=self.api_url,
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                },
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=web_search_config.max_connections,
+                    max_keepalive_connections=web_search_config.max_connections
+                )
+            )
             logger.info("Tavily Web Search Provider initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Tavily client: {e}")
             raise
 
-        # Get configuration parameters
-        self.max_results = getattr(config, 'tavily_max_results', 10)
-        self.max_retries = getattr(config, 'tavily_max_retries', 3)
-        self.timeout = getattr(
-            config,
-            'tavily_timeout',
-            30)  # Default 30 seconds
+        # One request budget per API key, shared by every provider instance
+        self.rate_limiter = get_rate_limiter(
+            f"tavily:{api_key[-6:]}",
+            web_search_config.requests_per_minute,
+            web_search_config.burst
+        )
+
+        # Persistent response cache shared across sessions (None when disabled)
+        self.web_cache = get_web_result_cache()
+
+        # Page fetch and chunking for raw content requests (None when disabled)
+        self.content_pipeline = self._create_content_pipeline()
+        self.deduplicator = get_duplicate_detector()
 
         # Statistics tracking
         self.search_count = 0
         self.error_count = 0
+        self.rate_limited_count = 0
         self.last_search_time = None
 
+    def _create_content_pipeline(self) -> Optional[WebContentPipeline]:
+        """Create the web content pipeline from project configuration, or None if disabled."""
+        try:
+            from lib.config.project_config import get_project_config
+            project_config = get_project_config()
+            if project_config:
+                settings = project_config.search_config.web_content
+                if not settings.enabled:
+                    return None
+                return WebContentPipeline(
+                    max_pages=settings.max_pages,
+                    fetch_concurrency=settings.fetch_concurrency,
+                    fetch_timeout=settings.fetch_timeout,
+                    max_page_chars=settings.max_page_chars,
+                    chunk_chars=settings.chunk_chars,
+                    chunk_overlap=settings.chunk_overlap,
+                    max_chunks_per_page=settings.max_chunks_per_page,
+                    max_redirects=settings.max_redirects
+                )
+        except Exception as e:
+            logger.warning(
+                f"Could not load web content configuration, using defaults: {e}")
+        return WebContentPipeline()
+
+    async def close(self) -> None:
+        """Close the pooled HTTP clients."""
+        await self.client.aclose()
+        if self.content_pipeline is not None:
+            await self.content_pipeline.close()
+
     async def search(
         self,
         query: SearchQuery,
@@ -88,8 +165,9 @@ class WebSearchProvider(SearchProvider):
             # Build search parameters
             search_params = self._build_search_params(query)
 
-            # Execute search with retry logic
-            response = await self._execute_search_with_retry(search_params)
+            # Execute search with retry logic unless the response is cached
+            response = await self._cached_execute(
+                search_params, self._execute_search_with_retry)
 
             # Process and validate response
             results = self._process_search_response(response)
@@ -147,124 +225,108 @@ class WebSearchProvider(SearchProvider):
         return search_params
 
     async def _execute_search_with_retry(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute search with retry logic and exponential backoff."""
-        import asyncio
-        import time
+        """
+        Execute a search with jittered retries inside the per-call latency budget.
+
+        Raises:
+            RateLimitedError: If the rate limit cannot be met within the budget
+        """
+        deadline = time.monotonic() + self.latency_budget
         last_exception = None
 
         for attempt in range(self.max_retries):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
             try:
                 logger.debug(f"Search attempt {
                              attempt + 1}/{self.max_retries}")
-
-                # Execute the search directly with timeout handling
-                start_time = time.time()
-
-                try:
-                    response = self.client.search(
-                        query=search_params["query"],
-                        max_results=search_params["max_results"],
-                        topic=search_params["topic"],
-                        search_depth=search_params["search_depth"],
-                        include_answer=search_params["include_answer"],
-                        include_raw_content=search_params["include_raw_content"],
-                        include_image_descriptions=search_params["include_image_descriptions"],
-                        include_images=search_params["include_images"],
-                        timeout=self.timeout)
-                    elapsed_time = time.time() - start_time
-                    logger.debug(
-                        f"Search completed in {
-                            elapsed_time:.2f} seconds")
-
-                except Exception as e:
-                    elapsed_time = time.time() - start_time
-
-                    # Handle specific error types
-                    error_str = str(e).lower()
-                    if "timeout" in error_str or "timed out" in error_str:
-                        raise TimeoutError(
-                            f"Search request timed out after {
-                                elapsed_time:.1f} seconds")
-                    elif "502" in error_str or "bad gateway" in error_str:
-                        raise ConnectionError(
-                            f"Server error (502 Bad Gateway) - Tavily API may be temporarily unavailable")
-                    elif "503" in error_str or "service unavailable" in error_str:
-                        raise ConnectionError(
-                            f"Service temporarily unavailable (503) - Tavily API is down")
-                    elif "429" in error_str or "rate limit" in error_str:
-                        raise ConnectionError(
-                            f"Rate limit exceeded - too many requests to Tavily API")
-                    elif "401" in error_str or "unauthorized" in error_str:
-                        raise ValueError(
-                            f"Unauthorized - invalid Tavily API key")
-                    elif "403" in error_str or "forbidden" in error_str:
-                        raise ValueError(
-                            f"Forbidden - Tavily API access denied")
-                    elif "404" in error_str or "not found" in error_str:
-                        raise ConnectionError(
-                            f"API endpoint not found - check Tavily API URL")
-                    else:
-                        raise
-
-                # Handle string response
-                if isinstance(response, str):
-                    try:
-                        response = json.loads(response)
-                    except json.JSONDecodeError as e:
-                        raise ValueError(
-                            f"Invalid JSON response from Tavily API: {e}")
-
-                if not isinstance(response, dict):
-                    raise ValueError(
-                        f"Unexpected response type: {
-                            type(response)}")
-
+                response = await self._post_search(search_params, deadline)
                 logger.debug(f"Search attempt {attempt + 1} succeeded")
                 return response
 
-            except Exception as e:
+            except ValueError as e:
+                # API key or authorization errors - don't retry
+                logger.error(f"Authentication error - not retrying: {e}")
+                raise
+
+            except (RateLimitedError, TimeoutError, ConnectionError) as e:
                 last_exception = e
-                error_type = type(e).__name__
                 logger.warning(
-                    f"Search attempt {
-                        attempt +
-                        1} failed ({error_type}): {e}")
-
-                if attempt < self.max_retries - 1:
-                    # Adjust sleep time based on error type
-                    if isinstance(e, TimeoutError):
-                        # Linear backoff for timeouts
-                        sleep_time = 2 * (attempt + 1)
-                    elif isinstance(e, ConnectionError):
-                        if "502" in str(e):
-                            # Longer wait for server errors
-                            sleep_time = 10 * (attempt + 1)
-                        elif "503" in str(e):
-                            # Even longer for service unavailable
-                            sleep_time = 15 * (attempt + 1)
-                        elif "rate limit" in str(e).lower():
-                            # Much longer wait for rate limits
-                            sleep_time = 60 * (attempt + 1)
-                        else:
-                            # Default for connection errors
-                            sleep_time = 5 * (attempt + 1)
-                    elif isinstance(e, ValueError):
-                        # API key or authorization errors - don't retry
-                        logger.error(
-                            f"Authentication error - not retrying: {e}")
-                        break
-                    else:
-                        sleep_time = 2 ** attempt  # Exponential backoff for other errors
-
-                    logger.info(f"Retrying in {sleep_time} seconds... (attempt {
-                                attempt + 2}/{self.max_retries})")
-                    await asyncio.sleep(sleep_time)
-
-        # If all retries failed
-        logger.error(
-            f"All {
-                self.max_retries} search attempts failed. Last error: {last_exception}")
-        raise last_exception
+                    f"Search attempt {attempt + 1} failed ({type(e).__name__}): {e}")
+                if attempt == self.max_retries - 1:
+                    break
+
+                # Full jitter keeps parallel researchers from retrying in lockstep
+                sleep_time = random.uniform(0, self.retry_base_delay * 2 ** attempt)
+                if isinstance(e, RateLimitedError) and e.retry_after:
+                    sleep_time = max(sleep_time, e.retry_after)
+                if time.monotonic() + sleep_time >= deadline:
+                    logger.warning(
+                        f"Retry in {sleep_time:.1f}s would exceed the "
+                        f"{self.latency_budget}s latency budget - giving up")
+                    break
+
+                logger.info(f"Retrying in {sleep_time:.2f} seconds... (attempt {
+                            attempt + 2}/{self.max_retries})")
+                await asyncio.sleep(sleep_time)
+
+        logger.error(f"Web search gave up. Last error: {last_exception}")
+        if isinstance(last_exception, RateLimitedError):
+            self.rate_limited_count += 1
+            raise last_exception
+        raise last_exception or TimeoutError(
+            f"Latency budget of {self.latency_budget}s exhausted")
+
+    async def _post_search(self, search_params: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+        """Send one rate-limited search request that must finish before the deadline."""
+        if not await self.rate_limiter.acquire(timeout=deadline - time.monotonic()):
+            raise RateLimitedError(
+                "Local Tavily rate limit reached - no request slot within the latency budget",
+                retry_after=self.rate_limiter.time_until_available())
+
+        start_time = time.monotonic()
+        try:
+            response = await self.client.post(
+                "/search",
+                json=search_params,
+                timeout=min(self.timeout, max(0.1, deadline - start_time)))
+        except httpx.TimeoutException:
+            raise TimeoutError(
+                f"Search request timed out after {time.monotonic() - start_time:.1f} seconds")
+        except httpx.TransportError as e:
+            raise ConnectionError(f"Connection to Tavily API failed: {e}")
+
+        logger.debug(
+            f"Search completed in {time.monotonic() - start_time:.2f} seconds")
+
+        status = response.status_code
+        if status == 429:
+            retry_after = _parse_retry_after(response.headers.get("retry-after"))
+            # Stop every caller sharing this key until the server allows more
+            self.rate_limiter.block_for(retry_after or self.retry_base_delay)
+            raise RateLimitedError(
+                "Rate limit exceeded - too many requests to Tavily API",
+                retry_after=retry_after)
+        if status in (401, 403):
+            raise ValueError(
+                f"Unauthorized - Tavily API rejected the key ({status})")
+        if status == 404:
+            raise ConnectionError(
+                "API endpoint not found - check Tavily API URL")
+        if status >= 500:
+            raise ConnectionError(
+                f"Server error ({status}) - Tavily API may be temporarily unavailable")
+        if status >= 400:
+            raise ValueError(f"Tavily API rejected the request ({status}): {response.text[:200]}")
+
+        try:
+            data = response.json()
+        except json.JSONDecodeError as e:
+            raise ConnectionError(f"Invalid JSON response from Tavily API: {e}")
+        if not isinstance(data, dict):
+            raise ConnectionError(f"Unexpected response type: {type(data)}")
+        return data
 
     def _process_search_response(
             self, response: Dict[str, Any]) -> List[SearchResult]:
@@ -332,6 +394,15 @@ class WebSearchProvider(SearchProvider):
                 document_count=self.search_count,
                 last_updated=self.last_search_time)}
 
+    def get_rate_limit_statistics(self) -> Dict[str, Any]:
+        """Get rate limiter state and the number of calls that gave up rate limited."""
+        return {
+            "rate_limited_calls": self.rate_limited_count,
+            "tokens_available": round(self.rate_limiter.available(), 2),
+            "requests_per_minute": self.rate_limiter.rate * 60.0,
+            "latency_budget": self.latency_budget
+        }
+
     def is_available(self) -> bool:
         """Check if web search is available."""
         try:
@@ -380,6 +451,9 @@ class WebSearchProvider(SearchProvider):
             include_image_descriptions = search_params.get("include_image_descriptions", False)
             time_range = search_params.get("time_range")
 
+            # Pages are fetched and chunked locally instead of returned whole
+            fetch_pages = include_raw_content and self.content_pipeline is not None
+
             # Build Tavily search parameters
             tavily_params = {
                 "query": query,
@@ -387,7 +461,7 @@ class WebSearchProvider(SearchProvider):
                 "topic": topic,
                 "search_depth": search_depth,
                 "include_answer": include_answer,
-                "include_raw_content": include_raw_content,
+                "include_raw_content": include_raw_content and not fetch_pages,
                 "include_images": include_images or include_image_descriptions
             }
 
@@ -397,16 +471,75 @@ class WebSearchProvider(SearchProvider):
 
             logger.info(f"Executing Tavily search with params: {tavily_params}")
 
-            # Execute search
-            response = await self._execute_tavily_search(tavily_params)
+            # Execute search unless the response is cached
+            response = await self._cached_execute(
+                tavily_params, self._execute_tavily_search, time_range)
 
             # Process and format response
-            return self._format_web_search_response(response, include_image_descriptions)
-
+            formatted = self._format_web_search_response(response, include_image_descriptions)
+            # Collapse syndicated copies before any page is fetched for them
+            if self.deduplicator is not None and formatted.get("results"):
+                formatted["results"], formatted["dedup"] = collapse_duplicate_web_results(
+                    formatted["results"], self.deduplicator)
+                if formatted["dedup"]["output"] < formatted["dedup"]["input"]:
+                    logger.info(
+                        f"Web search: collapsed {formatted['dedup']['input']} results to "
+                        f"{formatted['dedup']['output']} (~{formatted['dedup']['tokens_saved']} tokens saved)")
+            if fetch_pages and formatted.get("results"):
+                await self.content_pipeline.enrich(query, formatted["results"])
+            return formatted
+
+        except RateLimitedError as e:
+            logger.warning(f"Web search rate limited: {e}")
+            return {
+                "error": "rate_limited",
+                "message": f"Web search is rate limited: {e}. Continue with other sources or retry later.",
+                "rate_limited": True,
+                "retry_after": e.retry_after,
+                "results": []
+            }
         except Exception as e:
             logger.error(f"Web search failed: {str(e)}")
             return {"error": f"Web search failed: {str(e)}", "results": []}
 
+    async def _cached_execute(
+        self,
+        params: Dict[str, Any],
+        execute: Any,
+        time_range: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Serve a search from the web result cache, or execute and cache it."""
+        if self.web_cache is None:
+            return await execute(params)
+
+        key = WebResultCache.make_key(
+            params["query"],
+            topic=params.get("topic", "general"),
+            search_depth=params.get("search_depth", "basic"),
+            time_range=time_range,
+            max_results=params.get("max_results", self.max_results),
+            include_answer=params.get("include_answer", False),
+            include_raw_content=params.get("include_raw_content", False),
+            include_images=params.get("include_images", False)
+        )
+        # SQLite calls block, so they run in a worker thread
+        response = await asyncio.to_thread(self.web_cache.get, key)
+        if response is not None:
+            logger.info(f"Web search served from cache: '{self._truncate_text(params['query'], 50)}'")
+            return response
+
+        response = await execute(params)
+        # Empty responses are not cached so a transient miss is retried next time
+        if response.get("results"):
+            await asyncio.to_thread(self.web_cache.put, key, response, time_range)
+        return response
+
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Get hit-rate metrics for the persistent web result cache."""
+        if self.web_cache is None:
+            return {"enabled": False}
+        return self.web_cache.get_stats()
+
     def _convert_time_range_to_days(self, time_range: str) -> int:
         """Convert time range string to days for Tavily API."""
         time_mapping = {
@@ -420,9 +553,9 @@ class WebSearchProvider(SearchProvider):
     async def _execute_tavily_search(self, tavily_params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute Tavily search with error handling."""
         try:
-            # Execute search (Tavily client may not be async, wrap if needed)
-            response = self.client.search(**tavily_params)
-            return response
+            return await self._execute_search_with_retry(tavily_params)
+        except RateLimitedError:
+            raise
         except Exception as e:
             logger.error(f"Tavily API call failed: {str(e)}")
             raise
@@ -0,0 +1,110 @@
+"""
+Token-bucket rate limiting for external search APIs.
+
+Limiters are shared per API so every provider instance and researcher in the
+process draws from one budget sized to the plan's request quota.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitedError(Exception):
+    """Raised when a request cannot be admitted within its latency budget."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate_per_second: float, burst: int):
+        """
+        Initialize the bucket full.
+
+        Args:
+            rate_per_second: Sustained request rate
+            burst: Bucket capacity, the largest burst admitted at once
+        """
+        self.rate = rate_per_second
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        # No tokens are issued before this time (set by server back-off hints)
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self, now: float) -> float:
+        """Seconds until a token is available."""
+        wait = max(0.0, self._blocked_until - now)
+        if self._tokens < 1.0:
+            wait = max(wait, (1.0 - self._tokens) / self.rate)
+        return wait
+
+    async def acquire(self, timeout: float) -> bool:
+        """
+        Take a token, waiting at most timeout seconds.
+
+        Returns False immediately when the wait would exceed the timeout, so
+        callers fail fast instead of sleeping through their budget.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        wait = self._wait_time(now)
+        if wait > timeout:
+            return False
+        # Reserve the token before sleeping so later callers queue behind it
+        self._tokens -= 1.0
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._tokens += 1.0
+                raise
+        return True
+
+    def block_for(self, seconds: float) -> None:
+        """Stop issuing tokens for a while, e.g. after an HTTP 429."""
+        now = time.monotonic()
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        self._refill(now)
+        self._tokens = min(self._tokens, 0.0)
+
+    def time_until_available(self) -> float:
+        """Get the seconds until the next token can be issued."""
+        now = time.monotonic()
+        self._refill(now)
+        return self._wait_time(now)
+
+    def available(self) -> float:
+        """Get the current token count."""
+        self._refill(time.monotonic())
+        return self._tokens
+
+
+# Limiters per external API, shared by every provider instance
+_limiters: Dict[str, TokenBucket] = {}
+
+
+def get_rate_limiter(name: str, requests_per_minute: float, burst: int) -> TokenBucket:
+    """
+    Get the process-wide token bucket for an API.
+
+    The first caller's limits apply to every later caller for the same name.
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = TokenBucket(requests_per_minute / 60.0, burst)
+        _limiters[name] = limiter
+        logger.info(
+            f"Rate limiter for {name}: {requests_per_minute} requests/min, burst {burst}")
+    return limiter
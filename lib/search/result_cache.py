@@ -0,0 +1,149 @@
+"""
+Search result cache with single-flight request deduplication.
+
+Parallel researchers and critics often issue the same search several times
+per research task. Completed results are kept for a short TTL, and identical
+queries that are still in flight share one provider request instead of
+hitting Azure again.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import (Any, Awaitable, Callable, Dict, Hashable, List, Optional,
+                    Tuple)
+
+from .base import SearchQuery, SearchResult
+
+logger = logging.getLogger(__name__)
+
+
+class SearchResultCache:
+    """TTL + LRU bounded cache of search results keyed by query parameters."""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 300.0,
+        provider_ttl_seconds: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize the result cache.
+
+        Args:
+            max_entries: Maximum cached result lists
+            ttl_seconds: Default lifetime of a cached result list
+            provider_ttl_seconds: Per-provider TTL overrides (0 disables caching)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.provider_ttl_seconds = dict(provider_ttl_seconds or {})
+
+        # key -> (expires_at, results)
+        self._entries: "OrderedDict[Hashable, Tuple[float, List[SearchResult]]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        provider_name: str,
+        operation: str,
+        query: SearchQuery,
+        document_type: Any = None,
+        *extra: Hashable
+    ) -> Tuple:
+        """Build a cache key from the parameters that change search results."""
+        return (
+            provider_name,
+            operation,
+            getattr(document_type, 'value', document_type),
+            " ".join(query.text.split()),
+            query.top_k,
+            query.filter_expression,
+            query.use_hybrid_search,
+            query.use_semantic_search,
+            *extra
+        )
+
+    def get_ttl(self, provider_name: str) -> float:
+        """Get the TTL that applies to a provider."""
+        return self.provider_ttl_seconds.get(provider_name, self.ttl_seconds)
+
+    async def get_or_fetch(
+        self,
+        key: Tuple,
+        provider_name: str,
+        fetch: Callable[[], Awaitable[List[SearchResult]]]
+    ) -> List[SearchResult]:
+        """
+        Return cached results, join an identical in-flight request, or fetch.
+
+        Cached SearchResult objects are shared between callers and must be
+        treated as read-only.
+        """
+        ttl = self.get_ttl(provider_name)
+        if ttl <= 0:
+            self.bypassed += 1
+            return await fetch()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, results = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(results)
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug(f"Joining in-flight {provider_name} search: {key[3][:50]}")
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fetch_and_store(key, ttl, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one cancelled caller does not cancel the shared request
+        return list(await asyncio.shield(task))
+
+    async def _fetch_and_store(
+        self,
+        key: Tuple,
+        ttl: float,
+        fetch: Callable[[], Awaitable[List[SearchResult]]]
+    ) -> List[SearchResult]:
+        """Run the provider request and cache non-empty results."""
+        results = await fetch()
+        # Empty lists are not cached: providers return them on soft failures
+        if results:
+            self._entries[key] = (time.monotonic() + ttl, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate metrics for the cache."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0
+        }
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
@@ -0,0 +1,206 @@
+"""
+Semantic cache of search results keyed by query embedding.
+
+Researchers sampling at different temperatures paraphrase the same search
+("X overview" vs "overview of X"), which an exact-key cache always misses.
+Recent query embeddings are kept as rows of one NumPy matrix; a lookup scores
+every row in a single matrix-vector product and serves the cached results of
+the most similar query with the same provider, document type and filter when
+its cosine similarity clears the threshold.
+
+The cache is opt-in: embeddings of queries that differ only in an entity,
+year or region can still score above 0.95, so the default threshold is
+strict and filters must match exactly.
+"""
+import logging
+import time
+from dataclasses import replace
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .base import SearchQuery, SearchResult
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticQueryCache:
+    """Bounded TTL cache that matches queries by embedding cosine similarity."""
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.98,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity to serve cached results
+            max_entries: Query vectors kept; the least recently used is replaced
+            ttl_seconds: Lifetime of cached results
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+
+        # Row storage, allocated once the embedding dimension is known
+        self._vectors: Optional[np.ndarray] = None
+        self._partitions = np.full(self.max_entries, -1, dtype=np.int64)
+        self._expires = np.zeros(self.max_entries, dtype=np.float64)
+        self._last_used = np.zeros(self.max_entries, dtype=np.float64)
+        self._texts: List[Optional[str]] = [None] * self.max_entries
+        self._results: List[Optional[List[SearchResult]]] = [None] * self.max_entries
+        # Partition key <-> id of partitions that own at least one row
+        self._partition_ids: Dict[Hashable, int] = {}
+        self._partition_keys: Dict[int, Hashable] = {}
+        self._next_partition_id = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hit_similarity = 0.0
+
+    @staticmethod
+    def make_partition(
+        provider_name: str,
+        operation: str,
+        query: SearchQuery,
+        document_type: Any = None,
+        *extra: Hashable
+    ) -> Tuple:
+        """Build the key of the parameters a cached query must share exactly."""
+        return (
+            provider_name,
+            operation,
+            getattr(document_type, 'value', document_type),
+            query.top_k,
+            query.filter_expression,
+            query.use_hybrid_search,
+            query.use_semantic_search,
+            *extra
+        )
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm > 0 else None
+
+    def lookup(
+        self,
+        partition: Hashable,
+        query_text: str,
+        vector: Sequence[float]
+    ) -> Optional[List[SearchResult]]:
+        """
+        Return the cached results of the most similar recent query, if similar enough.
+
+        Served results are copies whose metadata carries a "semantic_cache"
+        entry with the similarity and the cached query text.
+        """
+        partition_id = self._partition_ids.get(partition)
+        query_vector = self._normalize(vector)
+        if (partition_id is None or query_vector is None or self._vectors is None
+                or query_vector.shape[0] != self._vectors.shape[1]):
+            self.misses += 1
+            return None
+
+        now = time.monotonic()
+        # Score every row at once; slicing out the partition would copy the matrix
+        similarities = self._vectors @ query_vector
+        similarities[(self._partitions != partition_id) | (self._expires <= now)] = -np.inf
+        row = int(similarities.argmax())
+        similarity = float(similarities[row])
+        if similarity < self.similarity_threshold:
+            self.misses += 1
+            return None
+
+        self._last_used[row] = now
+        self.hits += 1
+        self._hit_similarity += similarity
+        cached_text = self._texts[row]
+        logger.info(
+            f"Semantic cache hit ({similarity:.3f}): '{query_text[:50]}' "
+            f"served from '{(cached_text or '')[:50]}'")
+        provenance = {"similarity": round(similarity, 4), "cached_query": cached_text}
+        return [
+            replace(result, metadata={**(result.metadata or {}), "semantic_cache": provenance})
+            for result in self._results[row]
+        ]
+
+    def put(
+        self,
+        partition: Hashable,
+        query_text: str,
+        vector: Sequence[float],
+        results: List[SearchResult]
+    ) -> None:
+        """Remember a query's results under its embedding (empty results are not cached)."""
+        query_vector = self._normalize(vector)
+        if not results or query_vector is None or self.ttl_seconds <= 0:
+            return
+        if self._vectors is None or self._vectors.shape[1] != query_vector.shape[0]:
+            # First vector, or a different embedding model: start over
+            self._vectors = np.zeros((self.max_entries, query_vector.shape[0]), dtype=np.float32)
+            self.clear()
+
+        now = time.monotonic()
+        expired = np.flatnonzero((self._partitions >= 0) & (self._expires <= now))
+        if expired.size:
+            self._release(expired)
+        free = np.flatnonzero(self._partitions < 0)
+        if free.size:
+            row = int(free[0])
+        else:
+            row = int(self._last_used.argmin())
+            self._release(np.array([row]))
+            self.evictions += 1
+
+        partition_id = self._partition_ids.get(partition)
+        if partition_id is None:
+            partition_id = self._next_partition_id
+            self._next_partition_id += 1
+            self._partition_ids[partition] = partition_id
+            self._partition_keys[partition_id] = partition
+        self._vectors[row] = query_vector
+        self._partitions[row] = partition_id
+        self._expires[row] = now + self.ttl_seconds
+        self._last_used[row] = now
+        self._texts[row] = query_text
+        self._results[row] = results
+
+    def _release(self, rows: np.ndarray) -> None:
+        """Free rows and forget partitions that no longer own any row."""
+        released = set(self._partitions[rows].tolist())
+        self._partitions[rows] = -1
+        self._expires[rows] = 0.0
+        for row in rows.tolist():
+            self._texts[row] = None
+            self._results[row] = None
+        for partition_id in released - set(np.unique(self._partitions).tolist()):
+            self._partition_ids.pop(self._partition_keys.pop(partition_id), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate metrics for the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": int((self._expires > time.monotonic()).sum()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "partitions": len(self._partition_ids),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "avg_hit_similarity": self._hit_similarity / self.hits if self.hits else 0.0,
+            "similarity_threshold": self.similarity_threshold
+        }
+
+    def clear(self) -> None:
+        """Drop every cached query."""
+        self._partitions.fill(-1)
+        self._expires.fill(0.0)
+        self._texts = [None] * self.max_entries
+        self._results = [None] * self.max_entries
+        self._partition_ids.clear()
+        self._partition_keys.clear()
@@ -0,0 +1,148 @@
+"""
+Fast JSON serialization of search tool results.
+
+Kernel search functions return 50-200 hits per call, serialized on the hot
+path of every agent. Output is compact JSON encoded with orjson or msgspec
+when one is installed and with the stdlib C encoder otherwise, in a single
+call per tool output. SearchResult objects are encoded directly: the
+encoder's fallback hook turns each hit into its output fields as it is
+reached, so no list of per-hit dicts is built first. Pretty-printing is
+dropped: indentation costs tokens and forces the stdlib onto its
+pure-Python encoder.
+"""
+import json
+import logging
+from dataclasses import is_dataclass, asdict
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable
+
+from .base import SearchResult
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+# Optional SearchResult fields in output order, omitted when empty
+_OPTIONAL_FIELDS = (
+    "document_title", "content_path", "page_number", "score",
+    "reranker_score", "highlights", "captions", "answers")
+# Fields emitted whenever set, since zero is a meaningful value
+_NUMERIC_FIELDS = frozenset({"page_number", "score", "reranker_score"})
+
+
+def _default(value: Any) -> Any:
+    """Convert values the JSON encoders do not know natively."""
+    if isinstance(value, SearchResult):
+        return result_to_dict(value)
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "tolist"):  # NumPy arrays and scalars
+        return value.tolist()
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+_stdlib_encoder = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), default=_default)
+
+
+def _select_backend(name: str = "auto") -> str:
+    if name in ("auto", "orjson") and orjson is not None:
+        return "orjson"
+    if name in ("auto", "msgspec") and msgspec is not None:
+        return "msgspec"
+    if name not in ("auto", "json"):
+        logger.warning(f"JSON backend {name} is not installed, using the standard library")
+    return "json"
+
+
+def _msgspec_ready(value: Any) -> Any:
+    """Convert SearchResults up front, since msgspec encodes dataclasses without enc_hook."""
+    if isinstance(value, SearchResult):
+        return result_to_dict(value)
+    if isinstance(value, list) and any(isinstance(item, SearchResult) for item in value):
+        return [result_to_dict(item) if isinstance(item, SearchResult) else item for item in value]
+    return value
+
+
+def _make_dumps(backend: str) -> Callable[[Any], str]:
+    if backend == "orjson":
+        # Route dataclasses through _default so SearchResult omits empty fields
+        options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                   | orjson.OPT_PASSTHROUGH_DATACLASS)
+        return lambda value: orjson.dumps(value, default=_default, option=options).decode("utf-8")
+    if backend == "msgspec":
+        encoder = msgspec.json.Encoder(enc_hook=_default)
+        return lambda value: encoder.encode(_msgspec_ready(value)).decode("utf-8")
+    return _stdlib_encoder.encode
+
+
+BACKEND = _select_backend()
+_dumps = _make_dumps(BACKEND)
+
+
+def set_backend(name: str) -> str:
+    """
+    Choose the JSON backend ("auto", "orjson", "msgspec" or "json").
+
+    Returns:
+        The backend actually in use, which falls back to "json" when the
+        requested library is not installed
+    """
+    global BACKEND, _dumps
+    BACKEND = _select_backend(name)
+    _dumps = _make_dumps(BACKEND)
+    return BACKEND
+
+
+def dumps(value: Any) -> str:
+    """Encode a value, including SearchResult objects, as compact JSON with non-ASCII text kept as is."""
+    return _dumps(value)
+
+
+def result_to_dict(result: SearchResult) -> Dict[str, Any]:
+    """
+    Convert a SearchResult to the tool output dictionary.
+
+    Empty optional fields are omitted and metadata entries are merged into
+    the top level, overriding fields with the same name.
+    """
+    result_dict = {
+        "content_text": result.content_text,
+        "search_type": result.search_type,
+        "search_mode": result.search_mode
+    }
+    for field in _OPTIONAL_FIELDS:
+        value = getattr(result, field)
+        if value is not None if field in _NUMERIC_FIELDS else value:
+            result_dict[field] = value
+    if result.metadata:
+        result_dict.update(result.metadata)
+    return result_dict
+
+
+def encode_results(results: Iterable[SearchResult]) -> str:
+    """
+    Encode search results as a compact JSON list in one encoder call.
+
+    The SearchResult objects are passed to the encoder as they are; each
+    hit's output fields are produced by the encoder hook only while that hit
+    is being written.
+    """
+    return _dumps(results if isinstance(results, list) else list(results))
+
+
+def get_backend() -> str:
+    """Get the name of the JSON backend in use."""
+    return BACKEND
@@ -0,0 +1,20 @@
+"""
+Text tokenization shared by the lexical scorers (local BM25 index and web
+page chunk ranking).
+"""
+import re
+from typing import List
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens; CJK runs are split into character bigrams."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if len(token) > 1 and _CJK_PATTERN.search(token):
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+    return tokens
@@ -0,0 +1,243 @@
+"""
+Persistent cache of web search responses.
+
+Tavily responses are stored in SQLite keyed by the normalized query and the
+parameters that change the result set, so research repeated within and across
+sessions skips the external call. Fresher time ranges expire sooner.
+
+Methods are synchronous and thread-safe; async callers run them with
+asyncio.to_thread so SQLite I/O stays off the event loop.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .embedding_cache import normalize_embedding_text
+
+# Import project configuration
+try:
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from config.project_config import get_project_config
+except ImportError:
+    def get_project_config():
+        return None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_BY_TIME_RANGE = {
+    "day": 3600.0,
+    "week": 6 * 3600.0,
+    "month": 86400.0,
+    "year": 7 * 86400.0
+}
+
+
+class WebResultCache:
+    """SQLite-backed TTL cache of web search responses with LRU size bound."""
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        ttl_seconds: float = 7 * 86400.0,
+        ttl_by_time_range: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize the web result cache.
+
+        Args:
+            path: SQLite file holding cached responses
+            max_entries: Maximum cached responses before least recently used are evicted
+            ttl_seconds: Lifetime of responses without a time range
+            ttl_by_time_range: Lifetime per time_range ("day", "week", ...)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.ttl_by_time_range = dict(DEFAULT_TTL_BY_TIME_RANGE)
+        self.ttl_by_time_range.update(ttl_by_time_range or {})
+
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS web_results ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_web_results_accessed "
+                "ON web_results(accessed_at)")
+            self._db.commit()
+            logger.info(f"Web result cache enabled at {path}")
+        except Exception as e:
+            logger.warning(f"Failed to open web result cache, caching disabled: {e}")
+            self._db = None
+
+    @staticmethod
+    def make_key(
+        query: str,
+        topic: str = "general",
+        search_depth: str = "basic",
+        time_range: Optional[str] = None,
+        max_results: int = 10,
+        **flags: Any
+    ) -> str:
+        """
+        Build a cache key from the normalized query and result-shaping parameters.
+
+        Extra flags (e.g. include_raw_content) are part of the key because
+        they change the response payload.
+        """
+        parts = [
+            normalize_embedding_text(query).casefold(),
+            topic or "general",
+            search_depth or "basic",
+            time_range or "",
+            str(max_results)
+        ]
+        parts.extend(f"{name}={bool(value)}" for name, value in sorted(flags.items()))
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get_ttl(self, time_range: Optional[str]) -> float:
+        """Get the lifetime of a response for a time range."""
+        if not time_range:
+            return self.ttl_seconds
+        return self.ttl_by_time_range.get(time_range, self.ttl_seconds)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached response, or None on a miss."""
+        if self._db is None:
+            return None
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT response, expires_at FROM web_results WHERE key = ?",
+                    (key,)).fetchone()
+                if row is not None and row[1] > now:
+                    self._db.execute(
+                        "UPDATE web_results SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+                    self.hits += 1
+                    return json.loads(row[0])
+            except Exception as e:
+                logger.warning(f"Web result cache read failed: {e}")
+                return None
+            if row is not None:
+                self.expired += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: Dict[str, Any], time_range: Optional[str] = None) -> None:
+        """Store a response with the TTL for its time range."""
+        if self._db is None:
+            return
+        ttl = self.get_ttl(time_range)
+        if ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO web_results (key, response, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(response, ensure_ascii=False), now + ttl, now))
+                self._writes += 1
+                # Trim expired and least recently used rows every 64 writes
+                if self._writes % 64 == 0:
+                    self._trim(now)
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"Web result cache write failed: {e}")
+
+    def _trim(self, now: float) -> None:
+        """Delete expired rows and evict the least recently used overflow."""
+        self._db.execute("DELETE FROM web_results WHERE expires_at <= ?", (now,))
+        cursor = self._db.execute(
+            "DELETE FROM web_results WHERE key IN ("
+            "SELECT key FROM web_results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,))
+        self.evictions += max(0, cursor.rowcount)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate metrics for the cache."""
+        with self._lock:
+            entries = 0
+            if self._db is not None:
+                try:
+                    entries = self._db.execute(
+                        "SELECT COUNT(*) FROM web_results").fetchone()[0]
+                except Exception:
+                    pass
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self._db is not None,
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM web_results")
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the SQLite file."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# Global web result cache instance
+_web_result_cache = None
+
+
+def get_web_result_cache() -> Optional[WebResultCache]:
+    """Get the process-wide web result cache, or None when disabled."""
+    global _web_result_cache
+    if _web_result_cache is None:
+        settings = None
+        try:
+            project_config = get_project_config()
+            if project_config:
+                settings = project_config.search_config.web_cache
+        except Exception as e:
+            logger.warning(f"Could not load web result cache configuration: {e}")
+
+        if settings is not None and (not settings.enabled or not settings.path):
+            return None
+
+        if settings is not None:
+            _web_result_cache = WebResultCache(
+                path=settings.path,
+                max_entries=settings.max_entries,
+                ttl_seconds=settings.ttl_seconds,
+                ttl_by_time_range=settings.ttl_by_time_range
+            )
+        else:
+            _web_result_cache = WebResultCache(".cache/web_search.db")
+    return _web_result_cache
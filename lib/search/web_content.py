@@ -0,0 +1,368 @@
+"""
+Streaming page fetch and query-relevant chunking for web search results.
+
+Instead of passing whole raw pages into the model context, the top hits are
+fetched concurrently, their text is extracted incrementally while the body
+streams in, and only the chunks that best match the query are kept. Every
+chunk carries its source URL and character offset for provenance.
+
+Result URLs come from the open web, so fetches are restricted to http(s)
+hosts that resolve only to public addresses. Redirects are followed by hand,
+up to a limit, and every hop is checked the same way, so a page cannot
+bounce the fetcher to loopback, private or cloud metadata endpoints.
+"""
+import asyncio
+import ipaddress
+import logging
+import math
+import socket
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from .text import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text is never visible page content
+_SKIPPED_TAGS = frozenset(
+    {"script", "style", "noscript", "template", "svg", "head", "iframe"})
+_BLOCK_TAGS = frozenset(
+    {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6",
+     "section", "article", "blockquote", "pre", "table", "ul", "ol"})
+
+
+class _TextExtractor(HTMLParser):
+    """Incremental HTML to text converter fed one decoded piece at a time."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._pieces: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self._pieces.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK_TAGS:
+            self._pieces.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self._pieces.append(data)
+
+    def drain(self) -> str:
+        """Return the text extracted since the last call."""
+        text = "".join(self._pieces)
+        self._pieces.clear()
+        return text
+
+
+def _normalize_whitespace(text: str) -> str:
+    """Collapse runs of spaces while keeping paragraph breaks."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class _Chunker:
+    """Incremental splitter into overlapping chunks tagged with their character offset."""
+
+    def __init__(self, chunk_chars: int, chunk_overlap: int):
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = chunk_overlap
+        self._buffer = ""
+        # Offset of the buffer start in the extracted page text
+        self._base = 0
+
+    def feed(self, piece: str) -> List[Tuple[int, str]]:
+        """Add streamed text and return the chunks it completes."""
+        self._buffer += piece
+        chunks = []
+        # Keep one chunk of lookahead so cut points can prefer paragraph breaks
+        while len(self._buffer) >= self.chunk_chars * 2:
+            chunks.extend(self._cut())
+        return chunks
+
+    def finish(self) -> List[Tuple[int, str]]:
+        """Return the chunks left in the buffer at the end of the page."""
+        chunks = []
+        while len(self._buffer) > self.chunk_chars:
+            chunks.extend(self._cut())
+        chunks.extend(self._emit(self._base, self._buffer))
+        self._buffer = ""
+        return chunks
+
+    def _cut(self) -> List[Tuple[int, str]]:
+        cut = self._cut_point(self._buffer)
+        chunks = list(self._emit(self._base, self._buffer[:cut]))
+        keep_from = max(cut - self.chunk_overlap, 1)
+        # Start the overlap on a word boundary
+        space = self._buffer.find(" ", keep_from, cut)
+        if space != -1:
+            keep_from = space + 1
+        self._base += keep_from
+        self._buffer = self._buffer[keep_from:]
+        return chunks
+
+    def _cut_point(self, text: str) -> int:
+        """Find a chunk end near chunk_chars, preferring paragraph then sentence breaks."""
+        limit = min(self.chunk_chars, len(text))
+        floor = limit // 2
+        for separator in ("\n", ". ", " "):
+            position = text.rfind(separator, floor, limit)
+            if position != -1:
+                return position + len(separator)
+        return limit
+
+    @staticmethod
+    def _emit(offset: int, text: str) -> Iterable[Tuple[int, str]]:
+        normalized = _normalize_whitespace(text)
+        if normalized:
+            yield offset, normalized
+
+
+class WebContentPipeline:
+    """Concurrent page fetcher that returns query-relevant chunks with provenance."""
+
+    def __init__(
+        self,
+        max_pages: int = 5,
+        fetch_concurrency: int = 5,
+        fetch_timeout: float = 10.0,
+        max_page_chars: int = 200000,
+        chunk_chars: int = 1000,
+        chunk_overlap: int = 150,
+        max_chunks_per_page: int = 3,
+        max_redirects: int = 5,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            max_pages: Top results whose pages are fetched
+            fetch_concurrency: Pages fetched at the same time
+            fetch_timeout: Seconds allowed per page, including streaming the body
+            max_page_chars: Extracted characters read per page before the stream is closed
+            chunk_chars: Target chunk length in characters
+            chunk_overlap: Characters repeated between consecutive chunks
+            max_chunks_per_page: Relevant chunks kept per page
+            max_redirects: Redirects followed per page, each checked like the first URL
+            client: HTTP client for page fetches (a pooled one is created if None)
+        """
+        self.max_pages = max_pages
+        self.fetch_timeout = fetch_timeout
+        self.max_page_chars = max_page_chars
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = min(chunk_overlap, chunk_chars // 2)
+        self.max_chunks_per_page = max_chunks_per_page
+        self.max_redirects = max_redirects
+        self._semaphore = asyncio.Semaphore(fetch_concurrency)
+
+        # Separate from the Tavily client so API credentials never reach third-party sites
+        # Redirects are followed in _open so each hop's address is checked
+        self.client = client or httpx.AsyncClient(
+            follow_redirects=False,
+            timeout=httpx.Timeout(fetch_timeout),
+            limits=httpx.Limits(max_connections=fetch_concurrency * 2),
+            headers={"User-Agent": "deep-research-agent/1.0 (+content fetch)"}
+        )
+
+        self.pages_fetched = 0
+        self.fetch_failures = 0
+        self.blocked_urls = 0
+        self.chars_extracted = 0
+        self.chars_returned = 0
+
+    async def enrich(self, query: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Attach query-relevant chunks to the top web results.
+
+        Fetched pages replace any raw_content blob with a "chunks" list of
+        {"text", "score", "url", "offset"} entries, best first. Results whose
+        page cannot be fetched keep their snippet only.
+
+        Args:
+            query: The web search query
+            results: Formatted web results with "url" and optional "raw_content"
+
+        Returns:
+            The same results, enriched in place
+        """
+        targets = [result for result in results[:self.max_pages] if result.get("url")]
+        page_chunks = await asyncio.gather(
+            *(self._page_chunks(result) for result in targets),
+            return_exceptions=True)
+
+        corpus: List[Tuple[int, int, str]] = []
+        for page_index, chunks in enumerate(page_chunks):
+            if isinstance(chunks, BaseException):
+                self.fetch_failures += 1
+                logger.debug(f"Content fetch failed for {targets[page_index]['url']}: {chunks}")
+                continue
+            corpus.extend((page_index, offset, text) for offset, text in chunks)
+
+        scores = self._score_chunks(query, [text for _, _, text in corpus])
+        selected: Dict[int, List[Dict[str, Any]]] = {}
+        for (page_index, offset, text), score in sorted(
+                zip(corpus, scores), key=lambda item: -item[1]):
+            if score <= 0:
+                break
+            chunks = selected.setdefault(page_index, [])
+            if len(chunks) < self.max_chunks_per_page:
+                chunks.append({
+                    "text": text,
+                    "score": round(score, 4),
+                    "url": targets[page_index]["url"],
+                    "offset": offset
+                })
+                self.chars_returned += len(text)
+
+        for page_index, result in enumerate(targets):
+            result.pop("raw_content", None)
+            if page_index in selected:
+                result["chunks"] = selected[page_index]
+        return results
+
+    async def _page_chunks(self, result: Dict[str, Any]) -> List[Tuple[int, str]]:
+        """Chunk a result's raw content, fetching the page when none was returned."""
+        raw_content = result.get("raw_content")
+        if raw_content:
+            chunker = self._new_chunker()
+            return chunker.feed(raw_content) + chunker.finish()
+
+        async with self._semaphore:
+            return await asyncio.wait_for(
+                self._collect_chunks(result["url"]), timeout=self.fetch_timeout)
+
+    async def _collect_chunks(self, url: str) -> List[Tuple[int, str]]:
+        """Fetch a page and chunk its text while the body streams in."""
+        chunker = self._new_chunker()
+        chunks = []
+        async for piece in self._stream_text(url):
+            chunks.extend(chunker.feed(piece))
+        chunks.extend(chunker.finish())
+        self.pages_fetched += 1
+        return chunks
+
+    def _new_chunker(self) -> _Chunker:
+        return _Chunker(self.chunk_chars, self.chunk_overlap)
+
+    async def _check_url(self, url: str) -> None:
+        """Reject URLs that are not http(s) or whose host resolves to a non-public address."""
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            self.blocked_urls += 1
+            raise ValueError(f"Unsupported URL: {url}")
+        try:
+            addresses = [ipaddress.ip_address(parsed.hostname)]
+        except ValueError:
+            port = parsed.port or (443 if parsed.scheme == "https" else 80)
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                parsed.hostname, port, type=socket.SOCK_STREAM)
+            addresses = [ipaddress.ip_address(info[4][0].split("%", 1)[0]) for info in infos]
+        for address in addresses:
+            if getattr(address, "ipv4_mapped", None):
+                address = address.ipv4_mapped
+            if not address.is_global or address.is_multicast:
+                self.blocked_urls += 1
+                raise ValueError(f"Refusing to fetch {url}: {parsed.hostname} resolves to {address}")
+
+    async def _open(self, url: str) -> httpx.Response:
+        """Send a streaming GET, following redirects only to checked public hosts."""
+        for _ in range(self.max_redirects + 1):
+            await self._check_url(url)
+            request = self.client.build_request("GET", url)
+            response = await self.client.send(request, stream=True, follow_redirects=False)
+            if not response.is_redirect:
+                return response
+            location = response.headers.get("location")
+            await response.aclose()
+            if not location:
+                raise ValueError(f"Redirect without a location from {url}")
+            url = str(response.url.join(location))
+        raise ValueError(f"More than {self.max_redirects} redirects fetching {url}")
+
+    async def _stream_text(self, url: str) -> AsyncIterator[str]:
+        """Stream a page and yield its visible text as the body arrives."""
+        response = await self._open(url)
+        try:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "").lower()
+            is_html = "html" in content_type or not content_type
+            if not is_html and not content_type.startswith("text/"):
+                raise ValueError(f"Unsupported content type {content_type}")
+
+            parser = _TextExtractor() if is_html else None
+            extracted = 0
+            async for piece in response.aiter_text():
+                if parser is not None:
+                    parser.feed(piece)
+                    piece = parser.drain()
+                if piece:
+                    extracted += len(piece)
+                    yield piece
+                # Stop reading once enough text has been extracted
+                if extracted >= self.max_page_chars:
+                    break
+            if parser is not None:
+                parser.close()
+                tail = parser.drain()
+                if tail and extracted < self.max_page_chars:
+                    yield tail
+            self.chars_extracted += extracted
+        finally:
+            await response.aclose()
+
+    @staticmethod
+    def _score_chunks(query: str, chunks: List[str], k1: float = 1.2, b: float = 0.75) -> List[float]:
+        """BM25 score of each chunk against the query, using the chunks as the corpus."""
+        if not chunks:
+            return []
+        query_terms = set(tokenize(query))
+        chunk_terms = [Counter(tokenize(chunk)) for chunk in chunks]
+        lengths = [sum(terms.values()) for terms in chunk_terms]
+        average_length = (sum(lengths) / len(lengths)) or 1.0
+
+        total = len(chunks)
+        idf = {}
+        for term in query_terms:
+            frequency = sum(1 for terms in chunk_terms if term in terms)
+            idf[term] = math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+
+        scores = []
+        for terms, length in zip(chunk_terms, lengths):
+            score = 0.0
+            for term in query_terms:
+                tf = terms.get(term)
+                if tf:
+                    score += idf[term] * tf * (k1 + 1) / (
+                        tf + k1 * (1 - b + b * length / average_length))
+            scores.append(score)
+        return scores
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get fetch and context-reduction counters."""
+        return {
+            "pages_fetched": self.pages_fetched,
+            "fetch_failures": self.fetch_failures,
+            "blocked_urls": self.blocked_urls,
+            "chars_extracted": self.chars_extracted,
+            "chars_returned": self.chars_returned,
+            "reduction": (
+                1 - self.chars_returned / self.chars_extracted
+                if self.chars_extracted else 0.0)
+        }
+
+    async def close(self) -> None:
+        """Close the page fetch client."""
+        await self.client.aclose()
+
@@ -52,6 +52,7 @@ from lib.memory import (MemoryPlugin, MemoryManager, SharedMemoryPluginSK,
                         create_azure_openai_text_embedding)
 from lib.prompts.agents.final_answer import FINAL_ANSWER_PROMPT
 from lib.prompts.agents.manager import MANAGER_PROMPT
+from lib.search import close_search_managers
 from lib.util import dbg, get_azure_openai_service
 
 # Configure logging with UTF-8 encoding to support emojis and colors
@@ -268,6 +269,10 @@ class DeepResearchAgent:
             if self.runtime:
                 await self.runtime.stop_when_idle()
                 logger.info("Runtime stopped successfully")
+
+            # Close pooled search connections only after agents are idle
+            await close_search_managers()
+            logger.info("Search connections closed")
         except Exception as e:
             logger.warning(f"Error during cleanup: {e}")
 
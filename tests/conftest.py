@@ -0,0 +1,5 @@
+"""Shared pytest setup: make the repository root importable."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -0,0 +1,259 @@
+"""Tests for AzureSearchProvider query building and fallbacks, against fake search clients."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from azure.core.exceptions import HttpResponseError
+from azure.search.documents.models import VectorizableTextQuery
+
+from lib.search.base import DocumentType, EmbeddingProvider, SearchQuery
+from lib.search.capabilities import IndexCapabilities
+from lib.search.providers import azure_search
+from lib.search.providers.azure_search import AzureSearchProvider
+
+DOC_TYPE = "category_a_documents"
+
+
+class StubEmbeddingProvider(EmbeddingProvider):
+    """Constant embeddings, counting calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_embedding(self, text):
+        self.calls += 1
+        return [0.1] * 8
+
+    async def generate_embeddings(self, texts):
+        return [await self.generate_embedding(text) for text in texts]
+
+    async def close(self):
+        pass
+
+
+class FakePager:
+    def __init__(self, hits):
+        self.hits = hits
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for hit in self.hits:
+            yield hit
+
+
+class FakeSearchClient:
+    """SearchClient stand-in that honors select and can reject parameters."""
+
+    def __init__(self, index_name, hits, reject=None):
+        self._index_name = index_name
+        self.hits = hits
+        self.schema = set().union(*(hit.keys() for hit in hits))
+        # Called with the params of each request; may raise to simulate service errors
+        self.reject = reject
+        self.requests = []
+
+    async def search(self, raw_response_hook=None, **params):
+        self.requests.append(dict(params))
+        if self.reject is not None:
+            self.reject(params)
+        select = params.get("select")
+        if select is not None:
+            missing = [name for name in select if name not in self.schema]
+            if missing:
+                raise http_error(400, f"Invalid expression: Could not find a property named "
+                                      f"'{missing[0]}' on type 'search.document'. Parameter name: $select")
+        hits = self.hits[:params.get("top", 50)]
+        if select is not None:
+            hits = [{name: value for name, value in hit.items()
+                     if name in select or name.startswith("@")} for hit in hits]
+        return FakePager(hits)
+
+    async def close(self):
+        pass
+
+
+def http_error(status, message):
+    error = HttpResponseError(message=message)
+    error.status_code = status
+    return error
+
+
+def make_hit(i, text_id=None, image_id=None):
+    hit = {
+        "chunk_id": f"c{i}",
+        "title": f"Title {i}",
+        "chunk": f"passage {i} about quota",
+        "content_embedding": [0.0] * 8,
+        "@search.score": 1.0 / (i + 1),
+    }
+    if text_id:
+        hit["text_document_id"] = text_id
+    if image_id:
+        hit["image_document_id"] = image_id
+    return hit
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """AzureSearchProvider without network access; clients are replaced per test."""
+    monkeypatch.setattr(
+        azure_search, "create_azure_embedding_provider", lambda config: StubEmbeddingProvider())
+    config = SimpleNamespace(
+        azure_search_endpoint="https://example.search.windows.net",
+        azure_search_api_key="key",
+        azure_embedding_deployment="embedding")
+    provider = AzureSearchProvider(config)
+    yield provider
+    asyncio.run(provider.close())
+
+
+def use_client(provider, monkeypatch, client, capabilities=None):
+    doc_type = DocumentType.resolve(DOC_TYPE)
+    monkeypatch.setitem(provider.search_clients, doc_type, client)
+
+    async def get_capabilities(_client):
+        return capabilities
+
+    monkeypatch.setattr(provider, "_get_capabilities", get_capabilities)
+    return doc_type
+
+
+MULTIMODAL_HITS = [
+    make_hit(0, text_id="t0"),
+    make_hit(1, image_id="i1"),
+    make_hit(2, text_id="t2", image_id="i2"),
+    make_hit(3, text_id="t3"),
+]
+
+
+def test_select_list_always_includes_multimodal_ids(provider):
+    select = provider.select_fields_map[DocumentType.resolve(DOC_TYPE)]
+
+    assert select[:3] == ["chunk_id", "title", "chunk"]
+    assert "text_document_id" in select and "image_document_id" in select
+    assert "content_embedding" not in select
+
+
+def test_lean_multimodal_search_filters_by_content_type(provider, monkeypatch):
+    assert provider.project_config.search_config.lean_query.enabled
+    client = FakeSearchClient("index-a", MULTIMODAL_HITS)
+    doc_type = use_client(provider, monkeypatch, client)
+    query = SearchQuery(text="quota", top_k=4, use_hybrid_search=False)
+
+    images = asyncio.run(provider.search_multimodal(query, doc_type, True, False))
+    text = asyncio.run(provider.search_multimodal(query, doc_type, False, True))
+
+    assert all("select" in request for request in client.requests)
+    assert "text_document_id" in client.requests[0]["select"]
+    assert [result.metadata["content_type"] for result in images] == ["image", "mixed"]
+    assert [result.metadata["content_type"] for result in text] == ["text", "mixed", "text"]
+
+
+def test_index_without_multimodal_ids_falls_back_to_all_fields(provider, monkeypatch):
+    hits = [make_hit(i) for i in range(2)]
+    client = FakeSearchClient("index-a", hits)
+    doc_type = use_client(provider, monkeypatch, client)
+    query = SearchQuery(text="quota", top_k=2, use_hybrid_search=False)
+
+    first = asyncio.run(provider.search(query, doc_type))
+    second = asyncio.run(provider.search(query, doc_type))
+
+    assert len(first) == len(second) == 2
+    # Rejected once, then queried unprojected
+    assert ["select" in request for request in client.requests] == [True, False, False]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for capability expiry."""
+    now = [1000.0]
+    monkeypatch.setattr("lib.search.capabilities.time.monotonic", lambda: now[0])
+    return now
+
+
+def known_capabilities(provider, doc_type, index_name):
+    """Capabilities of an index with the configured semantic config and a vectorizer."""
+    capabilities = IndexCapabilities(
+        index_name=index_name,
+        semantic_configs=[provider.semantic_config_map[doc_type]],
+        vector_fields={provider.vector_field_map[doc_type]: "openai"},
+        vectorizer_kinds={"openai": "azureOpenAI"},
+        fetched_at=1000.0)
+    provider.capabilities._capabilities[index_name] = capabilities
+    return capabilities
+
+
+def reject_semantic(status=400):
+    def reject(params):
+        if params.get("query_type") == "semantic":
+            raise http_error(status, f"Semantic configuration '{params['semantic_configuration_name']}' "
+                                     f"is not defined for this index")
+    return reject
+
+
+def hybrid_query():
+    return SearchQuery(text="quota", top_k=2, use_hybrid_search=True, use_semantic_search=True)
+
+
+def test_rejected_semantic_configuration_is_skipped_for_its_ttl(provider, monkeypatch, clock):
+    client = FakeSearchClient("index-a", [make_hit(0, "t0", "i0"), make_hit(1, "t1", "i1")],
+                              reject=reject_semantic())
+    doc_type = DocumentType.resolve(DOC_TYPE)
+    use_client(provider, monkeypatch, client,
+               known_capabilities(provider, doc_type, "index-a"))
+    ttl = provider.capabilities.semantic_failure_ttl
+
+    def query_types():
+        client.requests.clear()
+        assert len(asyncio.run(provider.search(hybrid_query(), doc_type))) == 2
+        return [request["query_type"] for request in client.requests]
+
+    # Rejected once, then retried as a simple query
+    assert query_types() == ["semantic", "simple"]
+    # No failing semantic round trip while the failure is cached
+    assert query_types() == ["simple"]
+    clock[0] += ttl - 1
+    assert query_types() == ["simple"]
+    clock[0] += 2
+    assert query_types() == ["semantic", "simple"]
+
+
+def test_transient_semantic_error_is_not_cached(provider, monkeypatch, clock):
+    client = FakeSearchClient("index-a", [make_hit(0, "t0", "i0")], reject=reject_semantic(status=503))
+    doc_type = DocumentType.resolve(DOC_TYPE)
+    use_client(provider, monkeypatch, client,
+               known_capabilities(provider, doc_type, "index-a"))
+
+    asyncio.run(provider.search(hybrid_query(), doc_type))
+    asyncio.run(provider.search(hybrid_query(), doc_type))
+
+    assert [request["query_type"] for request in client.requests] == [
+        "semantic", "simple", "semantic", "simple"]
+
+
+def test_failing_vectorizer_is_skipped_for_its_ttl(provider, monkeypatch, clock):
+    monkeypatch.setattr(provider.project_config.search_config.vectorization, "enabled", True)
+
+    def reject(params):
+        if any(isinstance(vq, VectorizableTextQuery) for vq in params.get("vector_queries", [])):
+            raise http_error(400, "Could not vectorize the query: vectorizer 'openai' failed")
+
+    client = FakeSearchClient("index-a", [make_hit(0, "t0", "i0")], reject=reject)
+    doc_type = DocumentType.resolve(DOC_TYPE)
+    use_client(provider, monkeypatch, client,
+               known_capabilities(provider, doc_type, "index-a"))
+    ttl = provider.capabilities.vectorizer_failure_ttl
+    query = SearchQuery(text="quota", top_k=2, use_hybrid_search=True, use_semantic_search=False)
+
+    def vector_kinds():
+        client.requests.clear()
+        assert len(asyncio.run(provider.search(query, doc_type))) == 1
+        return [type(request["vector_queries"][0]).__name__ for request in client.requests]
+
+    # Server vectorization fails once and is retried with a client-side embedding
+    assert vector_kinds() == ["VectorizableTextQuery", "VectorizedQuery"]
+    assert vector_kinds() == ["VectorizedQuery"]
+    clock[0] += ttl + 1
+    assert vector_kinds() == ["VectorizableTextQuery", "VectorizedQuery"]
@@ -0,0 +1,127 @@
+"""Tests for index capability probing and negative caching."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from azure.core.exceptions import HttpResponseError
+
+from lib.search.capabilities import IndexCapabilityCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the capabilities module."""
+    now = [1000.0]
+    monkeypatch.setattr("lib.search.capabilities.time.monotonic", lambda: now[0])
+    return now
+
+
+def make_index(name="index-a"):
+    """Minimal SearchIndex stand-in with one semantic config and a vectorized field."""
+    return SimpleNamespace(
+        name=name,
+        fields=[
+            SimpleNamespace(name="chunk", type="Edm.String", filterable=False, fields=None,
+                            vector_search_profile_name=None),
+            SimpleNamespace(name="text_document_id", type="Edm.String", filterable=True,
+                            fields=None, vector_search_profile_name=None),
+            SimpleNamespace(name="content_embedding", type="Collection(Edm.Single)",
+                            filterable=False, fields=None, vector_search_profile_name="profile"),
+        ],
+        vector_search=SimpleNamespace(
+            vectorizers=[SimpleNamespace(vectorizer_name="openai", kind="azureOpenAI")],
+            profiles=[SimpleNamespace(name="profile", vectorizer_name="openai")]),
+        semantic_search=SimpleNamespace(configurations=[SimpleNamespace(name="semantic-a")]))
+
+
+def http_error(status):
+    error = HttpResponseError(message=f"HTTP {status}")
+    error.status_code = status
+    return error
+
+
+class SchemaReader:
+    """get_index stand-in counting reads; raises the queued errors first."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self, name):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.errors:
+            raise self.errors.pop(0)
+        return make_index(name)
+
+
+def test_schema_is_read_once_and_refreshed(clock):
+    reader = SchemaReader()
+    cache = IndexCapabilityCache(reader, refresh_seconds=3600)
+
+    capabilities = asyncio.run(cache.get("index-a"))
+    asyncio.run(cache.get("index-a"))
+
+    assert reader.calls == 1
+    assert capabilities.semantic_configs == ["semantic-a"]
+    assert capabilities.vectorizer_for("content_embedding") == "openai"
+    assert capabilities.is_filterable("text_document_id")
+    clock[0] += 3601
+    asyncio.run(cache.get("index-a"))
+    assert reader.calls == 2
+
+
+def test_failed_probe_is_retried_after_its_ttl(clock):
+    reader = SchemaReader(http_error(503))
+    cache = IndexCapabilityCache(reader, probe_failure_ttl=60)
+
+    assert asyncio.run(cache.get("index-a")) is None
+    clock[0] += 59
+    assert asyncio.run(cache.get("index-a")) is None
+    assert reader.calls == 1
+    clock[0] += 2
+    assert asyncio.run(cache.get("index-a")) is not None
+    assert reader.calls == 2
+
+
+def test_permission_denied_is_probed_once_for_concurrent_callers(clock):
+    reader = SchemaReader(http_error(403))
+    cache = IndexCapabilityCache(reader, probe_failure_ttl=60)
+
+    async def run():
+        return await asyncio.gather(*(cache.get("index-a") for _ in range(10)))
+
+    assert asyncio.run(run()) == [None] * 10
+    clock[0] += 10 ** 6
+    assert asyncio.run(cache.get("index-a")) is None
+    assert reader.calls == 1
+    assert cache.get_stats()["permission_denied"] == ["index-a"]
+
+
+def test_semantic_failure_is_skipped_for_its_ttl(clock):
+    cache = IndexCapabilityCache(SchemaReader(), semantic_failure_ttl=900)
+    asyncio.run(cache.get("index-a"))
+
+    assert cache.semantic_available("index-a", "semantic-a")
+    assert not cache.semantic_available("index-a", "not-configured")
+
+    cache.mark_semantic_failure("index-a", "semantic-a")
+    assert not cache.semantic_available("index-a", "semantic-a")
+    clock[0] += 899
+    assert not cache.semantic_available("index-a", "semantic-a")
+    clock[0] += 2
+    assert cache.semantic_available("index-a", "semantic-a")
+
+
+def test_vectorizer_failure_is_skipped_for_its_ttl(clock):
+    cache = IndexCapabilityCache(SchemaReader(), vectorizer_failure_ttl=900)
+    asyncio.run(cache.get("index-a"))
+
+    assert cache.vectorizer_available("index-a", "content_embedding")
+    assert not cache.vectorizer_available("index-a", "other_embedding")
+
+    cache.mark_vectorizer_failure("index-a")
+    assert not cache.vectorizer_available("index-a", "content_embedding")
+    assert cache.get_stats()["vectorizer_failures"] == ["index-a"]
+    clock[0] += 901
+    assert cache.vectorizer_available("index-a", "content_embedding")
@@ -0,0 +1,98 @@
+"""Tests for exact and near-duplicate collapsing."""
+from lib.search.base import SearchResult
+from lib.search.dedup import (NearDuplicateDetector, collapse_duplicate_web_results,
+                              collapse_duplicates, collapse_provider_duplicates,
+                              estimate_tokens)
+
+PASSAGE = (
+    "The liquidity coverage ratio requires banks to hold enough high quality "
+    "liquid assets to cover net cash outflows over a thirty day stress period, "
+    "and supervisors review the ratio every quarter alongside the leverage buffer.")
+REWORDED = PASSAGE.replace("leverage buffer", "leverage buffers")
+UNRELATED = (
+    "Deployment endpoints are created per region and each model deployment "
+    "has its own quota of tokens per minute for evaluation workloads.")
+
+
+def make_result(text, score, search_type="guides", title=None):
+    return SearchResult(
+        content_text=text, search_type=search_type, search_mode="hybrid",
+        document_title=title, score=score)
+
+
+def test_cluster_counts_exact_and_near_duplicates():
+    detector = NearDuplicateDetector(similarity_threshold=0.8)
+
+    clusters, exact, near = detector.cluster(
+        [PASSAGE, UNRELATED, PASSAGE.upper(), REWORDED])
+
+    assert clusters[0] == clusters[2] == clusters[3]
+    assert clusters[1] != clusters[0]
+    assert (exact, near) == (1, 1)
+
+
+def test_collapse_keeps_best_score_at_first_rank():
+    detector = NearDuplicateDetector()
+    results = [
+        make_result(PASSAGE, 0.5, title="Copy A"),
+        make_result(UNRELATED, 0.4),
+        make_result(REWORDED, 0.9, title="Copy B"),
+    ]
+
+    collapsed, report = collapse_duplicates(results, detector)
+
+    assert [result.document_title for result in collapsed] == ["Copy B", None]
+    best = collapsed[0]
+    assert best.metadata["duplicate_count"] == 1
+    assert best.metadata["merged_sources"][0]["document_title"] == "Copy A"
+    assert best.metadata["merged_sources"][0]["score"] == 0.5
+    assert results[2].metadata is None  # Inputs are not modified
+    assert report["input"] == 3 and report["output"] == 2
+    assert report["near_duplicates"] == 1
+    assert report["tokens_saved"] == estimate_tokens(PASSAGE)
+
+
+def test_fused_score_outranks_raw_score():
+    first = make_result(PASSAGE, 10.0, title="raw")
+    second = make_result(PASSAGE, 0.1, title="fused")
+    first.metadata = {"fused_score": 0.2}
+    second.metadata = {"fused_score": 0.9}
+
+    collapsed, _ = collapse_duplicates([first, second], NearDuplicateDetector())
+
+    assert [result.document_title for result in collapsed] == ["fused"]
+
+
+def test_distinct_results_are_kept():
+    results = [make_result(PASSAGE, 0.5), make_result(UNRELATED, 0.4)]
+
+    collapsed, report = collapse_duplicates(results, NearDuplicateDetector())
+
+    assert collapsed == results
+    assert report["dedup_ratio"] == 0.0
+
+
+def test_provider_duplicates_stay_under_their_provider():
+    detector = NearDuplicateDetector()
+
+    collapsed, report = collapse_provider_duplicates({
+        "azure": [make_result(PASSAGE, 0.3)],
+        "local": [make_result(PASSAGE, 0.8), make_result(UNRELATED, 0.2)],
+    }, detector)
+
+    assert collapsed["azure"] == []
+    assert [result.score for result in collapsed["local"]] == [0.8, 0.2]
+    assert report["exact_duplicates"] == 1
+
+
+def test_web_results_merge_urls():
+    results = [
+        {"url": "https://a.example/page", "content": PASSAGE, "score": 0.4},
+        {"url": "https://b.example/mirror", "content": PASSAGE, "score": 0.7},
+    ]
+
+    collapsed, _ = collapse_duplicate_web_results(results, NearDuplicateDetector())
+
+    assert len(collapsed) == 1
+    assert collapsed[0]["url"] == "https://b.example/mirror"
+    assert collapsed[0]["merged_sources"] == ["https://a.example/page"]
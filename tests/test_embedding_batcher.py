@@ -0,0 +1,85 @@
+"""Tests for the embedding request coalescer."""
+import asyncio
+
+import pytest
+
+from lib.search.embedding_batcher import EmbeddingBatcher
+
+
+class RecordingBatchFunction:
+    """Batch embedding call recording each batch it receives."""
+
+    def __init__(self, fail: bool = False, delay: float = 0.0):
+        self.batches = []
+        self.fail = fail
+        self.delay = delay
+
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("embedding endpoint unavailable")
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_requests_share_one_batch():
+    batch_fn = RecordingBatchFunction()
+
+    async def run():
+        batcher = EmbeddingBatcher(batch_fn, max_batch_size=16, max_wait_ms=20)
+        vectors = await asyncio.gather(
+            batcher.embed("a"), batcher.embed("bb"), batcher.embed("a"), batcher.embed("ccc"))
+        return vectors, batcher.get_stats()
+
+    vectors, stats = asyncio.run(run())
+
+    assert vectors == [[1.0], [2.0], [1.0], [3.0]]
+    # Identical texts are sent once
+    assert batch_fn.batches == [["a", "bb", "ccc"]]
+    assert stats["requests"] == 4
+    assert stats["batches"] == 1
+    assert stats["requests_saved"] == 3
+
+
+def test_full_batch_is_sent_without_waiting():
+    batch_fn = RecordingBatchFunction()
+
+    async def run():
+        batcher = EmbeddingBatcher(batch_fn, max_batch_size=2, max_wait_ms=10_000)
+        return await asyncio.wait_for(
+            batcher.embed_many(["a", "b", "c", "d"]), timeout=1.0)
+
+    assert asyncio.run(run()) == [[1.0]] * 4
+    assert batch_fn.batches == [["a", "b"], ["c", "d"]]
+
+
+def test_batch_failure_reaches_every_caller():
+    batch_fn = RecordingBatchFunction(fail=True)
+
+    async def run():
+        batcher = EmbeddingBatcher(batch_fn, max_wait_ms=1)
+        return await asyncio.gather(
+            batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    errors = asyncio.run(run())
+
+    assert len(batch_fn.batches) == 1
+    assert all(isinstance(error, ConnectionError) for error in errors)
+
+
+def test_close_sends_queued_requests_and_refuses_new_ones():
+    batch_fn = RecordingBatchFunction(delay=0.01)
+
+    async def run():
+        batcher = EmbeddingBatcher(batch_fn, max_wait_ms=10_000)
+        pending = asyncio.ensure_future(batcher.embed("queued"))
+        await asyncio.sleep(0)
+        await batcher.close()
+        assert pending.done()
+        with pytest.raises(RuntimeError):
+            await batcher.embed("late")
+        return pending.result()
+
+    assert asyncio.run(run()) == [6.0]
+    assert batch_fn.batches == [["queued"]]
@@ -0,0 +1,131 @@
+"""Tests for the tiered query-embedding cache."""
+import asyncio
+import threading
+
+import pytest
+
+from lib.search.base import EmbeddingProvider
+from lib.search.embedding_cache import CachedEmbeddingProvider, EmbeddingCache
+
+
+class CountingProvider(EmbeddingProvider):
+    """Embedding provider returning the text length, counting requested texts."""
+
+    def __init__(self):
+        self.texts = []
+
+    async def generate_embedding(self, text):
+        self.texts.append(text)
+        return [float(len(text)), 1.0]
+
+    async def generate_embeddings(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    async def close(self):
+        pass
+
+
+def test_normalized_texts_share_an_entry():
+    cache = EmbeddingCache()
+    cache.put("deployment", "capital  ratio\n", [0.5, 0.25])
+
+    assert cache.get("deployment", " capital ratio") == [0.5, 0.25]
+    assert cache.get("other-deployment", "capital ratio") is None
+    assert cache.get_stats()["memory_hits"] == 1
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("d", "a", [1.0])
+    cache.put("d", "b", [2.0])
+    assert cache.get("d", "a") == [1.0]  # "b" is now least recently used
+    cache.put("d", "c", [3.0])
+
+    assert cache.get("d", "b") is None
+    assert cache.get("d", "a") == [1.0]
+    assert cache.get("d", "c") == [3.0]
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_expired_entries_miss(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("lib.search.embedding_cache.time.time", lambda: now[0])
+    cache = EmbeddingCache(ttl_seconds=10)
+    cache.put("d", "query", [1.0])
+
+    now[0] += 9
+    assert cache.get("d", "query") == [1.0]
+    now[0] += 2
+    assert cache.get("d", "query") is None
+
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache(disk_path=path)
+    cache.put("d", "query", [0.5, -1.5])
+    cache.close()
+
+    reopened = EmbeddingCache(disk_path=path)
+    assert reopened.get("d", "query") == pytest.approx([0.5, -1.5])
+    assert reopened.get_stats()["disk_hits"] == 1
+    # Promoted to memory on the disk hit
+    assert reopened.get("d", "query") == pytest.approx([0.5, -1.5])
+    assert reopened.get_stats()["memory_hits"] == 1
+    reopened.close()
+
+
+def test_cached_provider_generates_only_missing_texts():
+    provider = CountingProvider()
+    cached = CachedEmbeddingProvider(provider, EmbeddingCache(), "d")
+
+    async def run():
+        first = await cached.generate_embedding("abc")
+        batch = await cached.generate_embeddings(["abc", "de", "abc "])
+        return first, batch
+
+    first, batch = asyncio.run(run())
+
+    assert first == [3.0, 1.0]
+    assert batch == [[3.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+    assert provider.texts == ["abc", "de"]
+
+
+def test_cached_provider_reads_and_writes_disk_off_the_event_loop(tmp_path, monkeypatch):
+    path = str(tmp_path / "embeddings.db")
+    seeded = EmbeddingCache(disk_path=path)
+    seeded.put("d", "abc", [3.0, 1.0])
+    seeded.close()
+
+    cache = EmbeddingCache(disk_path=path)
+    disk_threads = []
+    for name in ("_disk_get", "_disk_put"):
+        original = getattr(cache, name)
+
+        def record(*args, _original=original):
+            disk_threads.append(threading.get_ident())
+            return _original(*args)
+
+        monkeypatch.setattr(cache, name, record)
+    provider = CountingProvider()
+    cached = CachedEmbeddingProvider(provider, cache, "d")
+
+    async def run():
+        loop_thread = threading.get_ident()
+        batch = await cached.generate_embeddings(["abc", "de"])
+        # Both texts are in memory now; no further disk access
+        again = await cached.generate_embedding("de")
+        return loop_thread, batch, again
+
+    loop_thread, batch, again = asyncio.run(run())
+    cache.close()
+
+    assert batch == [[3.0, 1.0], [2.0, 1.0]]
+    assert again == [2.0, 1.0]
+    assert provider.texts == ["de"]
+    # Two disk reads and the write of the generated embedding
+    assert len(disk_threads) == 3
+    assert loop_thread not in disk_threads
+    assert cache.get_stats()["disk_hits"] == 1
+    assert cache.get_stats()["memory_hits"] == 1
@@ -0,0 +1,88 @@
+"""Tests for cross-index rank fusion."""
+import pytest
+
+from lib.search.base import SearchResult
+from lib.search.fusion import fuse_results
+
+
+def make_result(text, score=None, reranker_score=None):
+    return SearchResult(
+        content_text=text, search_type="test", search_mode="hybrid",
+        score=score, reranker_score=reranker_score)
+
+
+def texts(results):
+    return [result.content_text for result in results]
+
+
+def test_rrf_interleaves_by_rank_not_raw_score():
+    # Index "b" uses a far larger score scale than index "a"
+    a = [make_result("a1", 0.9), make_result("a2", 0.8), make_result("a3", 0.7)]
+    b = [make_result("b1", 40.0), make_result("b2", 30.0)]
+
+    fused = fuse_results([a, b], method="rrf", rrf_k=60)
+
+    # Equal ranks tie; the stable sort keeps list order between them
+    assert texts(fused) == ["a1", "b1", "a2", "b2", "a3"]
+    assert fused[0].metadata["fused_score"] == pytest.approx(1 / 61)
+    assert fused[-1].metadata["fused_score"] == pytest.approx(1 / 63)
+    assert {result.metadata["fusion_method"] for result in fused} == {"rrf"}
+
+
+def test_minmax_normalizes_each_list_separately():
+    a = [make_result("a1", 10.0), make_result("a2", 5.0), make_result("a3", 0.0)]
+    b = [make_result("b1", 0.04), make_result("b2", 0.01)]
+
+    fused = fuse_results([a, b], method="minmax")
+    scores = {result.content_text: result.metadata["fused_score"] for result in fused}
+
+    assert scores == pytest.approx({"a1": 1.0, "a2": 0.5, "a3": 0.0, "b1": 1.0, "b2": 0.0})
+    assert texts(fused)[:2] == ["a1", "b1"]
+
+
+def test_minmax_single_hit_list_scores_one():
+    fused = fuse_results([[make_result("only", 3.0)]], method="minmax")
+    assert fused[0].metadata["fused_score"] == 1.0
+
+
+def test_zscore_standardizes_each_list():
+    a = [make_result("a1", 3.0), make_result("a2", 1.0)]
+    b = [make_result("b1", 100.0), make_result("b2", 100.0)]
+
+    fused = fuse_results([a, b], method="zscore")
+    scores = {result.content_text: result.metadata["fused_score"] for result in fused}
+
+    assert scores == pytest.approx({"a1": 1.0, "a2": -1.0, "b1": 0.0, "b2": 0.0})
+    assert texts(fused) == ["a1", "b1", "b2", "a2"]
+
+
+def test_reranker_scores_are_used_when_every_hit_has_one():
+    a = [make_result("a1", 0.9, reranker_score=2.0)]
+    b = [make_result("b1", 0.1, reranker_score=3.0)]
+
+    fused = fuse_results([a, b], method="rrf")
+
+    assert texts(fused) == ["b1", "a1"]
+    assert fused[0].metadata["fusion_method"] == "reranker"
+    assert fused[0].metadata["fused_score"] == pytest.approx(0.75)
+
+
+def test_partial_reranker_scores_fall_back_to_method():
+    a = [make_result("a1", 0.9, reranker_score=2.0)]
+    b = [make_result("b1", 0.1)]
+
+    fused = fuse_results([a, b], method="rrf")
+
+    assert {result.metadata["fusion_method"] for result in fused} == {"rrf"}
+
+
+def test_top_k_and_empty_lists():
+    a = [make_result(f"a{i}", 1.0 - i / 10) for i in range(5)]
+
+    assert len(fuse_results([a, []], top_k=2)) == 2
+    assert fuse_results([[], []]) == []
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError):
+        fuse_results([[make_result("a", 1.0)]], method="borda")
@@ -0,0 +1,207 @@
+"""Tests for backend health tracking and circuit breakers."""
+import asyncio
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ServiceRequestError
+
+from lib.search.health import (CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN,
+                               CircuitOpenError, HealthTracker,
+                               is_backend_failure)
+from lib.search.rate_limit import RateLimitedError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the health module."""
+    now = [100.0]
+    monkeypatch.setattr("lib.search.health.time.monotonic", lambda: now[0])
+    return now
+
+
+def succeed(latency, clock):
+    async def request():
+        clock[0] += latency
+        return "ok"
+    return request
+
+
+def fail(clock):
+    async def request():
+        clock[0] += 0.01
+        raise ConnectionError("backend down")
+    return request
+
+
+def call(tracker, request):
+    return asyncio.run(tracker.call("azure", "index", request))
+
+
+def test_latency_and_error_rate_are_ewmas(clock):
+    tracker = HealthTracker(ewma_alpha=0.5, failure_threshold=10)
+
+    call(tracker, succeed(1.0, clock))
+    call(tracker, succeed(3.0, clock))
+    with pytest.raises(ConnectionError):
+        call(tracker, fail(clock))
+
+    health = tracker.get("azure", "index")
+    # 1.0 -> 0.5 * 3.0 + 0.5 * 1.0 = 2.0 -> 0.5 * 0.01 + 0.5 * 2.0
+    assert health.ewma_latency == pytest.approx(1.005)
+    assert health.error_rate == pytest.approx(0.5)
+    assert tracker.score("azure", "index") == pytest.approx(1.005 * (1 + 4.0 * 0.5))
+
+
+def test_unseen_backend_scores_zero():
+    assert HealthTracker().score("azure", "new-index") == 0.0
+
+
+def test_consecutive_failures_open_the_circuit(clock):
+    tracker = HealthTracker(failure_threshold=3, open_seconds=30)
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            call(tracker, fail(clock))
+
+    assert tracker.get("azure", "index").state == CIRCUIT_OPEN
+    assert tracker.score("azure", "index") == float("inf")
+    with pytest.raises(CircuitOpenError):
+        call(tracker, succeed(0.1, clock))
+    assert tracker.get("azure", "index").rejected == 1
+
+
+def test_high_error_rate_opens_the_circuit(clock):
+    tracker = HealthTracker(
+        ewma_alpha=0.5, failure_threshold=100, error_rate_threshold=0.5, min_requests=4)
+
+    for request in (succeed(0.1, clock), succeed(0.1, clock)):
+        call(tracker, request)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            call(tracker, fail(clock))
+
+    assert tracker.get("azure", "index").state == CIRCUIT_OPEN
+
+
+def open_circuit(tracker, clock):
+    for _ in range(tracker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            call(tracker, fail(clock))
+
+
+def test_half_open_admits_a_single_probe(clock):
+    tracker = HealthTracker(failure_threshold=1, open_seconds=30)
+    open_circuit(tracker, clock)
+    clock[0] += 31
+
+    assert not tracker.is_open("azure", "index")
+
+    async def run():
+        release = asyncio.Event()
+
+        async def probe():
+            await release.wait()
+            return "ok"
+
+        first = asyncio.ensure_future(tracker.call("azure", "index", probe))
+        await asyncio.sleep(0)
+        assert tracker.get("azure", "index").state == CIRCUIT_HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            await tracker.call("azure", "index", succeed(0.1, clock))
+        release.set()
+        return await first
+
+    assert asyncio.run(run()) == "ok"
+    assert tracker.get("azure", "index").state == CIRCUIT_CLOSED
+    assert tracker.get("azure", "index").error_rate == 0.0
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    tracker = HealthTracker(failure_threshold=3, open_seconds=30)
+    open_circuit(tracker, clock)
+    clock[0] += 31
+
+    with pytest.raises(ConnectionError):
+        call(tracker, fail(clock))
+
+    health = tracker.get("azure", "index")
+    assert health.state == CIRCUIT_OPEN
+    assert health.opened_at == clock[0]
+    with pytest.raises(CircuitOpenError):
+        call(tracker, succeed(0.1, clock))
+
+
+def test_cancellation_is_not_a_failure(clock):
+    tracker = HealthTracker(failure_threshold=1)
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        call(tracker, cancelled)
+
+    health = tracker.get("azure", "index")
+    assert health.failures == 0
+    assert health.state == CIRCUIT_CLOSED
+
+
+def http_error(status):
+    error = HttpResponseError(message=f"HTTP {status}")
+    error.status_code = status
+    return error
+
+
+@pytest.mark.parametrize("error, failed", [
+    (ConnectionError("reset"), True),
+    (TimeoutError(), True),
+    (asyncio.TimeoutError(), True),
+    (ServiceRequestError("dns failure"), True),
+    (RateLimitedError("throttled", retry_after=1.0), True),
+    (http_error(429), True),
+    (http_error(503), True),
+    (http_error(408), True),
+    (http_error(400), False),
+    (http_error(404), False),
+    (ValueError("Invalid filter expression"), False),
+    (KeyError("field"), False),
+])
+def test_backend_failure_classification(error, failed):
+    assert is_backend_failure(error) is failed
+
+
+def test_caller_errors_do_not_open_the_circuit(clock):
+    tracker = HealthTracker(failure_threshold=2, min_requests=1)
+
+    def raising(error):
+        async def request():
+            raise error
+        return request
+
+    for error in [ValueError("Invalid filter expression")] * 5 + [http_error(400)] * 5:
+        with pytest.raises(type(error)):
+            call(tracker, raising(error))
+
+    health = tracker.get("azure", "index")
+    assert health.state == CIRCUIT_CLOSED
+    assert (health.failures, health.error_rate, health.ewma_latency) == (0, 0.0, None)
+    assert call(tracker, succeed(0.1, clock)) == "ok"
+
+    for _ in range(2):
+        with pytest.raises(HttpResponseError):
+            call(tracker, raising(http_error(503)))
+    assert health.state == CIRCUIT_OPEN
+
+
+def test_caller_error_releases_a_half_open_probe(clock):
+    tracker = HealthTracker(failure_threshold=1, open_seconds=30)
+    open_circuit(tracker, clock)
+    clock[0] += 31
+
+    async def bad_filter():
+        raise ValueError("Invalid filter expression")
+
+    with pytest.raises(ValueError):
+        call(tracker, bad_filter)
+
+    assert tracker.get("azure", "index").state == CIRCUIT_HALF_OPEN
+    assert call(tracker, succeed(0.1, clock)) == "ok"
+    assert tracker.get("azure", "index").state == CIRCUIT_CLOSED
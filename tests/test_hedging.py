@@ -0,0 +1,74 @@
+"""Tests for budgeted request hedging."""
+import asyncio
+
+from lib.search.hedging import HedgingPolicy
+
+
+def make_policy(**overrides):
+    settings = dict(enabled=True, min_samples=5, min_delay_ms=10, budget_ratio=0.1)
+    settings.update(overrides)
+    policy = HedgingPolicy(**settings)
+    for _ in range(5):
+        policy.record("index", 0.001)
+    return policy
+
+
+def slow_then_fast(calls, slow=0.2):
+    """Request factory whose first call is slow and every later call is fast."""
+    async def request():
+        calls.append(None)
+        await asyncio.sleep(slow if len(calls) == 1 else 0.0)
+        return len(calls)
+    return request
+
+
+def test_no_hedge_delay_before_min_samples():
+    policy = HedgingPolicy(enabled=True, min_samples=3)
+    policy.record("index", 0.5)
+    assert policy.hedge_delay("index") is None
+    policy.record("index", 0.5)
+    policy.record("index", 0.5)
+    assert policy.hedge_delay("index") == 0.5
+
+
+def test_hedge_delay_is_bounded_below():
+    policy = make_policy(min_delay_ms=50)
+    assert policy.hedge_delay("index") == 0.05
+
+
+def test_slow_primary_is_hedged_and_hedge_wins():
+    policy = make_policy(budget_ratio=1.0)
+    calls = []
+
+    result = asyncio.run(policy.run("index", slow_then_fast(calls)))
+
+    assert result == 2  # Served by the second (hedge) call
+    assert policy.hedges_sent == 1
+    assert policy.hedge_wins == 1
+
+
+def test_hedges_are_capped_by_budget():
+    # Hedge after the fastest recorded latency so every request qualifies
+    policy = make_policy(budget_ratio=0.1, percentile=0.0)
+
+    async def run():
+        for _ in range(10):
+            await policy.run("index", slow_then_fast([], slow=0.03))
+
+    asyncio.run(run())
+
+    assert policy.requests == 10
+    assert policy.hedges_sent == 1
+    assert policy.budget_denied == 9
+    assert policy.get_stats()["hedge_rate"] <= 0.1
+
+
+def test_disabled_policy_never_hedges():
+    policy = make_policy(enabled=False, budget_ratio=1.0)
+    calls = []
+
+    result = asyncio.run(policy.run("index", slow_then_fast(calls, slow=0.03)))
+
+    assert result == 1
+    assert len(calls) == 1
+    assert policy.hedges_sent == 0
@@ -0,0 +1,142 @@
+"""Tests for the offline BM25 + vector search provider."""
+import asyncio
+
+import numpy as np
+import pytest
+
+from lib.search.base import DocumentType, EmbeddingProvider, SearchQuery
+from lib.search.providers.local_search import (HashingEmbeddingProvider,
+                                               LocalSearchProvider, _LocalIndex)
+
+DOC_TYPE = "category_a_documents"
+
+
+class TopicEmbeddingProvider(EmbeddingProvider):
+    """Two-dimensional embeddings: texts about databases point one way, the rest the other."""
+
+    async def generate_embedding(self, text):
+        return self._embed(text)
+
+    async def generate_embeddings(self, texts):
+        return [self._embed(text) for text in texts]
+
+    @staticmethod
+    def _embed(text):
+        return [1.0, 0.0] if "database" in text or "storage" in text else [0.0, 1.0]
+
+    async def close(self):
+        pass
+
+
+def make_provider(tmp_path, files, embedding_provider=None):
+    directory = tmp_path / DOC_TYPE
+    directory.mkdir()
+    for name, text in files.items():
+        (directory / name).write_text(text, encoding="utf-8")
+    return LocalSearchProvider(
+        None, data_dir=str(tmp_path),
+        embedding_provider=embedding_provider or HashingEmbeddingProvider(64))
+
+
+def search(provider, text, hybrid=False, top_k=5):
+    query = SearchQuery(text=text, top_k=top_k, use_hybrid_search=hybrid)
+    return asyncio.run(provider.search(query, DocumentType.from_name(DOC_TYPE)))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("One para.\n", [(0, "One para.")]),
+    ("One para.", [(0, "One para.")]),
+    ("P1.\n\nP2 last.\n", [(0, "P1."), (5, "P2 last.")]),
+    ("  P1 line one\nline two.\n \n\nP2.\n\n\n", [(2, "P1 line one\nline two."), (27, "P2.")]),
+    ("\n\n", []),
+])
+def test_chunk_text_keeps_every_paragraph(tmp_path, monkeypatch, text, expected):
+    provider = make_provider(tmp_path, {})
+    monkeypatch.setattr(provider.settings, "chunk_chars", 1)
+
+    assert provider._chunk_text(text) == expected
+
+
+def test_chunk_text_joins_short_paragraphs_up_to_chunk_chars(tmp_path, monkeypatch):
+    provider = make_provider(tmp_path, {})
+    monkeypatch.setattr(provider.settings, "chunk_chars", 12)
+
+    chunks = provider._chunk_text("Alpha one.\n\nBeta.\n\nGamma two.\n\nDelta.\n")
+
+    assert [chunk for _, chunk in chunks] == ["Alpha one.\n\nBeta.", "Gamma two.\n\nDelta."]
+
+
+def test_newline_terminated_single_paragraph_file_is_indexed(tmp_path):
+    provider = make_provider(tmp_path, {"notes.txt": "Quota increases need a support ticket.\n"})
+
+    results = search(provider, "quota ticket")
+
+    assert [result.content_text for result in results] == [
+        "Quota increases need a support ticket."]
+    assert results[0].get_extracted_fields()["title"] == "notes"
+
+
+def test_bm25_prefers_rare_terms_and_shorter_documents():
+    texts = [
+        "azure azure azure deployment",
+        "azure deployment quota region",
+        "azure deployment quota region plus many other unrelated words here",
+        "cosmos",
+    ]
+    index = _LocalIndex([{} for _ in texts], texts, k1=1.2, b=0.75)
+
+    common = index.bm25_scores("azure")
+    rare = index.bm25_scores("quota")
+
+    assert common[3] == 0.0
+    # Term frequency saturates but still ranks the repeated term first
+    assert common[0] > common[1] > common[2] > 0
+    # Rarer terms weigh more than a term found in most documents
+    assert rare[1] > common[1]
+    assert index.bm25_scores("missing").sum() == 0.0
+
+
+def test_text_search_returns_only_matching_chunks(tmp_path):
+    provider = make_provider(tmp_path, {
+        "a.md": "Azure search quota per region.\n",
+        "b.md": "Database storage replicas.\n",
+    })
+
+    results = search(provider, "azure quota", top_k=5)
+
+    assert [result.content_text for result in results] == ["Azure search quota per region."]
+    assert results[0].search_mode == "text"
+
+
+def test_hybrid_search_fuses_text_and_vector_rankings(tmp_path):
+    provider = make_provider(tmp_path, {
+        "a.md": "Azure database quota.\n",
+        "b.md": "Storage replicas and failover.\n",
+        "c.md": "Model evaluation metrics.\n",
+    }, embedding_provider=TopicEmbeddingProvider())
+
+    results = search(provider, "azure database", hybrid=True, top_k=2)
+
+    # "a" is first for text and tied first for vectors; "b" only matches by vector
+    assert [result.content_text for result in results] == [
+        "Azure database quota.", "Storage replicas and failover."]
+    rrf_k = provider.settings.rrf_k
+    assert results[0].score == pytest.approx(2 / (rrf_k + 1))
+    assert results[1].score == pytest.approx(1 / (rrf_k + 2))
+    assert all(result.search_mode == "hybrid" for result in results)
+
+
+def test_vector_matrix_is_reused_until_chunks_change(tmp_path):
+    provider = make_provider(tmp_path, {"a.md": "Azure database quota.\n"})
+    search(provider, "azure", hybrid=True)
+    matrix = tmp_path / ".local_index" / f"{DOC_TYPE}.f32"
+    written = matrix.stat().st_mtime_ns
+
+    reopened = LocalSearchProvider(
+        None, data_dir=str(tmp_path), embedding_provider=HashingEmbeddingProvider(64))
+    search(reopened, "azure", hybrid=True)
+
+    assert matrix.stat().st_mtime_ns == written
+    vectors = reopened._indexes[DocumentType.from_name(DOC_TYPE)].vectors
+    assert isinstance(vectors, np.memmap)
+    assert vectors.shape == (1, 64)
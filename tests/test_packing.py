@@ -0,0 +1,128 @@
+"""Tests for token-budgeted result packing."""
+import asyncio
+import json
+
+from lib.search.base import SearchResult
+from lib.search.dedup import estimate_tokens
+from lib.search.packing import ELLIPSIS, ResultPacker
+from lib.search.plugin import ModularSearchPlugin
+
+LONG_URL = "https://example.com/" + "very-long-path-segment/" * 40
+
+
+def web_result(i, words=400):
+    return {
+        "title": f"Result {i} " + "title words " * 30,
+        "url": f"{LONG_URL}{i}",
+        "content": "x",
+        "snippet": " ".join(f"word{i}" for _ in range(words)),
+        "source_id": f"id-{i}-" + "0" * 300,
+        "score": None,
+    }
+
+
+def test_output_is_a_plain_result_list():
+    packer = ResultPacker(max_tokens=10_000)
+
+    text, report = packer.pack([web_result(1, words=5), web_result(2, words=5)])
+    packed = json.loads(text)
+
+    assert len(packed) == 2
+    assert all("url" in item for item in packed)
+    assert "score" not in packed[0]  # Null fields are dropped
+    assert report["results"] == 2 and report["dropped"] == 0
+
+
+def test_only_retrieved_text_is_truncated():
+    packer = ResultPacker(max_tokens=10_000, max_content_chars=100)
+    result = web_result(1)
+
+    text, report = packer.pack([result])
+    packed = json.loads(text)[0]
+
+    assert packed["snippet"].endswith(ELLIPSIS)
+    assert len(packed["snippet"]) <= 101
+    assert packed["url"] == result["url"]
+    assert packed["title"] == result["title"]
+    assert packed["source_id"] == result["source_id"]
+    assert report["truncated"] == 1
+
+
+def test_nested_citation_fields_are_kept_inside_content():
+    packer = ResultPacker(max_content_chars=50)
+    item = {"chunks": [{"text": "t " * 100, "url": LONG_URL}]}
+
+    packed = json.loads(packer.pack([item])[0])[0]
+
+    assert packed["chunks"][0]["url"] == LONG_URL
+    assert packed["chunks"][0]["text"].endswith(ELLIPSIS)
+
+
+def test_budget_drops_results_and_is_respected():
+    packer = ResultPacker(max_tokens=1500, max_content_chars=1500, min_content_chars=200)
+    results = [web_result(i) for i in range(10)]
+
+    text, report = packer.pack(results)
+
+    assert estimate_tokens(text) <= 1500
+    assert report["packed_tokens"] <= report["token_budget"] == 1500
+    assert report["results"] + report["dropped"] == 10
+    assert 0 < report["results"] < 10
+    assert len(json.loads(text)) == report["results"]
+
+
+def test_fused_score_orders_results():
+    items = [{"text": "low", "fused_score": 0.1}, {"text": "high", "fused_score": 0.9}]
+
+    packed = json.loads(ResultPacker().pack(items)[0])
+
+    assert [item["text"] for item in packed] == ["high", "low"]
+
+
+def test_search_results_keep_citations_and_are_not_modified():
+    result = SearchResult(
+        content_text="passage " * 500, search_type="guides", search_mode="hybrid",
+        document_title="Capital guide", content_path="docs/capital/" + "nested/" * 50,
+        captions=[{"text": "caption " * 300}])
+    packer = ResultPacker(max_content_chars=200)
+
+    packed = json.loads(packer.pack([result])[0])[0]
+
+    assert packed["content_text"].endswith(ELLIPSIS)
+    assert len(packed["content_text"]) <= 201
+    assert packed["captions"][0]["text"].endswith(ELLIPSIS)
+    assert packed["content_path"] == result.content_path
+    assert packed["document_title"] == "Capital guide"
+    assert len(result.content_text) == 4000
+
+
+def test_concurrent_plugin_calls_get_their_own_packing():
+    class SlowManager:
+        async def search(self, query, document_type):
+            # The shorter query finishes last
+            await asyncio.sleep(0.01 * (3 - len(query.text)))
+            return [SearchResult(content_text=f"{query.text} {i}", search_type="guides",
+                                 search_mode="hybrid") for i in range(len(query.text))]
+
+    plugin = ModularSearchPlugin.__new__(ModularSearchPlugin)
+    plugin.search_manager = SlowManager()
+    plugin.packer = ResultPacker(max_tokens=10_000)
+    plugin._get_document_type_enum = lambda name: name
+
+    def make_results(count):
+        return [SearchResult(content_text=str(i), search_type="guides", search_mode="hybrid")
+                for i in range(count)]
+
+    async def run():
+        return await asyncio.gather(
+            plugin._execute_search("guides", "a", 5, None, True, True),
+            plugin._execute_search("guides", "bb", 5, None, True, True))
+
+    one, two = asyncio.run(run())
+
+    assert [item["content_text"] for item in json.loads(one)] == ["a 0"]
+    assert [item["content_text"] for item in json.loads(two)] == ["bb 0", "bb 1"]
+    # Each call gets its own report
+    _, first = plugin._dump_search_results(make_results(1))
+    _, second = plugin._dump_search_results(make_results(3))
+    assert (first["results"], second["results"]) == (1, 3)
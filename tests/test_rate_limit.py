@@ -0,0 +1,87 @@
+"""Tests for the token-bucket rate limiter."""
+import asyncio
+
+import pytest
+
+from lib.search import rate_limit
+from lib.search.rate_limit import TokenBucket, get_rate_limiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock; asyncio.sleep advances it instead of waiting."""
+    now = [50.0]
+    monkeypatch.setattr("lib.search.rate_limit.time.monotonic", lambda: now[0])
+    original_sleep = asyncio.sleep
+
+    async def sleep(seconds):
+        # Let other waiters run before the clock moves on
+        await original_sleep(0)
+        now[0] += seconds
+
+    monkeypatch.setattr("lib.search.rate_limit.asyncio.sleep", sleep)
+    return now
+
+
+def acquire(bucket, timeout=0.0):
+    return asyncio.run(bucket.acquire(timeout))
+
+
+def test_burst_is_admitted_then_rejected(clock):
+    bucket = TokenBucket(rate_per_second=1.0, burst=3)
+
+    assert [acquire(bucket) for _ in range(4)] == [True, True, True, False]
+
+
+def test_tokens_refill_at_the_rate_up_to_capacity(clock):
+    bucket = TokenBucket(rate_per_second=2.0, burst=2)
+    acquire(bucket)
+    acquire(bucket)
+
+    clock[0] += 0.5
+    assert bucket.available() == pytest.approx(1.0)
+    clock[0] += 60
+    assert bucket.available() == pytest.approx(2.0)
+
+
+def test_acquire_waits_within_timeout(clock):
+    bucket = TokenBucket(rate_per_second=4.0, burst=1)
+    acquire(bucket)
+    started = clock[0]
+
+    assert acquire(bucket, timeout=1.0)
+    assert clock[0] - started == pytest.approx(0.25)
+
+
+def test_waiters_queue_behind_reserved_tokens(clock):
+    bucket = TokenBucket(rate_per_second=1.0, burst=1)
+    acquire(bucket)
+
+    async def run():
+        return await asyncio.gather(bucket.acquire(1.5), bucket.acquire(1.5))
+
+    # The first waiter reserves the next token, so the second would wait 2s
+    assert asyncio.run(run()) == [True, False]
+
+
+def test_block_for_stops_issuing_tokens(clock):
+    bucket = TokenBucket(rate_per_second=100.0, burst=10)
+
+    bucket.block_for(5.0)
+
+    assert bucket.time_until_available() == pytest.approx(5.0)
+    assert not acquire(bucket, timeout=1.0)
+    clock[0] += 5.0
+    assert acquire(bucket)
+
+
+def test_limiters_are_shared_per_api(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_limiters", {})
+
+    first = get_rate_limiter("tavily", requests_per_minute=120, burst=5)
+    again = get_rate_limiter("tavily", requests_per_minute=10, burst=1)
+
+    assert again is first
+    assert first.rate == pytest.approx(2.0)
+    assert first.capacity == 5.0
+    assert get_rate_limiter("other", 60, 1) is not first
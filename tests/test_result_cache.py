@@ -0,0 +1,174 @@
+"""Tests for the search result cache and its single-flight request sharing."""
+import asyncio
+
+import pytest
+
+from lib.search.base import SearchQuery, SearchResult
+from lib.search.result_cache import SearchResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the result cache module."""
+    now = [500.0]
+    monkeypatch.setattr("lib.search.result_cache.time.monotonic", lambda: now[0])
+    return now
+
+
+class Backend:
+    """Provider request stand-in counting calls; a call can be held until released."""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+        self.release = None
+
+    async def fetch(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return [SearchResult(content_text=f"call {self.calls}", search_type="guides",
+                             search_mode="hybrid")]
+
+
+def key(text="capital ratio", provider="azure"):
+    return SearchResultCache.make_key(provider, "search", SearchQuery(text=text), "guides")
+
+
+def get(cache, backend, provider="azure", cache_key=None):
+    return cache.get_or_fetch(cache_key or key(provider=provider), provider, backend.fetch)
+
+
+def texts(results):
+    return [result.content_text for result in results]
+
+
+def test_key_normalizes_whitespace_only():
+    assert key("capital  ratio ") == key("capital ratio")
+    assert key("Capital ratio") != key("capital ratio")
+    assert key(provider="web") != key(provider="azure")
+
+
+def test_concurrent_identical_calls_share_one_request(clock):
+    cache = SearchResultCache()
+    backend = Backend()
+
+    async def run():
+        backend.release = asyncio.Event()
+        callers = [asyncio.ensure_future(get(cache, backend)) for _ in range(5)]
+        await asyncio.sleep(0)
+        backend.release.set()
+        return await asyncio.gather(*callers)
+
+    results = asyncio.run(run())
+
+    assert backend.calls == 1
+    assert all(texts(result) == ["call 1"] for result in results)
+    # Each caller gets its own list
+    assert len({id(result) for result in results}) == 5
+    stats = cache.get_stats()
+    assert (stats["misses"], stats["coalesced"], stats["inflight"]) == (1, 4, 0)
+
+
+def test_results_expire_after_ttl(clock):
+    cache = SearchResultCache(ttl_seconds=300)
+    backend = Backend()
+
+    asyncio.run(get(cache, backend))
+    clock[0] += 299
+    assert texts(asyncio.run(get(cache, backend))) == ["call 1"]
+    clock[0] += 2
+    assert texts(asyncio.run(get(cache, backend))) == ["call 2"]
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_provider_ttl_overrides(clock):
+    cache = SearchResultCache(ttl_seconds=300, provider_ttl_seconds={"web": 60, "local": 0})
+    web, local = Backend(), Backend()
+
+    asyncio.run(get(cache, web, provider="web"))
+    clock[0] += 61
+    asyncio.run(get(cache, web, provider="web"))
+    for _ in range(3):
+        asyncio.run(get(cache, local, provider="local"))
+
+    assert web.calls == 2
+    assert local.calls == 3
+    assert cache.get_stats()["bypassed"] == 3
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = SearchResultCache(max_entries=2)
+    backend = Backend()
+
+    for text in ("a", "b"):
+        asyncio.run(get(cache, backend, cache_key=key(text)))
+    asyncio.run(get(cache, backend, cache_key=key("a")))  # "b" is now least recent
+    asyncio.run(get(cache, backend, cache_key=key("c")))
+
+    assert backend.calls == 3
+    asyncio.run(get(cache, backend, cache_key=key("a")))
+    assert backend.calls == 3
+    asyncio.run(get(cache, backend, cache_key=key("b")))
+    assert backend.calls == 4
+    assert cache.get_stats()["evictions"] == 2
+
+
+def test_empty_results_are_not_cached(clock):
+    cache = SearchResultCache()
+    calls = []
+
+    async def empty():
+        calls.append(None)
+        return []
+
+    for _ in range(2):
+        assert asyncio.run(cache.get_or_fetch(key(), "azure", empty)) == []
+    assert len(calls) == 2
+
+
+def test_failed_request_reaches_its_waiters_but_is_not_cached(clock):
+    cache = SearchResultCache()
+    backend = Backend(error=ConnectionError("backend down"))
+
+    async def run():
+        backend.release = asyncio.Event()
+        callers = [asyncio.ensure_future(get(cache, backend)) for _ in range(3)]
+        await asyncio.sleep(0)
+        backend.release.set()
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    errors = asyncio.run(run())
+
+    assert backend.calls == 1
+    assert all(isinstance(error, ConnectionError) for error in errors)
+    assert cache.get_stats()["entries"] == 0
+
+    backend.error = None
+    backend.release = None
+    assert texts(asyncio.run(get(cache, backend))) == ["call 2"]
+
+
+def test_cancelled_leader_does_not_cancel_the_shared_request(clock):
+    cache = SearchResultCache()
+    backend = Backend()
+
+    async def run():
+        backend.release = asyncio.Event()
+        leader = asyncio.ensure_future(get(cache, backend))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(get(cache, backend))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        backend.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert texts(asyncio.run(run())) == ["call 1"]
+    assert backend.calls == 1
+    # The completed request was still cached for later callers
+    assert texts(asyncio.run(get(cache, backend))) == ["call 1"]
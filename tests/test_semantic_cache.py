@@ -0,0 +1,132 @@
+"""Tests for the embedding-similarity query cache."""
+import numpy as np
+import pytest
+
+from lib.search.base import SearchQuery, SearchResult
+from lib.search.semantic_cache import SemanticQueryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the semantic cache module."""
+    now = [10.0]
+    monkeypatch.setattr("lib.search.semantic_cache.time.monotonic", lambda: now[0])
+    return now
+
+
+def make_results(text):
+    return [SearchResult(content_text=text, search_type="guides", search_mode="hybrid")]
+
+
+def rotated(vector, degrees):
+    """Rotate a 2D vector, giving a cosine similarity of cos(degrees) with it."""
+    angle = np.radians(degrees)
+    x, y = vector
+    return [x * np.cos(angle) - y * np.sin(angle), x * np.sin(angle) + y * np.cos(angle)]
+
+
+def test_similar_query_is_served_with_provenance(clock):
+    cache = SemanticQueryCache(similarity_threshold=0.98)
+    cache.put("p", "capital ratio overview", [1.0, 0.0], make_results("cached"))
+
+    # cos(10 degrees) is about 0.985; the magnitude does not matter
+    paraphrase = [3.0 * v for v in rotated([1.0, 0.0], 10)]
+    served = cache.lookup("p", "overview of capital ratio", paraphrase)
+
+    assert [result.content_text for result in served] == ["cached"]
+    provenance = served[0].metadata["semantic_cache"]
+    assert provenance["cached_query"] == "capital ratio overview"
+    assert provenance["similarity"] == pytest.approx(np.cos(np.radians(10)), abs=1e-4)
+
+
+def test_query_below_threshold_misses(clock):
+    cache = SemanticQueryCache(similarity_threshold=0.98)
+    cache.put("p", "capital ratio", [1.0, 0.0], make_results("cached"))
+
+    # cos(15 degrees) is about 0.966
+    assert cache.lookup("p", "leverage ratio", rotated([1.0, 0.0], 15)) is None
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_partitions_do_not_share_results(clock):
+    cache = SemanticQueryCache()
+    query = SearchQuery(text="capital", top_k=5)
+    filtered = SearchQuery(text="capital", top_k=5, filter_expression="year eq 2024")
+    partition = SemanticQueryCache.make_partition("azure", "search", query, "guides")
+    other = SemanticQueryCache.make_partition("azure", "search", filtered, "guides")
+    cache.put(partition, "capital", [1.0, 0.0], make_results("cached"))
+
+    assert cache.lookup(other, "capital", [1.0, 0.0]) is None
+    assert cache.lookup(partition, "capital", [1.0, 0.0]) is not None
+
+
+def test_entries_expire(clock):
+    cache = SemanticQueryCache(ttl_seconds=300)
+    cache.put("p", "q", [1.0, 0.0], make_results("cached"))
+
+    clock[0] += 299
+    assert cache.lookup("p", "q", [1.0, 0.0]) is not None
+    clock[0] += 2
+    assert cache.lookup("p", "q", [1.0, 0.0]) is None
+
+
+def test_least_recently_used_row_is_replaced(clock):
+    cache = SemanticQueryCache(max_entries=2)
+    cache.put("p", "a", [1.0, 0.0, 0.0], make_results("a"))
+    clock[0] += 1
+    cache.put("p", "b", [0.0, 1.0, 0.0], make_results("b"))
+    clock[0] += 1
+    assert cache.lookup("p", "a", [1.0, 0.0, 0.0]) is not None  # "b" is now least recent
+    clock[0] += 1
+    cache.put("p", "c", [0.0, 0.0, 1.0], make_results("c"))
+
+    assert cache.lookup("p", "b", [0.0, 1.0, 0.0]) is None
+    assert cache.lookup("p", "a", [1.0, 0.0, 0.0]) is not None
+    assert cache.lookup("p", "c", [0.0, 0.0, 1.0]) is not None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_empty_results_and_zero_vectors_are_not_cached(clock):
+    cache = SemanticQueryCache()
+    cache.put("p", "q", [1.0, 0.0], [])
+    cache.put("p", "z", [0.0, 0.0], make_results("zero"))
+
+    assert cache.lookup("p", "q", [1.0, 0.0]) is None
+    assert cache.lookup("p", "z", [0.0, 0.0]) is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_dimension_change_starts_over(clock):
+    cache = SemanticQueryCache()
+    cache.put("p", "old", [1.0, 0.0], make_results("old"))
+    cache.put("p", "new", [1.0, 0.0, 0.0], make_results("new"))
+
+    assert cache.lookup("p", "old", [1.0, 0.0]) is None
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_partitions_are_forgotten_with_their_last_row(clock):
+    cache = SemanticQueryCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", "first", [1.0, 0.0], make_results("a"))
+    cache.put("b", "second", [0.0, 1.0], make_results("b"))
+    assert cache.get_stats()["partitions"] == 2
+
+    # Evicting the only row of "a" drops the partition
+    clock[0] += 1
+    cache.put("c", "third", [1.0, 1.0], make_results("c"))
+    assert cache.get_stats()["partitions"] == 2
+    assert cache.lookup("a", "first", [1.0, 0.0]) is None
+    assert cache.lookup("b", "second", [0.0, 1.0]) is not None
+
+    # Expired rows release their partitions on the next put
+    clock[0] += 61
+    for i in range(50):
+        cache.put(f"p{i}", "query", [1.0, 0.0], make_results(str(i)))
+        clock[0] += 61
+    assert cache.get_stats()["partitions"] == 1
+
+    # A new partition never reuses the id of a live one
+    clock[0] -= 61
+    cache.put("d", "other", [0.0, 1.0], make_results("d"))
+    assert [r.content_text for r in cache.lookup("p49", "query", [1.0, 0.0])] == ["49"]
+    assert [r.content_text for r in cache.lookup("d", "other", [0.0, 1.0])] == ["d"]
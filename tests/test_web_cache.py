@@ -0,0 +1,90 @@
+"""Tests for the persistent web search response cache."""
+import pytest
+
+from lib.search.web_cache import WebResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable wall clock for the web cache module."""
+    now = [1_000_000.0]
+    monkeypatch.setattr("lib.search.web_cache.time.time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = WebResultCache(str(tmp_path / "web.db"), max_entries=3, ttl_seconds=600,
+                           ttl_by_time_range={"day": 60})
+    yield cache
+    cache.close()
+
+
+def test_key_ignores_case_and_spacing_but_not_parameters():
+    key = WebResultCache.make_key("Basel  III capital", time_range="week")
+
+    assert key == WebResultCache.make_key(" basel iii CAPITAL", time_range="week")
+    assert key != WebResultCache.make_key("basel iii capital", time_range="day")
+    assert key != WebResultCache.make_key(
+        "basel iii capital", time_range="week", include_raw_content=True)
+
+
+def test_round_trip_and_stats(cache, clock):
+    response = {"results": [{"url": "https://example.com", "title": "Café"}]}
+    cache.put("k", response)
+
+    assert cache.get("k") == response
+    assert cache.get("missing") is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_ttl_depends_on_time_range(cache, clock):
+    cache.put("day", {"n": 1}, time_range="day")
+    cache.put("default", {"n": 2})
+
+    clock[0] += 59
+    assert cache.get("day") == {"n": 1}
+    assert cache.get("default") == {"n": 2}
+    clock[0] += 2
+    assert cache.get("day") is None
+    assert cache.get("default") == {"n": 2}
+    clock[0] += 600
+    assert cache.get("default") is None
+    assert cache.get_stats()["expired"] == 2
+
+
+def test_non_positive_ttl_is_not_cached(tmp_path, clock):
+    cache = WebResultCache(str(tmp_path / "web.db"), ttl_by_time_range={"day": 0})
+    cache.put("k", {"n": 1}, time_range="day")
+
+    assert cache.get("k") is None
+    cache.close()
+
+
+def test_trim_evicts_expired_then_least_recently_used(cache, clock):
+    for key in ("a", "b", "c", "d"):
+        cache.put(key, {"key": key})
+        clock[0] += 1
+    cache.put("short", {"key": "short"}, time_range="day")
+    clock[0] += 1
+    cache.get("a")  # Recently used again: survives the trim
+
+    with cache._lock:
+        cache._trim(clock[0] + 120)
+        cache._db.commit()
+
+    # "short" expired; of the rest only the 3 most recently used stay
+    assert cache.get_stats()["entries"] == 3
+    assert [key for key in ("a", "b", "c", "d") if cache.get(key)] == ["a", "c", "d"]
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_writes_trigger_periodic_trim(cache, clock):
+    for i in range(64):
+        cache.put(f"k{i}", {"i": i})
+        clock[0] += 1
+
+    assert cache.get_stats()["entries"] == 3
+    assert cache.get("k63") == {"i": 63}
+    assert cache.get("k0") is None
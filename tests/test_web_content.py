@@ -0,0 +1,156 @@
+"""Tests for the page fetcher's address checks, redirect handling and stream cut-off."""
+import asyncio
+import socket
+
+import httpx
+import pytest
+
+from lib.search.web_content import WebContentPipeline
+
+# Host name -> addresses returned by the fake resolver
+HOSTS = {
+    "public.example": ["93.184.216.34"],
+    "other-public.example": ["151.101.1.69"],
+    "intranet.example": ["10.1.2.3"],
+    "mixed.example": ["93.184.216.34", "192.168.0.10"],
+    "metadata.example": ["169.254.169.254"],
+    "v6-loopback.example": ["::1"],
+}
+
+
+@pytest.fixture(autouse=True)
+def resolver(monkeypatch):
+    """Resolve the test host names without DNS."""
+    async def getaddrinfo(self, host, port, *args, **kwargs):
+        if host not in HOSTS:
+            raise socket.gaierror(f"unknown host {host}")
+        return [
+            (socket.AF_INET6 if ":" in address else socket.AF_INET, socket.SOCK_STREAM, 6, "",
+             (address, port))
+            for address in HOSTS[host]]
+
+    monkeypatch.setattr(asyncio.BaseEventLoop, "getaddrinfo", getaddrinfo)
+
+
+def make_pipeline(handler, **settings):
+    requested = []
+
+    def record(request):
+        requested.append(str(request.url))
+        return handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(record), follow_redirects=False)
+    return WebContentPipeline(client=client, **settings), requested
+
+
+def page(request):
+    return httpx.Response(200, text="<p>Quota per region.</p>", headers={"content-type": "text/html"})
+
+
+def collect(pipeline, url):
+    async def run():
+        try:
+            return await pipeline._collect_chunks(url)
+        finally:
+            await pipeline.close()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/",
+    "http://127.10.0.1:8080/admin",
+    "http://10.0.0.8/",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/",
+    "http://[::ffff:127.0.0.1]/",
+    "http://0.0.0.0/",
+    "http://intranet.example/",
+    "http://mixed.example/",
+    "http://metadata.example/",
+    "http://v6-loopback.example/",
+    "file:///etc/passwd",
+    "ftp://public.example/file",
+    "http:///no-host",
+])
+def test_non_public_urls_are_blocked_before_any_request(url):
+    pipeline, requested = make_pipeline(page)
+
+    with pytest.raises(ValueError):
+        collect(pipeline, url)
+
+    assert requested == []
+    assert pipeline.blocked_urls == 1
+
+
+def test_public_url_is_fetched():
+    pipeline, requested = make_pipeline(page)
+
+    chunks = collect(pipeline, "https://public.example/guide")
+
+    assert chunks == [(0, "Quota per region.")]
+    assert requested == ["https://public.example/guide"]
+
+
+def test_redirect_to_private_address_is_blocked():
+    def handler(request):
+        if request.url.host == "public.example":
+            return httpx.Response(302, headers={"location": "http://169.254.169.254/latest/meta-data/"})
+        return page(request)
+
+    pipeline, requested = make_pipeline(handler)
+
+    with pytest.raises(ValueError, match="169.254.169.254"):
+        collect(pipeline, "https://public.example/start")
+
+    assert requested == ["https://public.example/start"]
+
+
+def test_relative_and_public_redirects_are_followed():
+    def handler(request):
+        if request.url.path == "/start":
+            return httpx.Response(301, headers={"location": "/moved"})
+        if request.url.path == "/moved":
+            return httpx.Response(307, headers={"location": "https://other-public.example/final"})
+        return page(request)
+
+    pipeline, requested = make_pipeline(handler)
+
+    assert collect(pipeline, "https://public.example/start") == [(0, "Quota per region.")]
+    assert requested == [
+        "https://public.example/start",
+        "https://public.example/moved",
+        "https://other-public.example/final",
+    ]
+
+
+def test_redirect_limit():
+    def handler(request):
+        hop = int(request.url.params.get("hop", "0"))
+        return httpx.Response(302, headers={"location": f"/loop?hop={hop + 1}"})
+
+    pipeline, requested = make_pipeline(handler, max_redirects=3)
+
+    with pytest.raises(ValueError, match="More than 3 redirects"):
+        collect(pipeline, "https://public.example/loop")
+
+    assert len(requested) == 4
+
+
+def test_stream_is_closed_after_max_page_chars():
+    sent = []
+
+    async def body():
+        for i in range(1000):
+            sent.append(i)
+            yield b"x" * 99 + b" "
+
+    def handler(request):
+        return httpx.Response(200, content=body(), headers={"content-type": "text/plain"})
+
+    pipeline, _ = make_pipeline(handler, max_page_chars=1000, chunk_chars=400)
+
+    chunks = collect(pipeline, "https://public.example/huge")
+
+    assert len(sent) < 20
+    assert pipeline.get_stats()["chars_extracted"] < 1200
+    assert sum(len(text) for _, text in chunks) <= 1200